@@ -1,3 +1,10 @@
-from .server import main
-
+# The server (and the mcp SDK behind it) is imported on first use, so that
+# ``python -m anymcp.runtime`` and the other helpers start without it
 __all__ = ["main"]
+
+
+def __getattr__(name):
+    if name == "main":
+        from .server import main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,115 @@
+"""
+Client for the long-lived behave runner helper (``behave_runner.py``)
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Run by path rather than with -m so the helper never imports the server package
+RUNNER_SCRIPT = Path(__file__).resolve().with_name("behave_runner.py")
+
+
+class BehaveRunnerError(RuntimeError):
+    """The helper process could not be started or died mid-request"""
+
+
+class BehaveRunnerClient:
+    """Sends runs to one persistent helper process, one request at a time.
+
+    The helper is driven with blocking pipes from a worker thread rather than
+    asyncio subprocess transports, so it survives across event loops (behave
+    steps call ``asyncio.run()`` once per step).
+    """
+
+    def __init__(self, python: str = sys.executable):
+        self.python = python
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        # Counters reported by the current helper: runs served, step (re)loads
+        self.stats: Dict[str, int] = {"runs": 0, "step_loads": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def run(self, args: List[str], cwd: Optional[str] = None, verbose: bool = False) -> Dict[str, Any]:
+        """Run behave with ``args`` in the helper; restarts it once if it has died"""
+        request = json.dumps({"args": args, "cwd": cwd, "verbose": verbose}) + "\n"
+        with self._lock:
+            for _ in range(2):
+                process = self._ensure_started()
+                try:
+                    process.stdin.write(request)
+                    process.stdin.flush()
+                    line = process.stdout.readline()
+                except (BrokenPipeError, OSError):
+                    line = ""
+                if line:
+                    response = json.loads(line)
+                    self.stats = {key: response.get(key, 0) for key in self.stats}
+                    return response
+                self._discard()
+        raise BehaveRunnerError("behave runner exited before answering")
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if not self.running:
+            self._discard()
+            try:
+                self._process = subprocess.Popen(
+                    [self.python, str(RUNNER_SCRIPT)],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    text=True,
+                    encoding="utf-8",
+                    start_new_session=True
+                )
+            except OSError as e:
+                raise BehaveRunnerError(f"cannot start behave runner: {e}") from e
+        return self._process
+
+    def _discard(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        self._kill(process)
+        process.wait()
+        for stream in (process.stdin, process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _kill(process: subprocess.Popen) -> None:
+        if process is not None and process.poll() is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Ask the helper to exit by closing its stdin; kill it if it lingers"""
+        if self._process is None:
+            return
+        if not self._lock.acquire(timeout=timeout):
+            # A run is still in flight; killing the group unblocks its reader
+            self._kill(self._process)
+            return
+        try:
+            process = self._process
+            if process is None:
+                return
+            try:
+                process.stdin.close()
+                process.wait(timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            self._discard()
+        finally:
+            self._lock.release()
@@ -0,0 +1,125 @@
+"""
+Machine-readable test results built from behave's JSON formatter output
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+
+def formatter_args(report_path: Path) -> List[str]:
+    """behave arguments that write the JSON report alongside the usual text output"""
+    return ["-f", "json", "-o", str(report_path), "-f", "pretty"]
+
+
+def load_report(report_path: Path) -> List[Dict[str, Any]]:
+    """Features from a behave JSON report; empty if the run died before writing it"""
+    try:
+        data = json.loads(Path(report_path).read_text(encoding="utf-8") or "[]")
+    except (OSError, ValueError):
+        return []
+    return data if isinstance(data, list) else []
+
+
+def _error_message(result: Dict[str, Any]) -> str:
+    message = result.get("error_message")
+    if isinstance(message, list):
+        message = "\n".join(message)
+    return message or ""
+
+
+def _step_result(step: Dict[str, Any]) -> Dict[str, Any]:
+    result = step.get("result")
+    if result is None:
+        status = "skipped" if "match" in step else "undefined"
+        return {
+            "keyword": step.get("keyword", ""),
+            "name": step.get("name", ""),
+            "location": step.get("location", ""),
+            "status": status,
+            "duration": 0.0
+        }
+    entry = {
+        "keyword": step.get("keyword", ""),
+        "name": step.get("name", ""),
+        "location": step.get("location", ""),
+        "status": result.get("status", "untested"),
+        "duration": float(result.get("duration") or 0.0)
+    }
+    error = _error_message(result)
+    if error:
+        entry["error"] = error
+    return entry
+
+
+def _scenario_result(element: Dict[str, Any]) -> Dict[str, Any]:
+    steps = [_step_result(step) for step in element.get("steps", [])]
+    scenario = {
+        "name": element.get("name", "").strip(),
+        "location": element.get("location", ""),
+        "status": element.get("status") or "skipped",
+        "duration": sum(step["duration"] for step in steps),
+        "steps": steps
+    }
+    failed = next((step for step in steps if step.get("error")), None)
+    if failed is not None:
+        scenario["error"] = f'{failed["keyword"]} {failed["name"]}: {failed["error"]}'
+    return scenario
+
+
+def _count(counts: Dict[str, int], status: str) -> None:
+    counts[status] = counts.get(status, 0) + 1
+
+
+def summarize(features: Iterable[Dict[str, Any]], slowest: int = 5) -> Dict[str, Any]:
+    """Per-feature/scenario/step results, totals, failures and the slowest scenarios"""
+    results: List[Dict[str, Any]] = []
+    totals: Dict[str, Dict[str, int]] = {"features": {}, "scenarios": {}, "steps": {}}
+    for feature in features:
+        scenarios = [
+            _scenario_result(element)
+            for element in feature.get("elements", [])
+            if element.get("type") != "background"
+        ]
+        entry = {
+            "name": feature.get("name", ""),
+            "location": feature.get("location", ""),
+            "status": feature.get("status") or "skipped",
+            "duration": sum(scenario["duration"] for scenario in scenarios),
+            "scenarios": scenarios
+        }
+        results.append(entry)
+        _count(totals["features"], entry["status"])
+        for scenario in scenarios:
+            _count(totals["scenarios"], scenario["status"])
+            for step in scenario["steps"]:
+                _count(totals["steps"], step["status"])
+
+    ranked = sorted(
+        ((feature, scenario) for feature in results for scenario in feature["scenarios"]),
+        key=lambda pair: pair[1]["duration"],
+        reverse=True
+    )
+    return {
+        "totals": totals,
+        "features": results,
+        "failures": [
+            {
+                "feature": feature["name"],
+                "scenario": scenario["name"],
+                "location": scenario["location"],
+                "message": scenario.get("error", "")
+            }
+            for feature in results for scenario in feature["scenarios"]
+            if scenario["status"] in ("failed", "error")
+        ],
+        "slowest": [
+            {
+                "feature": feature["name"],
+                "scenario": scenario["name"],
+                "location": scenario["location"],
+                "duration": scenario["duration"]
+            }
+            for feature, scenario in ranked[:slowest]
+        ]
+    }
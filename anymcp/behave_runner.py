@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Long-lived behave runner.
+
+Reads one JSON request per line on stdin (``{"args": [...], "cwd": ...,
+"verbose": false}``, where ``args`` are behave command-line arguments), runs behave in-process through its ``Configuration`` /
+``Runner`` API and answers with one JSON line per request. Step modules are
+only re-executed when a file in the steps directory changes, so repeated runs
+skip interpreter start-up, the behave import and step discovery.
+
+Run by file path, like ``worker.py``.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from behave.configuration import Configuration
+from behave.runner import Runner
+from behave.step_registry import registry
+
+
+def _fingerprint(step_paths: List[str]) -> Tuple:
+    """Identify the current contents of the step directories"""
+    entries = []
+    for step_path in step_paths:
+        directory = Path(step_path)
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.glob("*.py")):
+            stat = path.stat()
+            entries.append((str(path.resolve()), stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+class BehaveSession:
+    """Keeps the step registry loaded across runs and reloads it when steps change"""
+
+    def __init__(self):
+        self._signature: Optional[Tuple] = None
+        self.runs = 0
+        self.step_loads = 0
+
+    def load_step_definitions(self, step_paths: List[str], load) -> None:
+        signature = (tuple(step_paths), _fingerprint(step_paths))
+        if signature == self._signature:
+            return
+        self._signature = None
+        self._forget_step_modules(step_paths)
+        registry.clear()
+        load()
+        self.step_loads += 1
+        self._signature = signature
+
+    @staticmethod
+    def _forget_step_modules(step_paths: List[str]) -> None:
+        # Step files import each other (``from common_steps import *``) and
+        # step libraries (``anymcp.tool_steps``); drop those cached modules so
+        # the reload re-runs their decorators against the cleared registry
+        directories = {str(Path(p).resolve()) for p in step_paths}
+        registering = {
+            matcher.func.__module__
+            for matchers in registry.steps.values() for matcher in matchers
+        }
+        for name, module in list(sys.modules.items()):
+            filename = getattr(module, "__file__", None)
+            in_steps_dir = filename and str(Path(filename).resolve().parent) in directories
+            if in_steps_dir or name in registering:
+                del sys.modules[name]
+
+    def run(self, args: List[str], cwd: Optional[str] = None, verbose: bool = False) -> Dict[str, Any]:
+        """Run behave with ``args`` and return its exit code and captured output"""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        previous_cwd = os.getcwd()
+        returncode = 1
+        try:
+            if cwd:
+                os.chdir(cwd)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                returncode = self._run(args, verbose)
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            stderr.write(f"{type(e).__name__}: {e}\n")
+        finally:
+            os.chdir(previous_cwd)
+            self.runs += 1
+        return {
+            "returncode": returncode,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "runs": self.runs,
+            "step_loads": self.step_loads
+        }
+
+    def _run(self, args: List[str], verbose: bool) -> int:
+        config = Configuration(command_args=list(args) + (["-v"] if verbose else []))
+        if not config.format:
+            config.format = [config.default_format]
+        runner = _ReusingRunner(self, config)
+        try:
+            failed = runner.run()
+        except Exception as e:
+            print(f"Exception {type(e).__name__}: {e}")
+            failed = True
+        if config.show_snippets and runner.undefined_steps:
+            from behave.runner_util import print_undefined_step_snippets
+            print_undefined_step_snippets(runner.undefined_steps,
+                                          colored=config.has_colored_mode())
+        return 1 if failed else 0
+
+
+class _ReusingRunner(Runner):
+    """behave Runner that loads step definitions through a BehaveSession"""
+
+    def __init__(self, session: BehaveSession, config: Configuration):
+        super().__init__(config)
+        self.session = session
+
+    def load_step_definitions(self, extra_step_paths=None):
+        steps_dir = os.path.join(self.base_dir, self.config.steps_dir)
+        step_paths = [steps_dir] + list(extra_step_paths or [])
+        self.session.load_step_definitions(
+            step_paths,
+            lambda: super(_ReusingRunner, self).load_step_definitions(extra_step_paths)
+        )
+
+
+def main():
+    # Keep the protocol on a private copy of stdout; anything else that writes
+    # to fd 1 (tool processes started by steps, stray prints) lands on stderr
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    session = BehaveSession()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            response = session.run(request["args"], request.get("cwd"), request.get("verbose", False))
+        except Exception as e:
+            response = {"returncode": 1, "stdout": "", "stderr": f"{type(e).__name__}: {e}\n"}
+        channel.write(json.dumps(response) + "\n")
+        channel.flush()
+
+
+if __name__ == "__main__":
+    main()
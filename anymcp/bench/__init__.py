@@ -0,0 +1,32 @@
+"""
+Benchmark suite for anymcp's hot paths (``python -m anymcp.bench``).
+
+``run`` measures execute_tool latency per execution mode, search_tools and
+list_tools against synthetic registries, concurrent throughput and call_tool
+result serialization, and writes the results as JSON. ``compare`` checks a
+run against a saved baseline and exits non-zero on regressions. ``load``
+starts ``python -m anymcp`` and drives a mix of MCP calls at it through a
+real client session. ``replay`` replays a recording made with the server's
+``--record`` option against a candidate build.
+"""
+
+from .compare import DEFAULT_THRESHOLD, compare_results, format_comparison
+from .load import DEFAULT_MIX, format_report, parse_mix, run_load
+from .replay import format_replay, replay_recording
+from .suites import SUITES, load_results, run_benchmarks, write_results
+
+__all__ = [
+    "DEFAULT_MIX",
+    "DEFAULT_THRESHOLD",
+    "SUITES",
+    "compare_results",
+    "format_comparison",
+    "format_replay",
+    "format_report",
+    "load_results",
+    "parse_mix",
+    "replay_recording",
+    "run_benchmarks",
+    "run_load",
+    "write_results",
+]
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite entry point: ``python -m anymcp.bench run|compare|load|replay``
+"""
+
+import argparse
+import asyncio
+import json
+import shlex
+import sys
+from pathlib import Path
+
+from ..tool_manager import EXECUTION_MODES
+from .compare import DEFAULT_THRESHOLD, compare_results, format_comparison
+from .load import DEFAULT_MIX, PACKAGE_ROOT, format_report, parse_mix, run_load
+from .replay import format_replay, replay_recording
+from .suites import DEFAULT_CONCURRENCY, DEFAULT_SIZES, SUITES, load_results, run_benchmarks, write_results
+
+
+def _int_list(value: str):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _name_list(choices):
+    def parse(value: str):
+        names = [item.strip() for item in value.split(",") if item.strip()]
+        unknown = [name for name in names if name not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(choices)})")
+        return names
+    return parse
+
+
+def _mix(value: str):
+    try:
+        return parse_mix(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m anymcp.bench", description="AnyMCP benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and write the results as JSON")
+    run.add_argument(
+        "--output", "-o", default="bench-results.json",
+        help="File to write the results to (default: bench-results.json)"
+    )
+    run.add_argument(
+        "--only", type=_name_list(SUITES), default=list(SUITES),
+        help=f"Comma-separated suites to run (default: {','.join(SUITES)})"
+    )
+    run.add_argument(
+        "--modes", type=_name_list(EXECUTION_MODES), default=list(EXECUTION_MODES),
+        help="Comma-separated execution modes for the execute and throughput suites"
+    )
+    run.add_argument(
+        "--sizes", type=_int_list, default=list(DEFAULT_SIZES),
+        help="Comma-separated synthetic registry sizes for the discovery suite"
+    )
+    run.add_argument(
+        "--concurrency", type=_int_list, default=list(DEFAULT_CONCURRENCY),
+        help="Comma-separated concurrency levels for the throughput suite"
+    )
+    run.add_argument(
+        "--iterations", type=int, default=20,
+        help="Timed tool calls per execution mode and concurrency level"
+    )
+    run.add_argument(
+        "--repeat", type=int, default=5,
+        help="Timed repetitions of each discovery and serialization measurement"
+    )
+    run.add_argument(
+        "--tools-dir", default="tools",
+        help="Directory whose perf_tool_*.py tools the execute and throughput suites call"
+    )
+
+    compare = commands.add_parser("compare", help="Compare results against a baseline; exit 1 on regressions")
+    compare.add_argument("baseline", help="Saved baseline results")
+    compare.add_argument("current", help="Results to check")
+    compare.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="Relative change that counts as a regression (default: 0.10 = 10%%)"
+    )
+    compare.add_argument("--json", action="store_true", help="Print the comparison as JSON")
+
+    load = commands.add_parser("load", help="Drive MCP traffic at a real server and report throughput and latency")
+    load.add_argument(
+        "--mix", type=_mix, default=dict(DEFAULT_MIX),
+        help="Weighted operations, e.g. search_tool=4,execute_tool=4,list_tools=1,create_tool=1"
+    )
+    load.add_argument("--duration", type=float, default=10.0, help="Seconds to run (default: 10)")
+    load.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    load.add_argument(
+        "--concurrency", type=int, default=4,
+        help="Concurrent clients, or the in-flight limit with --rate (default: 4)"
+    )
+    load.add_argument("--rate", type=float, default=None, help="Target requests per second (open loop)")
+    load.add_argument("--warmup", type=int, default=5, help="Untimed requests sent first (default: 5)")
+    load.add_argument("--seed", type=int, default=0, help="Seed for the request sequence")
+    load.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    load.add_argument(
+        "--server-args", type=shlex.split, default=[],
+        help="Extra arguments for the spawned server, e.g. \"--execution-mode worker --workers 2\""
+    )
+    load.add_argument(
+        "--seed-tools", default=None,
+        help="Copy this directory's *.py tools into the spawned server's tools directory"
+    )
+    load.add_argument("--sse-url", default=None, help="Connect to a running server over SSE instead of spawning one")
+    load.add_argument("--output", "-o", default=None, help="Also write the report as JSON to this file")
+
+    replay = commands.add_parser("replay", help="Replay a recording (python -m anymcp --record) against a build")
+    replay.add_argument("recording", help="Recording file written by the server's --record option")
+    replay.add_argument(
+        "--speed", type=float, default=1.0,
+        help="Replay speed: 1 keeps the recorded timing, 10 is ten times faster, 0 sends calls back to back"
+    )
+    replay.add_argument(
+        "--candidate", default=str(PACKAGE_ROOT),
+        help="Checkout whose anymcp package serves the replay (default: this one)"
+    )
+    replay.add_argument(
+        "--server-args", type=shlex.split, default=[],
+        help="Extra arguments for the replay server, e.g. \"--execution-mode worker\""
+    )
+    replay.add_argument("--timeout", type=float, default=60.0, help="Per-call timeout in seconds")
+    replay.add_argument("--output", "-o", default=None, help="Also write the report as JSON to this file")
+    replay.add_argument(
+        "--fail-on-diff", action="store_true",
+        help="Exit 1 if any replayed result differs from the recording"
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "replay":
+        report = asyncio.run(replay_recording(
+            Path(args.recording),
+            speed=args.speed,
+            server_args=args.server_args,
+            package_root=Path(args.candidate),
+            timeout=args.timeout
+        ))
+        if args.output:
+            write_results(report, Path(args.output))
+        print(format_replay(report))
+        return 1 if args.fail_on_diff and (report["mismatches"] or report["errors"]) else 0
+
+    if args.command == "load":
+        if args.rate is not None and args.rate <= 0:
+            parser.error("--rate must be positive")
+        report = asyncio.run(run_load(
+            mix=args.mix,
+            duration=args.duration,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            seed=args.seed,
+            timeout=args.timeout,
+            server_args=args.server_args,
+            seed_tools=Path(args.seed_tools) if args.seed_tools else None,
+            sse_url=args.sse_url,
+            warmup=args.warmup
+        ))
+        if args.output:
+            write_results(report, Path(args.output))
+        print(format_report(report))
+        return 0
+
+    if args.command == "run":
+        results = asyncio.run(run_benchmarks(
+            suites=args.only,
+            perf_tools_dir=Path(args.tools_dir),
+            sizes=args.sizes,
+            concurrency=args.concurrency,
+            modes=args.modes,
+            iterations=args.iterations,
+            repeat=args.repeat
+        ))
+        write_results(results, Path(args.output))
+        for name, entry in results["results"].items():
+            print(f"{name:<32} {entry['value']:>12.4g} {entry['unit']}")
+        print(f"Wrote {len(results['results'])} results to {args.output}")
+        return 0
+
+    comparison = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    print(json.dumps(comparison, indent=2) if args.json else format_comparison(comparison))
+    return 1 if comparison["regressed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Regression check of a benchmark run against a saved baseline
+"""
+
+from typing import Any, Dict, List
+
+DEFAULT_THRESHOLD = 0.10
+
+STATUSES = ("regression", "improvement", "ok", "new", "missing")
+
+
+def _change(entry: Dict[str, Any], baseline: Dict[str, Any]) -> float:
+    """Relative change of ``value``, signed so that positive is always worse"""
+    before, after = baseline["value"], entry["value"]
+    if before == 0:
+        return 0.0 if after == 0 else float("inf")
+    change = (after - before) / before
+    return -change if entry.get("better") == "higher" else change
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+    """Classify every metric of two ``run_benchmarks`` results.
+
+    A metric regresses when it got worse by more than ``threshold`` (a
+    fraction, 0.10 = 10%) and improves when it got better by as much.
+    """
+    before = baseline.get("results", {})
+    after = current.get("results", {})
+    metrics: List[Dict[str, Any]] = []
+    for name in sorted(set(before) | set(after)):
+        metric: Dict[str, Any] = {"name": name}
+        if name not in before:
+            metric.update(status="new", current=after[name]["value"])
+        elif name not in after:
+            metric.update(status="missing", baseline=before[name]["value"])
+        else:
+            change = _change(after[name], before[name])
+            if change > threshold:
+                status = "regression"
+            elif change < -threshold:
+                status = "improvement"
+            else:
+                status = "ok"
+            metric.update(
+                status=status,
+                unit=after[name].get("unit"),
+                baseline=before[name]["value"],
+                current=after[name]["value"],
+                change=change
+            )
+        metrics.append(metric)
+    summary = {status: sum(1 for m in metrics if m["status"] == status) for status in STATUSES}
+    return {
+        "threshold": threshold,
+        "regressed": summary["regression"] > 0,
+        "summary": summary,
+        "metrics": metrics
+    }
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    """One line per metric, regressions first"""
+    order = {status: index for index, status in enumerate(STATUSES)}
+    lines = []
+    for metric in sorted(comparison["metrics"], key=lambda m: (order[m["status"]], m["name"])):
+        if "change" in metric:
+            direction = "worse" if metric["change"] >= 0 else "better"
+            detail = (f"{metric['baseline']:.4g} -> {metric['current']:.4g} {metric['unit']} "
+                      f"({abs(metric['change']):.1%} {direction})")
+        elif metric["status"] == "new":
+            detail = f"{metric['current']:.4g} (no baseline)"
+        else:
+            detail = f"{metric['baseline']:.4g} (not measured)"
+        lines.append(f"{metric['status'].upper():<12} {metric['name']:<32} {detail}")
+    summary = ", ".join(f"{count} {status}" for status, count in comparison["summary"].items() if count)
+    lines.append(f"threshold {comparison['threshold']:.0%}: {summary or 'no metrics'}")
+    return "\n".join(lines)
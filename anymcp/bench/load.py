@@ -0,0 +1,310 @@
+"""
+End-to-end load generator that drives a real anymcp server through an MCP client
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from mcp import ClientSession
+from mcp.client.stdio import StdioServerParameters, stdio_client
+
+from ..metrics import distribution, is_error
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent.parent
+
+OPERATIONS = ("search_tool", "execute_tool", "list_tools", "create_tool")
+DEFAULT_MIX = {"search_tool": 4, "execute_tool": 4, "list_tools": 1, "create_tool": 1}
+
+# Tool every execute_tool request calls; created before the run starts
+LOAD_TOOL_NAME = "load_echo"
+LOAD_TOOL_CODE = '''"""Echo tool used by the anymcp load generator"""
+__description__ = "Echo a value back (load generator)"
+
+
+def execute(value: int = 0) -> dict:
+    """Return the value it was given"""
+    return {"value": value}
+'''
+# create_tool traffic overwrites this many tools in turn, so the registry stays bounded
+CREATED_TOOL_SLOTS = 8
+SEARCH_KEYWORDS = ("load", "echo", "tool", "value", "missing")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """``"search_tool=4,execute_tool=4"`` as weights; unknown operations are rejected"""
+    mix: Dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight) if weight.strip() else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The traffic mix needs at least one operation with a positive weight")
+    return mix
+
+
+class RequestFactory:
+    """Seeded source of ``(operation, arguments)`` pairs following the traffic mix"""
+
+    def __init__(self, mix: Dict[str, float], seed: int = 0):
+        self.operations = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.operations]
+        self.random = random.Random(seed)
+        self.created = 0
+
+    def next(self) -> Tuple[str, Dict[str, Any]]:
+        operation = self.random.choices(self.operations, self.weights)[0]
+        if operation == "search_tool":
+            return operation, {"keyword": self.random.choice(SEARCH_KEYWORDS)}
+        if operation == "execute_tool":
+            return operation, {"tool_name": LOAD_TOOL_NAME,
+                               "parameters": {"value": self.random.randrange(1000)}}
+        if operation == "create_tool":
+            slot = self.created % CREATED_TOOL_SLOTS
+            self.created += 1
+            return operation, {"name": f"load_created_{slot}", "code": LOAD_TOOL_CODE, "overwrite": True}
+        return operation, {}
+
+
+class LoadRecorder:
+    """Latency samples and errors per operation"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {name: [] for name in OPERATIONS}
+        self.errors: Dict[str, int] = {name: 0 for name in OPERATIONS}
+        self.error_messages: Dict[str, int] = {}
+
+    def record(self, operation: str, latency_ms: float, error: Optional[str]) -> None:
+        self.samples[operation].append(latency_ms)
+        if error is not None:
+            self.errors[operation] += 1
+            message = error[:120]
+            self.error_messages[message] = self.error_messages.get(message, 0) + 1
+
+    def report(self, wall_time: float) -> Dict[str, Any]:
+        operations = {}
+        for name, samples in self.samples.items():
+            if not samples:
+                continue
+            operations[name] = {
+                "requests": len(samples),
+                "errors": self.errors[name],
+                "error_rate": self.errors[name] / len(samples),
+                "latency_ms": distribution(samples)
+            }
+        every = [sample for samples in self.samples.values() for sample in samples]
+        errors = sum(self.errors.values())
+        top_errors = sorted(self.error_messages.items(), key=lambda item: -item[1])[:5]
+        return {
+            "requests": len(every),
+            "errors": errors,
+            "error_rate": errors / len(every) if every else 0.0,
+            "wall_time": wall_time,
+            "throughput": len(every) / wall_time if wall_time > 0 else 0.0,
+            "latency_ms": distribution(every),
+            "operations": operations,
+            "top_errors": [{"message": message, "count": count} for message, count in top_errors]
+        }
+
+
+def _call_error(result) -> Optional[str]:
+    """The error a call_tool result reports, from the protocol flag or the JSON payload"""
+    text = "".join(getattr(item, "text", "") for item in result.content)
+    if result.isError:
+        return text or "call_tool returned isError"
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return None
+    return str(payload.get("error")) if is_error(payload) else None
+
+
+async def _issue(session: ClientSession, recorder: LoadRecorder, operation: str,
+                 arguments: Dict[str, Any], timeout: float, started: float) -> None:
+    try:
+        result = await session.call_tool(operation, arguments, read_timeout_seconds=timedelta(seconds=timeout))
+        error = _call_error(result)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    recorder.record(operation, (time.perf_counter() - started) * 1000, error)
+
+
+async def drive_load(session: ClientSession, mix: Dict[str, float], duration: Optional[float] = 10.0,
+                     requests: Optional[int] = None, concurrency: int = 4, rate: Optional[float] = None,
+                     seed: int = 0, timeout: float = 30.0) -> Dict[str, Any]:
+    """Send traffic through an initialized session and return the report.
+
+    Without ``rate`` this is a closed loop: ``concurrency`` clients each send
+    their next request as soon as the previous one answers. With ``rate``
+    requests start on a fixed schedule (open loop) with at most
+    ``concurrency`` in flight, and latency is measured from each request's
+    scheduled start so queueing behind a slow server is not hidden. The run
+    stops after ``requests`` requests or ``duration`` seconds, whichever
+    comes first.
+    """
+    if duration is None and requests is None:
+        raise ValueError("Give a duration, a request count or both")
+    factory = RequestFactory(mix, seed)
+    recorder = LoadRecorder()
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+    issued = 0
+
+    def more() -> bool:
+        if requests is not None and issued >= requests:
+            return False
+        return deadline is None or time.perf_counter() < deadline
+
+    if rate is None:
+        async def client() -> None:
+            nonlocal issued
+            while more():
+                issued += 1
+                operation, arguments = factory.next()
+                await _issue(session, recorder, operation, arguments, timeout, time.perf_counter())
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    else:
+        in_flight = asyncio.Semaphore(concurrency)
+        tasks = set()
+
+        async def scheduled(operation: str, arguments: Dict[str, Any], due: float) -> None:
+            async with in_flight:
+                await _issue(session, recorder, operation, arguments, timeout, due)
+
+        interval = 1.0 / rate
+        while more():
+            due = start + issued * interval
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                if not more():
+                    break
+            issued += 1
+            operation, arguments = factory.next()
+            task = asyncio.create_task(scheduled(operation, arguments, due))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+    report = recorder.report(time.perf_counter() - start)
+    report["settings"] = {
+        "mix": mix,
+        "duration": duration,
+        "requests": requests,
+        "concurrency": concurrency,
+        "rate": rate,
+        "seed": seed
+    }
+    return report
+
+
+@contextlib.asynccontextmanager
+async def stdio_session(server_args: List[str], cwd: Path, errlog=sys.stderr,
+                        package_root: Path = PACKAGE_ROOT) -> AsyncIterator[ClientSession]:
+    """Start ``python -m anymcp`` from ``package_root`` in ``cwd`` and yield an initialized client session"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(package_root), env.get("PYTHONPATH")]))
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=["-m", "anymcp", *server_args],
+        env=env,
+        cwd=str(cwd)
+    )
+    async with stdio_client(params, errlog=errlog) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            yield session
+
+
+@contextlib.asynccontextmanager
+async def sse_session(url: str) -> AsyncIterator[ClientSession]:
+    """Connect to an already running server over SSE (for servers behind an SSE bridge)"""
+    from mcp.client.sse import sse_client
+
+    async with sse_client(url) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            yield session
+
+
+async def _prepare(session: ClientSession) -> None:
+    result = await session.call_tool("create_tool", {
+        "name": LOAD_TOOL_NAME, "code": LOAD_TOOL_CODE, "overwrite": True
+    })
+    error = _call_error(result)
+    if error is not None:
+        raise RuntimeError(f"Could not create the {LOAD_TOOL_NAME} tool: {error}")
+
+
+async def run_load(mix: Dict[str, float] = DEFAULT_MIX, duration: Optional[float] = 10.0,
+                   requests: Optional[int] = None, concurrency: int = 4, rate: Optional[float] = None,
+                   seed: int = 0, timeout: float = 30.0, server_args: Optional[List[str]] = None,
+                   seed_tools: Optional[Path] = None, sse_url: Optional[str] = None,
+                   workspace: Optional[Path] = None, warmup: int = 5) -> Dict[str, Any]:
+    """Start (or connect to) a server, create the load tool, warm up and drive the traffic.
+
+    A spawned server runs in a scratch workspace whose ``tools/`` directory
+    starts with ``seed_tools``' ``*.py`` files, so the load never touches the
+    project's own tools. ``warmup`` untimed requests go first.
+    """
+    scratch = None
+    if sse_url is None and workspace is None:
+        workspace = scratch = Path(tempfile.mkdtemp(prefix="anymcp_load_"))
+    try:
+        if sse_url is not None:
+            connection = sse_session(sse_url)
+        else:
+            tools_dir = Path(workspace) / "tools"
+            tools_dir.mkdir(parents=True, exist_ok=True)
+            if seed_tools is not None:
+                for path in sorted(Path(seed_tools).glob("*.py")):
+                    shutil.copy2(path, tools_dir / path.name)
+            connection = stdio_session(list(server_args or []), Path(workspace))
+
+        async with connection as session:
+            await _prepare(session)
+            if warmup:
+                await drive_load(session, mix, duration=None, requests=warmup,
+                                 concurrency=1, seed=seed + 1, timeout=timeout)
+            report = await drive_load(session, mix, duration=duration, requests=requests,
+                                      concurrency=concurrency, rate=rate, seed=seed, timeout=timeout)
+        report["settings"]["transport"] = "sse" if sse_url is not None else "stdio"
+        report["settings"]["server_args"] = list(server_args or [])
+        return report
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable summary: totals, then one line per operation"""
+    latency = report["latency_ms"]
+    lines = [
+        f"{report['requests']} requests in {report['wall_time']:.2f}s "
+        f"({report['throughput']:.1f} req/s), {report['errors']} errors ({report['error_rate']:.1%})",
+        f"latency ms: p50 {latency['p50']:.2f}  p95 {latency['p95']:.2f}  "
+        f"p99 {latency['p99']:.2f}  max {latency['max']:.2f}",
+    ]
+    for name, stats in report["operations"].items():
+        op = stats["latency_ms"]
+        lines.append(
+            f"  {name:<14} {stats['requests']:>7} req  {stats['error_rate']:>6.1%} err  "
+            f"p50 {op['p50']:>8.2f}  p95 {op['p95']:>8.2f}  p99 {op['p99']:>8.2f}"
+        )
+    for error in report["top_errors"]:
+        lines.append(f"  error x{error['count']}: {error['message']}")
+    return "\n".join(lines)
@@ -0,0 +1,205 @@
+"""
+Offline replay of recorded call_tool traffic against a candidate build
+"""
+
+import asyncio
+import difflib
+import hashlib
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mcp import ClientSession
+
+from ..metrics import distribution
+from ..recording import UNCOMPARABLE_TOOLS, load_recording, normalize_result
+from .load import PACKAGE_ROOT, stdio_session
+
+# Lines of unified diff kept per mismatching call
+MAX_DIFF_LINES = 40
+
+
+def _calls_to_restore(sessions: List[Dict[str, Any]], snapshots: Dict[str, Dict[str, Any]]) -> set:
+    """Sequence keys of calls whose tool file replay must put in place itself.
+
+    Once a recorded ``create_tool`` has written a tool, replaying that call
+    reproduces its later versions, and restoring snapshots on top could race
+    with it. Only tools that came from outside (present before the recording
+    or edited by other means and never created through MCP) are restored.
+    """
+    created = set()
+    restore = set()
+    for index, recorded in enumerate(sessions):
+        for call in recorded["calls"]:
+            if call["tool"] == "create_tool" and isinstance(call["arguments"].get("name"), str):
+                created.add(call["arguments"]["name"])
+            snapshot = snapshots.get(call.get("tool_sha256"))
+            if snapshot is not None and snapshot["tool"] not in created:
+                restore.add((index, call["seq"]))
+    return restore
+
+
+def _restore_tool(tools_dir: Path, call: Dict[str, Any], snapshots: Dict[str, Dict[str, Any]]) -> None:
+    """Put the tool file back to the version the recorded call hit"""
+    digest = call.get("tool_sha256")
+    snapshot = snapshots.get(digest) if digest else None
+    if snapshot is None:
+        return
+    path = tools_dir / f"{snapshot['tool']}.py"
+    try:
+        if hashlib.sha256(path.read_bytes()).hexdigest() == digest:
+            return
+    except OSError:
+        pass
+    path.write_text(snapshot["code"], encoding="utf-8")
+
+
+def _compare(call: Dict[str, Any], text: str, recorded_tools_dir: str, tools_dir: str) -> Dict[str, Any]:
+    if call["tool"] in UNCOMPARABLE_TOOLS:
+        return {"match": None}
+    replayed = normalize_result(text, tools_dir, call["tool"])
+    if hashlib.sha256(replayed.encode()).hexdigest() == call["result_sha256"]:
+        return {"match": True}
+    outcome: Dict[str, Any] = {"match": False}
+    if "result" in call:
+        recorded = normalize_result(call["result"], recorded_tools_dir, call["tool"])
+        diff = list(difflib.unified_diff(
+            recorded.splitlines(), replayed.splitlines(), "recorded", "replayed", lineterm=""
+        ))
+        outcome["diff"] = "\n".join(diff[:MAX_DIFF_LINES])
+    return outcome
+
+
+async def _replay_call(session: ClientSession, call: Dict[str, Any], recorded_tools_dir: str,
+                       tools_dir: Path, timeout: float) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        result = await session.call_tool(call["tool"], call["arguments"],
+                                         read_timeout_seconds=timedelta(seconds=timeout))
+        text = "".join(getattr(item, "text", "") for item in result.content)
+        error = None
+    except Exception as e:
+        text, error = "", f"{type(e).__name__}: {e}"
+    outcome = {
+        "seq": call["seq"],
+        "tool": call["tool"],
+        "recorded_ms": call["duration_ms"],
+        "replayed_ms": (time.perf_counter() - start) * 1000
+    }
+    if error is not None:
+        outcome.update(match=False, error=error)
+    else:
+        outcome.update(_compare(call, text, recorded_tools_dir, str(tools_dir.resolve())))
+    return outcome
+
+
+async def _replay_session(session: ClientSession, calls: List[Dict[str, Any]], recorded_tools_dir: str,
+                          snapshots: Dict[str, Dict[str, Any]], restore: set, tools_dir: Path,
+                          speed: float, timeout: float) -> List[Dict[str, Any]]:
+    def prepare(call: Dict[str, Any]) -> None:
+        if call["seq"] in restore:
+            _restore_tool(tools_dir, call, snapshots)
+
+    if speed <= 0:
+        # As fast as possible, one call at a time in recorded order
+        outcomes = []
+        for call in calls:
+            prepare(call)
+            outcomes.append(await _replay_call(session, call, recorded_tools_dir, tools_dir, timeout))
+        return outcomes
+
+    start = time.perf_counter()
+
+    async def scheduled(call: Dict[str, Any]) -> Dict[str, Any]:
+        delay = start + call["t"] / speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        prepare(call)
+        return await _replay_call(session, call, recorded_tools_dir, tools_dir, timeout)
+
+    return list(await asyncio.gather(*(scheduled(call) for call in calls)))
+
+
+def _summary(outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    compared = [o for o in outcomes if o["match"] is not None]
+    return {
+        "calls": len(outcomes),
+        "errors": sum(1 for o in outcomes if "error" in o),
+        "compared": len(compared),
+        "mismatches": sum(1 for o in compared if not o["match"]),
+        "recorded_ms": distribution(o["recorded_ms"] for o in outcomes),
+        "replayed_ms": distribution(o["replayed_ms"] for o in outcomes)
+    }
+
+
+async def replay_recording(recording: Path, speed: float = 1.0, server_args: Optional[List[str]] = None,
+                           package_root: Path = PACKAGE_ROOT, timeout: float = 60.0,
+                           workspace: Optional[Path] = None) -> Dict[str, Any]:
+    """Replay every session of a recording and report latency and result differences.
+
+    Each recorded session gets a fresh ``python -m anymcp`` (started from
+    ``package_root``, the candidate build) in one scratch workspace, so tools
+    created in one session are there for the next, as they were when
+    recording. Calls start at their recorded offsets divided by ``speed``;
+    ``speed=0`` replays them back to back. Tools that did not come from a
+    recorded ``create_tool`` are restored to the snapshot each call hit.
+    """
+    data = load_recording(recording)
+    scratch = None
+    if workspace is None:
+        workspace = scratch = Path(tempfile.mkdtemp(prefix="anymcp_replay_"))
+    tools_dir = Path(workspace) / "tools"
+    tools_dir.mkdir(parents=True, exist_ok=True)
+    restore = _calls_to_restore(data["sessions"], data["snapshots"])
+    outcomes: List[Dict[str, Any]] = []
+    start = time.perf_counter()
+    try:
+        for index, recorded in enumerate(data["sessions"]):
+            if not recorded["calls"]:
+                continue
+            async with stdio_session(list(server_args or []), Path(workspace),
+                                     package_root=Path(package_root)) as session:
+                outcomes += await _replay_session(
+                    session, recorded["calls"], recorded["session"]["tools_dir"], data["snapshots"],
+                    {seq for session_index, seq in restore if session_index == index},
+                    tools_dir, speed, timeout
+                )
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    by_tool: Dict[str, List[Dict[str, Any]]] = {}
+    for outcome in outcomes:
+        by_tool.setdefault(outcome["tool"], []).append(outcome)
+    return {
+        "recording": str(recording),
+        "speed": speed,
+        "sessions": len(data["sessions"]),
+        "wall_time": time.perf_counter() - start,
+        **_summary(outcomes),
+        "tools": {name: _summary(items) for name, items in sorted(by_tool.items())},
+        "differences": [o for o in outcomes if o["match"] is False]
+    }
+
+
+def format_replay(report: Dict[str, Any]) -> str:
+    """Summary lines, per-tool latency against the recording, then the differing calls"""
+    speed = "max" if report["speed"] <= 0 else f"{report['speed']:g}x"
+    lines = [
+        f"Replayed {report['calls']} calls from {report['sessions']} session(s) at {speed} speed "
+        f"in {report['wall_time']:.2f}s: {report['mismatches']} of {report['compared']} results differ, "
+        f"{report['errors']} errors"
+    ]
+    for name, stats in report["tools"].items():
+        recorded, replayed = stats["recorded_ms"], stats["replayed_ms"]
+        lines.append(
+            f"  {name:<16} {stats['calls']:>6} calls  p50 {recorded['p50']:>8.2f} -> {replayed['p50']:>8.2f} ms  "
+            f"p95 {recorded['p95']:>8.2f} -> {replayed['p95']:>8.2f} ms"
+        )
+    for difference in report["differences"]:
+        lines.append(f"call {difference['seq']} ({difference['tool']}) differs:")
+        lines.append(difference.get("error") or difference.get("diff") or "  (result too large to diff)")
+    return "\n".join(lines)
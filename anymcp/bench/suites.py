@@ -0,0 +1,235 @@
+"""
+Benchmarks for the execution, discovery and serialization hot paths
+"""
+
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from mcp.types import CallToolResult
+
+from ..metrics import distribution
+from ..server import serialize_result
+from ..tool_manager import EXECUTION_MODES, ToolManager
+
+SUITES = ("execute", "discovery", "throughput", "serialize")
+
+DEFAULT_SIZES = (10, 1000, 10000, 50000)
+DEFAULT_CONCURRENCY = (1, 4, 16)
+
+PERF_TOOL_PATTERN = "perf_tool_*.py"
+FALLBACK_PERF_TOOL = "def execute(): return 0\n"
+
+SYNTHETIC_TOOL = '''"""Synthetic tool {index} for registry benchmarks"""
+__description__ = "Synthetic benchmark tool number {index}"
+__version__ = "1.0.0"
+
+
+def execute(x: int = 0, label: str = "tool{index}") -> dict:
+    """Return the input with this tool's label"""
+    return {{"label": label, "x": x}}
+'''
+
+
+def latency_entry(samples_ms: Iterable[float]) -> Dict[str, Any]:
+    """Result entry for a latency benchmark; ``value`` (the p50) is what compare checks"""
+    summary = distribution(samples_ms)
+    return {"unit": "ms", "better": "lower", "value": summary["p50"], **summary}
+
+
+def throughput_entry(calls: int, seconds: float, errors: int = 0) -> Dict[str, Any]:
+    return {
+        "unit": "calls/s",
+        "better": "higher",
+        "value": calls / seconds if seconds > 0 else 0.0,
+        "calls": calls,
+        "seconds": seconds,
+        "errors": errors
+    }
+
+
+async def _time_calls(call: Callable[[], Awaitable[Any]], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def copy_perf_tools(source_dir: Path, tools_dir: Path) -> List[str]:
+    """Copy the repo's ``perf_tool_*.py`` tools into ``tools_dir``; write one if there are none"""
+    tools_dir.mkdir(parents=True, exist_ok=True)
+    names = []
+    for path in sorted(Path(source_dir).glob(PERF_TOOL_PATTERN)):
+        shutil.copy2(path, tools_dir / path.name)
+        names.append(path.stem)
+    if not names:
+        (tools_dir / "perf_tool_000.py").write_text(FALLBACK_PERF_TOOL)
+        names.append("perf_tool_000")
+    return names
+
+
+def write_registry(tools_dir: Path, size: int) -> None:
+    """Fill ``tools_dir`` with ``size`` small synthetic tool files"""
+    tools_dir.mkdir(parents=True, exist_ok=True)
+    for index in range(size):
+        (tools_dir / f"synthetic_{index:05d}.py").write_text(SYNTHETIC_TOOL.format(index=index))
+
+
+async def bench_execute(tools_dir: Path, tool_names: List[str], modes: Iterable[str],
+                        iterations: int) -> Dict[str, Dict[str, Any]]:
+    """execute_tool latency per execution mode, cycling through the perf tools"""
+    results = {}
+    for mode in modes:
+        manager = ToolManager(tools_dir=str(tools_dir), test_runner="subprocess", execution_mode=mode)
+        try:
+            # One untimed call per tool so worker mode is measured warm
+            for name in tool_names:
+                await manager.execute_tool(name, {})
+            calls = iter(range(iterations))
+            samples = await _time_calls(
+                lambda: manager.execute_tool(tool_names[next(calls) % len(tool_names)], {}),
+                iterations
+            )
+            results[f"execute_tool/{mode}"] = latency_entry(samples)
+        finally:
+            await manager.shutdown()
+    return results
+
+
+async def bench_discovery(workdir: Path, sizes: Iterable[int], repeat: int) -> Dict[str, Dict[str, Any]]:
+    """search_tools / list_tools latency against synthetic registries"""
+    results = {}
+    for size in sizes:
+        tools_dir = workdir / f"registry_{size}" / "tools"
+        write_registry(tools_dir, size)
+        manager = ToolManager(tools_dir=str(tools_dir), test_runner="subprocess")
+        try:
+            results[f"search_tools/{size}"] = latency_entry(
+                await _time_calls(lambda: manager.search_tools("benchmark"), repeat)
+            )
+
+            async def list_call() -> List[str]:
+                return manager.list_tools()
+
+            results[f"list_tools/{size}"] = latency_entry(await _time_calls(list_call, repeat))
+        finally:
+            await manager.shutdown()
+            shutil.rmtree(tools_dir.parent, ignore_errors=True)
+    return results
+
+
+async def bench_throughput(tools_dir: Path, tool_names: List[str], modes: Iterable[str],
+                           levels: Iterable[int], iterations: int) -> Dict[str, Dict[str, Any]]:
+    """Completed execute_tool calls per second at several concurrency levels"""
+    results = {}
+    for mode in modes:
+        for level in levels:
+            manager = ToolManager(tools_dir=str(tools_dir), test_runner="subprocess",
+                                  execution_mode=mode, pool_size=level)
+            try:
+                in_flight = asyncio.Semaphore(level)
+
+                async def call(index: int) -> Dict[str, Any]:
+                    async with in_flight:
+                        return await manager.execute_tool(tool_names[index % len(tool_names)], {})
+
+                await asyncio.gather(*(call(index) for index in range(level)))
+                start = time.perf_counter()
+                outcomes = await asyncio.gather(*(call(index) for index in range(iterations)))
+                elapsed = time.perf_counter() - start
+                errors = sum(1 for outcome in outcomes if not outcome["success"])
+                results[f"throughput/{mode}/c{level}"] = throughput_entry(iterations, elapsed, errors)
+            finally:
+                await manager.shutdown()
+    return results
+
+
+def serialization_payloads() -> Dict[str, Any]:
+    """Representative built-in results, from a tiny execute result to a large search listing"""
+    return {
+        "execute_small": {"success": True, "result": 42},
+        "search_1000": [
+            {"name": f"tool_{i}", "description": f"Synthetic tool {i}", "path": f"tools/tool_{i}.py"}
+            for i in range(1000)
+        ],
+        "execute_1mb": {"success": True, "result": "x" * (1024 * 1024)},
+    }
+
+
+def bench_serialize(repeat: int) -> Dict[str, Dict[str, Any]]:
+    """call_tool's result serialization plus the CallToolResult JSON written to the client"""
+    results = {}
+    for name, payload in serialization_payloads().items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            CallToolResult(content=serialize_result(payload)).model_dump_json()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[f"serialize/{name}"] = latency_entry(samples)
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+async def run_benchmarks(suites: Iterable[str] = SUITES, perf_tools_dir: Path = Path("tools"),
+                         sizes: Iterable[int] = DEFAULT_SIZES,
+                         concurrency: Iterable[int] = DEFAULT_CONCURRENCY,
+                         modes: Iterable[str] = EXECUTION_MODES, iterations: int = 20,
+                         repeat: int = 5, workdir: Optional[Path] = None) -> Dict[str, Any]:
+    """Run the selected suites and return ``{"environment", "settings", "results"}``"""
+    suites = list(suites)
+    unknown = [name for name in suites if name not in SUITES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark suite(s): {', '.join(unknown)}")
+    modes = list(modes)
+    settings = {
+        "suites": suites,
+        "sizes": list(sizes),
+        "concurrency": list(concurrency),
+        "modes": modes,
+        "iterations": iterations,
+        "repeat": repeat
+    }
+    scratch = Path(tempfile.mkdtemp(prefix="anymcp_bench_", dir=workdir))
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        tools_dir = scratch / "perf" / "tools"
+        tool_names = copy_perf_tools(perf_tools_dir, tools_dir)
+        if "execute" in suites:
+            results.update(await bench_execute(tools_dir, tool_names, modes, iterations))
+        if "discovery" in suites:
+            results.update(await bench_discovery(scratch, settings["sizes"], repeat))
+        if "throughput" in suites:
+            results.update(await bench_throughput(tools_dir, tool_names, modes,
+                                                  settings["concurrency"], iterations))
+        if "serialize" in suites:
+            results.update(bench_serialize(repeat))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {"environment": environment(), "settings": settings, "results": results}
+
+
+def write_results(results: Dict[str, Any], path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2))
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
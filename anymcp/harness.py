@@ -0,0 +1,124 @@
+"""
+Batched execution of table-driven tool scenarios for behave step definitions.
+
+The first ``I execute "<tool>" with parameters:`` step of a feature collects
+the parameter tables of every such step in the feature and runs them through
+``ToolManager.execute_tool_batch``, so the tool is loaded once per feature
+rather than spawned once per scenario. Each step then picks its own result
+from the batch, so behave still reports one result per scenario.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# behave userdata key (``-D anymcp_tools_dir=...``) naming the tools directory under test
+TOOLS_DIR_USERDATA = "anymcp_tools_dir"
+# behave userdata key naming a JSON-lines file that budget steps append their measurements to
+BUDGET_REPORT_USERDATA = "anymcp_budget_report"
+
+EXECUTE_STEP = re.compile(r'^I execute "(?P<tool>[^"]+)" with parameters:?$')
+
+
+def table_params(table) -> Dict[str, Any]:
+    """Parameters from a ``| parameter | value |`` table, with numbers converted"""
+    params: Dict[str, Any] = {}
+    for row in table or []:
+        value = row["value"]
+        for convert in (int, float):
+            try:
+                value = convert(value)
+                break
+            except ValueError:
+                continue
+        params[row["parameter"]] = value
+    return params
+
+
+def _case_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def feature_cases(feature, tool_name: str) -> List[Dict[str, Any]]:
+    """Distinct parameter sets the feature's execute steps pass to ``tool_name``"""
+    cases: Dict[str, Dict[str, Any]] = {}
+    for scenario in feature.walk_scenarios():
+        for step in scenario.all_steps:
+            match = EXECUTE_STEP.match(step.name)
+            if match and match.group("tool") == tool_name and step.table is not None:
+                params = table_params(step.table)
+                cases.setdefault(_case_key(params), params)
+    return list(cases.values())
+
+
+def _tool_digest(tool_manager, tool_name: str) -> Optional[str]:
+    try:
+        return hashlib.sha256((Path(tool_manager.tools_dir) / f"{tool_name}.py").read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def result_for_step(context, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """The ``execute_tool``-shaped result for one step, batching the whole feature.
+
+    Batches are cached on the feature and keyed by the tool file's content, so
+    a scenario that rewrites the tool gets a fresh batch. Parameters that were
+    not part of the batch (or a batch that failed as a whole) fall back to a
+    single ``execute_tool`` call.
+    """
+    tool_manager = context.tool_manager
+    feature = getattr(context, "feature", None)
+    if feature is None:
+        return asyncio.run(tool_manager.execute_tool(tool_name, params))
+
+    batches = getattr(feature, "_anymcp_batches", None)
+    if batches is None:
+        batches = feature._anymcp_batches = {}
+    digest = _tool_digest(tool_manager, tool_name)
+    batch = batches.get(tool_name)
+    if batch is None or batch["digest"] != digest:
+        cases = feature_cases(feature, tool_name)
+        response = asyncio.run(tool_manager.execute_tool_batch(tool_name, cases))
+        results = response.get("results", []) if response["success"] else []
+        batch = {
+            "digest": digest,
+            "results": {_case_key(case): result for case, result in zip(cases, results)}
+        }
+        batches[tool_name] = batch
+
+    result = batch["results"].get(_case_key(params))
+    if result is None:
+        result = asyncio.run(tool_manager.execute_tool(tool_name, params))
+    return result
+
+
+def record_budget(context, budget: str, limit: float, measured: float,
+                  measurement: Dict[str, Any]) -> None:
+    """Append one budget check to the report file ToolManager asked for, if any"""
+    path = context.config.userdata.get(BUDGET_REPORT_USERDATA)
+    if not path:
+        return
+    entry = {
+        "scenario": context.scenario.name,
+        "tool": context.executed["tool"],
+        "parameters": context.executed["parameters"],
+        "budget": budget,
+        "limit": limit,
+        "measured": measured,
+        "passed": measured <= limit,
+        "measurement": measurement
+    }
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def load_budgets(path: Path) -> List[Dict[str, Any]]:
+    """Budget checks written by ``record_budget``; empty if none ran"""
+    try:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    return [json.loads(line) for line in lines if line.strip()]
@@ -0,0 +1,113 @@
+"""
+Background jobs: built-in calls that keep running after ``submit_job`` returns.
+
+The table keeps each job's state, result and output for polling. Output is
+addressed by absolute byte offsets, so a client tails it by passing back the
+``next_offset`` it was given; past a size limit the oldest bytes are dropped
+and reads from before them start at the oldest byte still kept.
+"""
+
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+JOB_KINDS = ("execute_tool", "run_test", "shell_command")
+FINISHED_STATES = ("succeeded", "failed", "cancelled")
+# Finished jobs kept for polling; the oldest are forgotten first
+MAX_FINISHED_JOBS = 100
+MAX_JOB_OUTPUT = 8 * 1024 * 1024
+
+
+class JobOutput:
+    """Append-only output of one job, keeping at most ``limit`` bytes"""
+
+    def __init__(self, limit: int = MAX_JOB_OUTPUT):
+        self.limit = limit
+        self.data = bytearray()
+        # Absolute offset of data[0]
+        self.start = 0
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.data)
+
+    def append(self, chunk: bytes) -> None:
+        self.data += chunk
+        excess = len(self.data) - self.limit
+        if excess > 0:
+            del self.data[:excess]
+            self.start += excess
+
+    def read(self, offset: int, max_bytes: int) -> Tuple[bytes, int]:
+        """Up to ``max_bytes`` from ``offset`` (or the oldest kept byte), and the offset they start at"""
+        offset = min(max(offset, self.start), self.end)
+        position = offset - self.start
+        return bytes(self.data[position:position + max_bytes]), offset
+
+
+class Job:
+    """One submitted call: its arguments, state, result and output"""
+
+    def __init__(self, kind: str, arguments: Dict[str, Any], output_limit: int = MAX_JOB_OUTPUT):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.arguments = arguments
+        self.status = "queued"
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.output = JobOutput(output_limit)
+        self.task = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def start(self) -> None:
+        self.status = "running"
+        self.started = time.time()
+
+    def finish(self, status: str, result: Dict[str, Any]) -> None:
+        self.status = status
+        self.result = result
+        self.finished = time.time()
+
+    def describe(self, with_result: bool = True) -> Dict[str, Any]:
+        info = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed": ((self.finished or time.time()) - self.started) if self.started else None,
+            "output_bytes": self.output.end
+        }
+        if with_result and self.result is not None:
+            info["result"] = self.result
+        return info
+
+
+class JobTable:
+    """Jobs by id, forgetting the oldest finished ones beyond ``max_finished``"""
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS, output_limit: int = MAX_JOB_OUTPUT):
+        self.max_finished = max_finished
+        self.output_limit = output_limit
+        self._jobs: Dict[str, Job] = {}
+
+    def create(self, kind: str, arguments: Dict[str, Any]) -> Job:
+        job = Job(kind, arguments, self.output_limit)
+        self._jobs[job.job_id] = job
+        finished = [j for j in self._jobs.values() if j.done]
+        for old in sorted(finished, key=lambda j: j.finished)[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[old.job_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        """All known jobs, oldest submission first"""
+        return sorted(self._jobs.values(), key=lambda j: j.submitted)
@@ -0,0 +1,93 @@
+"""
+Event-loop lag monitor: notices when synchronous work blocks the asyncio loop
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from .metrics import MetricsRegistry
+
+logger = logging.getLogger("anymcp.loop")
+
+
+class LoopMonitor:
+    """Samples scheduling delay and reports stalls with the blocking stack.
+
+    A heartbeat coroutine sleeps for ``interval`` and measures how late it
+    wakes up. A watchdog thread watches the heartbeat; when it goes stale for
+    longer than ``threshold`` it captures the loop thread's current stack,
+    which is the code holding the loop at that moment.
+    """
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None,
+                 interval: float = 0.05, threshold: float = 0.25):
+        self.metrics = metrics
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls = 0
+        self._last_beat = time.monotonic()
+        self._beat = 0
+        self._captured_beat = -1
+        self._blocking_stack: Optional[str] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def run(self) -> None:
+        """Heartbeat until cancelled; runs the watchdog thread alongside"""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="anymcp-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        try:
+            while True:
+                scheduled = loop.time()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, loop.time() - scheduled - self.interval)
+                self._last_beat = time.monotonic()
+                self._beat += 1
+                if self.metrics is not None:
+                    self.metrics.observe_server("loop_lag", lag)
+                if lag >= self.threshold:
+                    self._report_stall(lag)
+        finally:
+            self._stop.set()
+
+    def _report_stall(self, lag: float) -> None:
+        self.stalls += 1
+        if self.metrics is not None:
+            self.metrics.increment("loop_stalls")
+        stack, self._blocking_stack = self._blocking_stack, None
+        if stack:
+            logger.warning(
+                "Event loop stalled for %.0f ms; it was blocked in:\n%s", lag * 1000, stack
+            )
+        else:
+            logger.warning("Event loop stalled for %.0f ms", lag * 1000)
+
+    def _watch(self) -> None:
+        poll = max(self.threshold / 4, 0.005)
+        while not self._stop.wait(poll):
+            beat = self._beat
+            if beat == self._captured_beat:
+                continue
+            if time.monotonic() - self._last_beat < self.threshold + self.interval:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._blocking_stack = "".join(traceback.format_stack(frame, limit=20))
+            self._captured_beat = beat
+
+
+def enable_debug(loop: asyncio.AbstractEventLoop, slow_callback: float = 0.1) -> None:
+    """Turn on asyncio debug mode so slow callbacks are reported by asyncio itself"""
+    loop.set_debug(True)
+    loop.slow_callback_duration = slow_callback
+    logging.getLogger("asyncio").setLevel(logging.DEBUG)
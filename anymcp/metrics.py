@@ -0,0 +1,234 @@
+"""
+Low-overhead latency metrics for tools and built-in MCP functions
+"""
+
+import asyncio
+import contextlib
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Log-bucketed histogram of durations in seconds.
+
+    Recording is a single log() and dict increment; quantiles are accurate to
+    the bucket width (about 5%), which is plenty for p50/p95/p99 reporting.
+    """
+
+    GROWTH = 1.05
+    MIN_VALUE = 1e-6
+
+    __slots__ = ("count", "sum", "min", "max", "_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._buckets: Dict[int, int] = {}
+
+    def record(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        index = int(math.log(max(value, self.MIN_VALUE) / self.MIN_VALUE, self.GROWTH))
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                upper = self.MIN_VALUE * self.GROWTH ** (index + 1)
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        result = {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max
+        }
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = self.quantile(q)
+        return result
+
+
+def distribution(samples: Iterable[float]) -> Dict[str, float]:
+    """Exact count/mean/min/max and p50/p95/p99 (nearest rank) of a small sample"""
+    values = sorted(samples)
+    if not values:
+        return {"count": 0, "mean": 0.0, "min": 0.0, "max": 0.0,
+                **{f"p{int(q * 100)}": 0.0 for q in QUANTILES}}
+    result = {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "min": values[0],
+        "max": values[-1]
+    }
+    for q in QUANTILES:
+        result[f"p{int(q * 100)}"] = values[max(0, math.ceil(q * len(values)) - 1)]
+    return result
+
+
+class _CallStats:
+    __slots__ = ("calls", "errors", "phases")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.phases: Dict[str, Histogram] = {}
+
+
+class MetricsRegistry:
+    """Per-tool and per-built-in call counts, error counts and phase histograms"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._stats: Dict[Tuple[str, str], _CallStats] = {}
+        self._counters: Dict[str, int] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def _get(self, kind: str, name: str) -> _CallStats:
+        key = (kind, name)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _CallStats()
+        return stats
+
+    def count_call(self, kind: str, name: str, error: bool = False) -> None:
+        stats = self._get(kind, name)
+        stats.calls += 1
+        if error:
+            stats.errors += 1
+
+    def observe(self, kind: str, name: str, phase: str, seconds: float) -> None:
+        stats = self._get(kind, name)
+        histogram = stats.phases.get(phase)
+        if histogram is None:
+            histogram = stats.phases[phase] = Histogram()
+        histogram.record(seconds)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """Bump a server-wide counter"""
+        self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def observe_server(self, name: str, seconds: float) -> None:
+        """Record into a server-wide histogram such as event-loop lag"""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = Histogram()
+        histogram.record(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, kind: str, name: str, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(kind, name, phase, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counts and p50/p95/p99 per phase, grouped by kind"""
+        grouped: Dict[str, Dict[str, Any]] = {"tools": {}, "builtins": {}}
+        for (kind, name), stats in sorted(self._stats.items()):
+            grouped.setdefault(f"{kind}s", {})[name] = {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "phases": {
+                    phase: histogram.summary()
+                    for phase, histogram in stats.phases.items()
+                }
+            }
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "counters": dict(self._counters),
+            "histograms": {
+                name: histogram.summary()
+                for name, histogram in sorted(self._histograms.items())
+            },
+            **grouped
+        }
+
+    def to_prometheus(self) -> str:
+        """Render the registry in the Prometheus text exposition format"""
+        lines = [
+            "# HELP anymcp_calls_total Calls handled, by kind and name",
+            "# TYPE anymcp_calls_total counter"
+        ]
+        for (kind, name), stats in sorted(self._stats.items()):
+            lines.append(f'anymcp_calls_total{{kind="{kind}",name="{_escape(name)}"}} {stats.calls}')
+        lines += [
+            "# HELP anymcp_errors_total Calls that returned an error",
+            "# TYPE anymcp_errors_total counter"
+        ]
+        for (kind, name), stats in sorted(self._stats.items()):
+            lines.append(f'anymcp_errors_total{{kind="{kind}",name="{_escape(name)}"}} {stats.errors}')
+        lines += [
+            "# HELP anymcp_phase_seconds Time spent per call phase",
+            "# TYPE anymcp_phase_seconds summary"
+        ]
+        for (kind, name), stats in sorted(self._stats.items()):
+            for phase, histogram in stats.phases.items():
+                labels = f'kind="{kind}",name="{_escape(name)}",phase="{phase}"'
+                for q in QUANTILES:
+                    lines.append(f'anymcp_phase_seconds{{{labels},quantile="{q}"}} {histogram.quantile(q):.6f}')
+                lines.append(f"anymcp_phase_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"anymcp_phase_seconds_count{{{labels}}} {histogram.count}")
+        for name, histogram in sorted(self._histograms.items()):
+            lines.append(f"# TYPE anymcp_{name}_seconds summary")
+            for q in QUANTILES:
+                lines.append(f'anymcp_{name}_seconds{{quantile="{q}"}} {histogram.quantile(q):.6f}')
+            lines.append(f"anymcp_{name}_seconds_sum {histogram.sum:.6f}")
+            lines.append(f"anymcp_{name}_seconds_count {histogram.count}")
+        for counter, value in sorted(self._counters.items()):
+            lines.append(f"# TYPE anymcp_{counter}_total counter")
+            lines.append(f"anymcp_{counter}_total {value}")
+        lines.append(f"anymcp_uptime_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        _write_atomic(Path(path), self.to_prometheus())
+
+    async def export_periodically(self, path: Path, interval: float = 15.0) -> None:
+        """Rewrite the Prometheus text file every ``interval`` seconds"""
+        try:
+            while True:
+                # Render on the loop, where the registry is mutated; write off it
+                await asyncio.to_thread(_write_atomic, Path(path), self.to_prometheus())
+                await asyncio.sleep(interval)
+        finally:
+            self.write_prometheus(path)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Replace the file in one step so scrapers never see a partial file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def is_error(result: Any) -> bool:
+    """Whether a ToolManager result dict reports a failure"""
+    if not isinstance(result, dict):
+        return False
+    if "success" in result:
+        return result["success"] is False
+    return result.get("error") is not None
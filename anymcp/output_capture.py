@@ -0,0 +1,83 @@
+"""
+Bounded capture of a child process's output streams.
+
+A stream is read in chunks as it is produced. The first and last bytes of
+it are kept, up to a cap, and everything in between is only counted, so a
+command printing gigabytes costs the server no more memory than the cap.
+The whole stream can also be spilled to a file, and every chunk handed to a
+callback (used to stream output to the client while the command runs).
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Bytes kept per stream by default: half from the start, half from the end
+DEFAULT_OUTPUT_LIMIT = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+OnChunk = Callable[[str, bytes], Awaitable[None]]
+
+
+class StreamCapture:
+    """Head, tail and byte count of one stream, plus an optional spill file"""
+
+    def __init__(self, name: str, limit: int = DEFAULT_OUTPUT_LIMIT, spill_path: Optional[Path] = None):
+        if limit < 0:
+            raise ValueError("The output limit cannot be negative")
+        self.name = name
+        self.head_limit = limit - limit // 2
+        self.tail_limit = limit // 2
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.spill_path = spill_path
+        self._spill = open(spill_path, "wb") if spill_path is not None else None
+
+    def feed(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        if self._spill is not None:
+            self._spill.write(chunk)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk and self.tail_limit:
+            self.tail += chunk
+            # Trim only once the tail is twice its size, so trimming stays amortized O(1)
+            if len(self.tail) > 2 * self.tail_limit:
+                del self.tail[:-self.tail_limit]
+
+    @property
+    def omitted(self) -> int:
+        return self.total - len(self.head) - min(len(self.tail), self.tail_limit)
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def text(self) -> str:
+        """The kept output, with a marker where bytes were dropped"""
+        tail = bytes(self.tail[-self.tail_limit:]) if self.tail_limit else b""
+        if not self.omitted:
+            return (bytes(self.head) + tail).decode(errors="replace")
+        marker = f"\n... [{self.omitted} bytes omitted] ...\n"
+        return bytes(self.head).decode(errors="replace") + marker + tail.decode(errors="replace")
+
+    def summary(self) -> Dict[str, Any]:
+        summary = {"bytes": self.total, "truncated": self.omitted > 0}
+        if self.spill_path is not None:
+            summary["spill_file"] = str(self.spill_path)
+        return summary
+
+
+async def drain(stream: asyncio.StreamReader, capture: StreamCapture, on_chunk: Optional[OnChunk] = None) -> None:
+    """Read ``stream`` to EOF into ``capture``, passing each chunk to ``on_chunk``"""
+    while True:
+        chunk = await stream.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        capture.feed(chunk)
+        if on_chunk is not None:
+            await on_chunk(capture.name, chunk)
@@ -0,0 +1,172 @@
+"""
+Append-only capture of call_tool traffic for offline replay.
+
+A recording is a JSON-lines file. Each server run appends a ``session``
+header, then one ``call`` line per ``call_tool`` request with its start
+offset, duration and result digest. The content of every tool file a call
+hits is stored once per distinct version as a ``snapshot`` line, so replay
+can rebuild the registry exactly as each call saw it.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RECORDING_VERSION = 1
+# Results up to this size are stored verbatim for diffs; larger ones only as a digest
+MAX_RECORDED_RESULT = 64 * 1024
+
+# Result fields that differ from run to run and are left out of comparisons
+VOLATILE_KEYS = frozenset({
+    "duration", "wall_time", "cold_ms", "latency_ms", "throughput", "peak_rss_mb",
+    "measurement", "profile", "slowest"
+})
+# Built-ins whose whole result is a measurement of the server itself
+UNCOMPARABLE_TOOLS = frozenset({"server_stats", "benchmark_tool"})
+
+# Built-ins that list tools in directory order, and the result field holding
+# the list (None: the whole result); only these lists are compared unordered
+TOOL_LISTINGS = {"search_tool": None, "list_tools": "tools"}
+
+TOOLS_DIR_PLACEHOLDER = "<tools>"
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items() if key not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def _unordered(items: Any) -> Any:
+    if not isinstance(items, list):
+        return items
+    return sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+
+
+def normalize_result(text: str, tools_dir: str, tool: Optional[str] = None) -> str:
+    """A call_tool result with timings dropped and the tools path neutral.
+
+    For ``tool`` in ``TOOL_LISTINGS`` the order of the listed tools is
+    ignored too; every other list keeps its order, since a change in it
+    can be a real regression.
+    """
+    text = text.replace(tools_dir, TOOLS_DIR_PLACEHOLDER)
+    try:
+        value = _canonical(json.loads(text))
+    except ValueError:
+        return text
+    if tool in TOOL_LISTINGS:
+        field = TOOL_LISTINGS[tool]
+        if field is None:
+            value = _unordered(value)
+        elif isinstance(value, dict) and field in value:
+            value[field] = _unordered(value[field])
+    return json.dumps(value, indent=2, sort_keys=True)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class TrafficRecorder:
+    """Appends the calls of one server session to a recording file"""
+
+    def __init__(self, path: Path, tools_dir: Path, max_result_bytes: int = MAX_RECORDED_RESULT):
+        self.path = Path(path)
+        self.tools_dir = Path(tools_dir)
+        self.max_result_bytes = max_result_bytes
+        self._tools_dir_text = str(self.tools_dir.resolve())
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._snapshots = set()
+        self._start = time.perf_counter()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._write({
+            "type": "session",
+            "version": RECORDING_VERSION,
+            "started": time.time(),
+            "tools_dir": self._tools_dir_text
+        })
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def snapshot(self, arguments: Dict[str, Any]) -> Optional[str]:
+        """Digest of the tool file a call targets, storing its content the first time it is seen"""
+        tool_name = arguments.get("tool_name") if isinstance(arguments, dict) else None
+        if not isinstance(tool_name, str):
+            return None
+        try:
+            data = (self.tools_dir / f"{tool_name}.py").read_bytes()
+        except OSError:
+            return None
+        digest = _digest(data)
+        if digest not in self._snapshots:
+            self._snapshots.add(digest)
+            self._write({
+                "type": "snapshot",
+                "tool": tool_name,
+                "sha256": digest,
+                "code": data.decode("utf-8", errors="replace")
+            })
+        return digest
+
+    def record(self, tool: str, arguments: Dict[str, Any], started: float, duration: float,
+               text: str, error: bool, tool_sha256: Optional[str] = None) -> None:
+        """One ``call_tool`` request; ``started`` is a ``time.perf_counter()`` value"""
+        self._seq += 1
+        entry = {
+            "type": "call",
+            "seq": self._seq,
+            "t": round(started - self._start, 6),
+            "tool": tool,
+            "arguments": arguments,
+            "duration_ms": round(duration * 1000, 3),
+            "error": error,
+            "result_sha256": _digest(normalize_result(text, self._tools_dir_text, tool).encode())
+        }
+        if tool_sha256 is not None:
+            entry["tool_sha256"] = tool_sha256
+        if len(text) <= self.max_result_bytes:
+            entry["result"] = text
+        self._write(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def load_recording(path: Path) -> Dict[str, Any]:
+    """``{"sessions": [{"session", "calls"}], "snapshots": {sha256: snapshot}}``"""
+    sessions: List[Dict[str, Any]] = []
+    snapshots: Dict[str, Dict[str, Any]] = {}
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a torn last line; everything before it is intact
+                continue
+            kind = record.get("type")
+            if kind == "session":
+                if record.get("version") != RECORDING_VERSION:
+                    raise ValueError(f"{path}:{number}: unsupported recording version {record.get('version')}")
+                sessions.append({"session": record, "calls": []})
+            elif kind == "snapshot":
+                snapshots[record["sha256"]] = record
+            elif kind == "call":
+                if not sessions:
+                    raise ValueError(f"{path}:{number}: call recorded before any session header")
+                sessions[-1]["calls"].append(record)
+    return {"sessions": sessions, "snapshots": snapshots}
@@ -0,0 +1,108 @@
+"""
+Cache of passing feature results, keyed by the content of everything they depend on
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .sharding import BEHAVE_CONFIG_FILES
+
+GENERATED_FEATURE_PREFIX = "test_"
+# Per-tool step modules written by create_tool_test before the shared step library
+GENERATED_STEPS_PATTERN = "test_?*_steps.py"
+# This package: hand-written features exercise its modules, and the
+# features/steps stubs re-export its step library
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+def feature_inputs(feature_file: Path, project_dir: Path, tools_dir: Path) -> List[Path]:
+    """Files whose content decides the outcome of a feature file.
+
+    That is the feature itself, ``environment.py``, the behave config, the
+    shared step modules, and for a generated ``features/test_<name>.feature``
+    ``tools/<name>.py`` and any legacy ``test_<name>_steps.py``. Legacy step
+    modules generated for other tools are left out, so adding a test for one
+    tool does not invalidate every other feature. The sources of this
+    package count too, through ``package_digest``.
+    """
+    features_dir = feature_file.parent
+    steps_dir = features_dir / "steps"
+    stem = feature_file.stem
+    own_steps = f"{stem}_steps.py"
+    inputs = [feature_file, features_dir / "environment.py"]
+    inputs += [project_dir / name for name in BEHAVE_CONFIG_FILES]
+    if steps_dir.is_dir():
+        for path in sorted(steps_dir.glob("*.py")):
+            generated = fnmatch.fnmatch(path.name, GENERATED_STEPS_PATTERN)
+            if not generated or path.name == own_steps:
+                inputs.append(path)
+    if stem.startswith(GENERATED_FEATURE_PREFIX):
+        inputs.append(tools_dir / f"{stem[len(GENERATED_FEATURE_PREFIX):]}.py")
+    return inputs
+
+
+def package_digest(package_dir: Optional[Path] = None) -> str:
+    """SHA-256 over every module of this package (or ``package_dir``), by relative path and content"""
+    package_dir = package_dir or PACKAGE_DIR
+    digest = hashlib.sha256()
+    for path in sorted(package_dir.rglob("*.py")):
+        digest.update(path.relative_to(package_dir).as_posix().encode())
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def fingerprint(paths: List[Path], salt: str = "") -> str:
+    """SHA-256 over ``salt`` and the names and contents of ``paths``; missing files count too"""
+    digest = hashlib.sha256(salt.encode())
+    for path in paths:
+        digest.update(path.name.encode())
+        try:
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+        except OSError:
+            digest.update(b"<missing>")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """JSON file mapping feature files to the fingerprint and report of their last passing run"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def lookup(self, key: str, digest: str) -> Optional[Dict[str, Any]]:
+        """The cached entry for ``key`` if it was recorded for the same inputs"""
+        entry = self._load().get(key)
+        if entry is not None and entry.get("fingerprint") == digest:
+            return entry
+        return None
+
+    def record(self, key: str, digest: str, features: List[Dict[str, Any]]) -> None:
+        self._load()[key] = {
+            "fingerprint": digest,
+            "recorded": time.time(),
+            "features": features
+        }
+
+    def forget(self, key: str) -> None:
+        self._load().pop(key, None)
+
+    def save(self) -> None:
+        entries = self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(entries), encoding="utf-8")
+        os.replace(tmp_path, self.path)
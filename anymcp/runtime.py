@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Shared entry point that runs tool files.
+
+``python -m anymcp.runtime <tool>`` (or this file run by path, which skips
+importing the package) loads a tool as a module and answers framed requests
+on stdin until it closes. A frame is the payload's length in ASCII digits, a
+newline, then that many bytes; requests carry the JSON parameters object and
+each gets one framed ``{"output"}`` or ``{"error"}`` response on stdout.
+Anything the tool prints goes to stderr so it cannot corrupt the framing.
+
+``<tool> --params-fd N`` answers a single request whose parameters the
+caller left in inherited file descriptor N (a memfd for large payloads, so
+they are neither copied through a pipe nor limited by ``ARG_MAX``).
+``<tool> PARAMS_JSON`` runs once and prints the plain result instead, the
+way the ``__main__`` block every tool file used to carry did. ``<tool>`` is a
+path, or a name looked up in ``./tools``; ``--origin PATH`` runs a store
+object as the working copy at PATH (see ``load_tool``). Only the standard library is used,
+and no argument parser, so starting it costs as little as possible.
+"""
+
+import contextlib
+import importlib.machinery
+import importlib.util
+import json
+import os
+import sys
+import traceback
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+USAGE = "usage: python -m anymcp.runtime <tool> [--origin PATH] [PARAMS_JSON | --params-fd N]"
+
+
+def encode_frame(payload: bytes) -> bytes:
+    return b"%d\n" % len(payload) + payload
+
+
+def read_frame(stream: BinaryIO) -> Optional[bytes]:
+    """Next frame's payload, or ``None`` at a clean end of stream"""
+    header = stream.readline()
+    if not header:
+        return None
+    try:
+        length = int(header)
+    except ValueError:
+        raise ValueError(f"Malformed frame header: {header[:40]!r}") from None
+    payload = stream.read(length)
+    if len(payload) != length:
+        raise ValueError("Stream ended inside a frame")
+    return payload
+
+
+def iter_frames(data: bytes) -> Iterator[bytes]:
+    """Payloads of the complete frames in ``data``"""
+    position = 0
+    while position < len(data):
+        newline = data.index(b"\n", position)
+        length = int(data[position:newline])
+        position = newline + 1 + length
+        if position > len(data):
+            raise ValueError("Data ended inside a frame")
+        yield data[newline + 1:position]
+
+
+def resolve_tool(spec: str) -> Path:
+    path = Path(spec)
+    if path.suffix != ".py" and not path.exists():
+        path = Path("tools") / f"{spec}.py"
+    return path
+
+
+class PinnedLoader(importlib.machinery.SourceFileLoader):
+    """Imports a tool's working copy with the source of the store object it was published as"""
+
+    def __init__(self, fullname: str, origin: str, source_path: str):
+        super().__init__(fullname, origin)
+        self.source_path = source_path
+
+    def get_data(self, path):
+        return super().get_data(self.source_path if path == self.path else path)
+
+    def path_stats(self, path):
+        return super().path_stats(self.source_path if path == self.path else path)
+
+    def set_data(self, path, data, *, _mode=0o666):
+        # Bytecode cached here would be filed under the working copy but built from the object
+        pass
+
+
+def load_tool(tool_path: Path, origin: Optional[Path] = None):
+    """Import a tool file under a private module name.
+
+    ``origin`` is the working copy that ``tool_path``, a pinned store
+    object, was published as. The module then runs the object's code but
+    is named after the working copy and has it as ``__file__`` (and in
+    tracebacks), so a tool finds the files next to it whichever version runs.
+    """
+    tool_path = Path(tool_path)
+    origin = Path(origin) if origin is not None else tool_path
+    name = f"anymcp_tool_{origin.stem}"
+    loader = PinnedLoader(name, str(origin), str(tool_path)) if origin != tool_path else None
+    spec = importlib.util.spec_from_file_location(name, origin, loader=loader)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not callable(getattr(module, "execute", None)):
+        raise AttributeError(f"{tool_path} does not define an execute() function")
+    return module
+
+
+def call_execute(func, params: Dict[str, Any]) -> Any:
+    """Call execute() with ``params``, running it to completion if it is async"""
+    result = func(**params) if params else func()
+    if hasattr(result, "__await__"):
+        # asyncio costs tens of milliseconds to import, so only async tools pay for it
+        import asyncio
+        result = asyncio.run(result)
+    return result
+
+
+def format_output(result: Any) -> str:
+    """Text a tool script would print for this result"""
+    if isinstance(result, (dict, list)):
+        return json.dumps(result)
+    return str(result)
+
+
+@contextlib.contextmanager
+def trace_environ(trace: Optional[Dict[str, str]]) -> Iterator[None]:
+    """Expose a caller's trace context to a tool as environment variables for one call.
+
+    ``trace`` maps variable names to values, as ``Tracer.context()`` returns
+    them. Tools running in a long-lived process read the same variables a
+    spawned tool process inherits, and the previous values come back after.
+    """
+    if not trace:
+        yield
+        return
+    saved = {name: os.environ.get(name) for name in trace}
+    os.environ.update(trace)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def call(module, params: Dict[str, Any]) -> str:
+    """Run execute() and render its result as the tool's output text"""
+    return format_output(call_execute(module.execute, params))
+
+
+def handle(module, payload: bytes) -> Dict[str, Any]:
+    try:
+        params = json.loads(payload) if payload.strip() else {}
+        if not isinstance(params, dict):
+            raise TypeError("Tool parameters must be a JSON object")
+        return {"output": call(module, params)}
+    except Exception:
+        return {"error": traceback.format_exc()}
+
+
+def _stdin_requests() -> Iterator[bytes]:
+    stdin = sys.stdin.buffer
+    while True:
+        payload = read_frame(stdin)
+        if payload is None:
+            return
+        yield payload
+
+
+def _fd_request(params_fd: int) -> Iterator[bytes]:
+    with open(params_fd, "rb") as source:
+        yield source.read()
+
+
+def serve(tool_path: Path, params_fd: Optional[int] = None, origin: Optional[Path] = None) -> int:
+    # Keep the protocol on a private copy of stdout; fd 1 (tool prints and
+    # anything their children write) goes to stderr
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    try:
+        module = load_tool(tool_path, origin)
+    except Exception:
+        module, failure = None, {"error": traceback.format_exc()}
+    requests = _stdin_requests() if params_fd is None else _fd_request(params_fd)
+    try:
+        for payload in requests:
+            response = handle(module, payload) if module is not None else failure
+            channel.write(encode_frame(json.dumps(response).encode("utf-8")))
+            channel.flush()
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    return 0
+
+
+def run_once(tool_path: Path, params_json: str, origin: Optional[Path] = None) -> int:
+    try:
+        params = json.loads(params_json)
+        output = call(load_tool(tool_path, origin), params)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    print(output)
+    return 0
+
+
+def main(argv=None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    origin = None
+    if len(args) >= 3 and args[1] == "--origin":
+        origin = Path(args.pop(2))
+        del args[1]
+    if len(args) == 3 and args[1] == "--params-fd" and args[2].isdigit():
+        return serve(resolve_tool(args[0]), int(args[2]), origin)
+    if not 1 <= len(args) <= 2 or args[0].startswith("-"):
+        print(USAGE, file=sys.stderr)
+        return 2
+    tool_path = resolve_tool(args[0])
+    if len(args) == 2:
+        return run_once(tool_path, args[1], origin)
+    return serve(tool_path, origin=origin)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
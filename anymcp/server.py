@@ -1,18 +1,151 @@
+import argparse
 import asyncio
+import codecs
+import contextlib
+import logging
+import signal
 from mcp.server import Server, InitializationOptions
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent, ServerCapabilities
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Dict, Optional
 import json
 import sys
+import time
 
-from .tool_manager import ToolManager
+from .jobs import JOB_KINDS
+from .loop_monitor import LoopMonitor, enable_debug
+from .metrics import is_error
+from .output_capture import DEFAULT_OUTPUT_LIMIT
+from .recording import TrafficRecorder
+from .shell_session import DEFAULT_IDLE_TIMEOUT, DEFAULT_MAX_SESSIONS
+from .tool_manager import EXECUTION_MODES, TEST_RUNNERS, ToolManager
+from .tool_store import DEFAULT_RETAIN
+from .tracing import JsonLinesExporter, RequestSpans, Tracer
+from .transport import ObservedReceiveStream, ObservedSendStream, jsonrpc_fields
+
+
+def serialize_result(result: Any) -> list[TextContent]:
+    """Content returned to the client for a built-in's result"""
+    return [TextContent(
+        type="text",
+        text=json.dumps(result, indent=2)
+    )]
 
 
 def main():
     """Main entry point for the MCP server"""
+    parser = argparse.ArgumentParser(prog="anymcp", description="AnyMCP server")
+    parser.add_argument(
+        "--drain-timeout", type=float, default=10.0,
+        help="Seconds to let in-flight calls finish on shutdown before killing them"
+    )
+    parser.add_argument(
+        "--max-concurrency", type=int, default=None,
+        help="Maximum number of tools executing at once (default: unbounded)"
+    )
+    parser.add_argument(
+        "--test-runner", choices=TEST_RUNNERS, default="persistent",
+        help="Run behave tests in a long-lived helper process (persistent) or one CLI process per run"
+    )
+    parser.add_argument(
+        "--execution-mode", choices=EXECUTION_MODES, default="subprocess",
+        help="Run tools in a fresh process per call (subprocess), in a pool of warm workers (worker), "
+             "or where their workload class says: in-process, in a thread or in the pool (auto)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Size of the warm worker pool (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--metrics-file", default=None,
+        help="Periodically write metrics to this file in Prometheus text format"
+    )
+    parser.add_argument(
+        "--metrics-interval", type=float, default=15.0,
+        help="Seconds between metrics file writes"
+    )
+    parser.add_argument(
+        "--stall-threshold", type=float, default=0.25,
+        help="Log event-loop stalls longer than this many seconds (0 disables the monitor)"
+    )
+    parser.add_argument(
+        "--trace-file", default=None,
+        help="Write request spans as OpenTelemetry-style JSON lines to this file"
+    )
+    parser.add_argument(
+        "--trace-max-bytes", type=int, default=10 * 1024 * 1024,
+        help="Rotate the trace file when it grows past this size"
+    )
+    parser.add_argument(
+        "--trace-backups", type=int, default=5,
+        help="Number of rotated trace files to keep"
+    )
+    parser.add_argument(
+        "--retain-versions", type=int, default=DEFAULT_RETAIN,
+        help="Published versions of each tool kept for rollback_tool"
+    )
+    parser.add_argument(
+        "--max-shell-sessions", type=int, default=DEFAULT_MAX_SESSIONS,
+        help="Persistent shell_command sessions kept at once; the least recently used idle one is closed for a new one"
+    )
+    parser.add_argument(
+        "--shell-idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+        help="Seconds an unused shell_command session is kept before its shell is closed"
+    )
+    parser.add_argument(
+        "--record", default=None,
+        help="Append every call_tool request, its timing and the tool files it hits to this recording"
+    )
+    parser.add_argument(
+        "--debug", action="store_true",
+        help="Enable asyncio debug mode and slow-callback reporting"
+    )
+    parser.add_argument(
+        "--migrate-tests", action="store_true",
+        help="Replace generated features/steps/test_<tool>_steps.py modules with the shared step library and exit"
+    )
+    parser.add_argument(
+        "--migrate-tools", action="store_true",
+        help="Strip the generated __main__ blocks from tools/*.py (tools now run through anymcp.runtime) and exit"
+    )
+    args = parser.parse_args()
+    
+    if args.migrate_tests:
+        result = asyncio.run(ToolManager(test_runner="subprocess").migrate_test_steps())
+        print(json.dumps(result, indent=2))
+        return
+    
+    if args.migrate_tools:
+        result = asyncio.run(ToolManager(test_runner="subprocess").migrate_tools())
+        print(json.dumps(result, indent=2))
+        return
+    
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.DEBUG if args.debug else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    
     try:
-        asyncio.run(run_server())
+        asyncio.run(run_server(
+            drain_timeout=args.drain_timeout,
+            max_concurrency=args.max_concurrency,
+            test_runner=args.test_runner,
+            execution_mode=args.execution_mode,
+            workers=args.workers,
+            metrics_file=args.metrics_file,
+            metrics_interval=args.metrics_interval,
+            stall_threshold=args.stall_threshold,
+            debug=args.debug,
+            trace_file=args.trace_file,
+            trace_max_bytes=args.trace_max_bytes,
+            trace_backups=args.trace_backups,
+            record_file=args.record,
+            retain_versions=args.retain_versions,
+            max_shell_sessions=args.max_shell_sessions,
+            shell_idle_timeout=args.shell_idle_timeout
+        ))
     except KeyboardInterrupt:
         print("\nServer stopped by user", file=sys.stderr)
     except Exception as e:
@@ -20,10 +153,34 @@ def main():
         sys.exit(1)
 
 
-async def run_server():
+async def run_server(drain_timeout: float = 10.0, max_concurrency: Optional[int] = None,
+                     test_runner: str = "persistent",
+                     execution_mode: str = "subprocess", workers: Optional[int] = None,
+                     metrics_file: Optional[str] = None, metrics_interval: float = 15.0,
+                     stall_threshold: float = 0.25, debug: bool = False,
+                     trace_file: Optional[str] = None, trace_max_bytes: int = 10 * 1024 * 1024,
+                     trace_backups: int = 5, record_file: Optional[str] = None,
+                     retain_versions: int = DEFAULT_RETAIN,
+                     max_shell_sessions: int = DEFAULT_MAX_SESSIONS,
+                     shell_idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
     """Run the MCP server"""
     server = Server("anymcp")
-    tool_manager = ToolManager()
+    tracer = Tracer(JsonLinesExporter(Path(trace_file), trace_max_bytes, trace_backups)) if trace_file else Tracer()
+    request_spans = RequestSpans(tracer)
+    tool_manager = ToolManager(
+        drain_timeout=drain_timeout,
+        max_concurrency=max_concurrency,
+        tracer=tracer,
+        test_runner=test_runner,
+        execution_mode=execution_mode,
+        pool_size=workers,
+        retain_versions=retain_versions,
+        max_shell_sessions=max_shell_sessions,
+        shell_idle_timeout=shell_idle_timeout
+    )
+    coordinator = tool_manager.coordinator
+    metrics = tool_manager.metrics
+    recorder = TrafficRecorder(Path(record_file), tool_manager.tools_dir) if record_file else None
     
     @server.list_tools()
     async def list_tools() -> list[Tool]:
@@ -64,6 +221,21 @@ async def run_server():
                             "type": "integer",
                             "description": "Execution timeout in seconds",
                             "default": 30
+                        },
+                        "profile": {
+                            "type": "string",
+                            "enum": ["cpu", "memory"],
+                            "description": "Profile execute() with cProfile (cpu) or tracemalloc (memory)"
+                        },
+                        "profile_top": {
+                            "type": "integer",
+                            "description": "Number of functions or allocation sites to report when profiling",
+                            "default": 20
+                        },
+                        "mode": {
+                            "type": "string",
+                            "enum": list(EXECUTION_MODES),
+                            "description": "Run in a fresh process (subprocess), a warm pool worker (worker), or by workload class (auto); defaults to the server's --execution-mode"
                         }
                     },
                     "required": ["tool_name"]
@@ -87,6 +259,10 @@ async def run_server():
                             "type": "boolean",
                             "description": "Whether to overwrite existing tool",
                             "default": False
+                        },
+                        "preload": {
+                            "type": "boolean",
+                            "description": "Import the new tool in idle warm workers right away (default: on in worker mode)"
                         }
                     },
                     "required": ["name", "code"]
@@ -118,6 +294,19 @@ async def run_server():
                                     "error": {
                                         "type": "string",
                                         "description": "Expected error message"
+                                    },
+                                    "max_latency_ms": {
+                                        "type": "number",
+                                        "description": "Fail if the p95 warm latency exceeds this many milliseconds"
+                                    },
+                                    "max_memory_mb": {
+                                        "type": "number",
+                                        "description": "Fail if the tool process's peak RSS exceeds this many MB"
+                                    },
+                                    "repetitions": {
+                                        "type": "integer",
+                                        "description": "Warm runs measured for the budgets",
+                                        "default": 5
                                     }
                                 }
                             },
@@ -160,6 +349,16 @@ async def run_server():
                             "type": "boolean",
                             "description": "Show detailed test output",
                             "default": False
+                        },
+                        "shards": {
+                            "type": "integer",
+                            "description": "For 'all': number of parallel shards (default: one per CPU, 1 runs serially)",
+                            "minimum": 1
+                        },
+                        "force": {
+                            "type": "boolean",
+                            "description": "For 'all': re-run every feature instead of reusing cached results of unchanged ones",
+                            "default": False
                         }
                     },
                     "required": ["test_name"]
@@ -183,6 +382,25 @@ async def run_server():
                         "cwd": {
                             "type": "string",
                             "description": "Working directory for command execution"
+                        },
+                        "max_output_bytes": {
+                            "type": "integer",
+                            "description": "Bytes of stdout and of stderr to return: the first and last half of each, with the byte count of the rest",
+                            "default": DEFAULT_OUTPUT_LIMIT
+                        },
+                        "spill": {
+                            "type": "boolean",
+                            "description": "Also write the complete stdout and stderr to files under .anymcp/shell/ and return their paths",
+                            "default": False
+                        },
+                        "stream": {
+                            "type": "boolean",
+                            "description": "Send output to the client as it is produced: as progress notifications when the call has a progress token, otherwise as log messages",
+                            "default": False
+                        },
+                        "session_id": {
+                            "type": "string",
+                            "description": "Run in this persistent shell session (started on first use), keeping cd, variables and functions between calls; cwd then changes the session's directory"
                         }
                     },
                     "required": ["command"]
@@ -195,11 +413,220 @@ async def run_server():
                     "type": "object",
                     "properties": {}
                 }
+            ),
+            Tool(
+                name="server_stats",
+                description="Report call counts, error counts and p50/p95/p99 latencies per tool and built-in",
+                inputSchema={
+                    "type": "object",
+                    "properties": {}
+                }
+            ),
+            Tool(
+                name="benchmark_tool",
+                description="Run a tool repeatedly and report cold/warm latency, p50/p95/p99, throughput and peak RSS",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "tool_name": {
+                            "type": "string",
+                            "description": "Name of the tool to benchmark"
+                        },
+                        "parameters": {
+                            "type": "object",
+                            "description": "Parameters to pass to the tool on every call"
+                        },
+                        "iterations": {
+                            "type": "integer",
+                            "description": "Number of measured calls",
+                            "default": 20
+                        },
+                        "warmup": {
+                            "type": "integer",
+                            "description": "Calls to discard after the cold one",
+                            "default": 3
+                        },
+                        "concurrency": {
+                            "type": "integer",
+                            "description": "Measured calls in flight at once",
+                            "default": 1
+                        },
+                        "mode": {
+                            "type": "string",
+                            "enum": list(EXECUTION_MODES),
+                            "description": "Execution mode to benchmark; defaults to the server's --execution-mode"
+                        },
+                        "timeout": {
+                            "type": "integer",
+                            "description": "Per-call timeout in seconds",
+                            "default": 30
+                        }
+                    },
+                    "required": ["tool_name"]
+                }
+            ),
+            Tool(
+                name="import_tools",
+                description="Create every *.py tool in a directory or tar/zip archive as one batch",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "source": {
+                            "type": "string",
+                            "description": "Path of a directory, or of a .tar/.tar.gz/.zip archive"
+                        },
+                        "overwrite": {
+                            "type": "boolean",
+                            "description": "Replace tools that already exist",
+                            "default": False
+                        }
+                    },
+                    "required": ["source"]
+                }
+            ),
+            Tool(
+                name="rollback_tool",
+                description="Republish an earlier retained version of a tool, or list its versions",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "Name of the tool"
+                        },
+                        "version": {
+                            "type": "string",
+                            "description": "Content hash (or unique prefix) to restore; defaults to the previous version"
+                        },
+                        "list_only": {
+                            "type": "boolean",
+                            "description": "Only list the retained versions",
+                            "default": False
+                        }
+                    },
+                    "required": ["name"]
+                }
+            ),
+            Tool(
+                name="submit_job",
+                description="Start execute_tool, run_test or shell_command in the background and return a job id to poll",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "kind": {
+                            "type": "string",
+                            "enum": list(JOB_KINDS),
+                            "description": "Built-in to run"
+                        },
+                        "arguments": {
+                            "type": "object",
+                            "description": "That built-in's arguments, as it would be called directly"
+                        }
+                    },
+                    "required": ["kind", "arguments"]
+                }
+            ),
+            Tool(
+                name="job_status",
+                description="State of a background job, with its result once finished; without job_id, every job",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "job_id": {
+                            "type": "string",
+                            "description": "Job to report on"
+                        }
+                    }
+                }
+            ),
+            Tool(
+                name="job_output",
+                description="Output a background job has produced so far, from a byte offset",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "job_id": {
+                            "type": "string",
+                            "description": "Job to read"
+                        },
+                        "offset": {
+                            "type": "integer",
+                            "description": "Byte offset to read from; pass the previous next_offset to tail the output",
+                            "default": 0
+                        },
+                        "max_bytes": {
+                            "type": "integer",
+                            "description": "Most bytes to return",
+                            "default": 65536
+                        }
+                    },
+                    "required": ["job_id"]
+                }
+            ),
+            Tool(
+                name="cancel_job",
+                description="Cancel a queued or running background job and kill its processes",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "job_id": {
+                            "type": "string",
+                            "description": "Job to cancel"
+                        }
+                    },
+                    "required": ["job_id"]
+                }
             )
         ]
     
     @server.call_tool()
     async def call_tool(name: str, arguments: Dict[str, Any]) -> list[TextContent]:
+        start = time.perf_counter()
+        root = request_spans.dispatched(server.request_context.request_id)
+        tool_sha256 = recorder.snapshot(arguments) if recorder else None
+        with tracer.activate(root), tracer.span("mcp.call_tool", tool=name) as span:
+            try:
+                async with coordinator.work():
+                    result = await dispatch(name, arguments)
+            except Exception as e:
+                result = {"error": str(e)}
+            if is_error(result):
+                span.set_error(str(result.get("error"))[:200])
+            
+            with tracer.span("mcp.serialize"), metrics.timer("builtin", name, "serialization"):
+                content = serialize_result(result)
+        elapsed = time.perf_counter() - start
+        metrics.count_call("builtin", name, error=is_error(result))
+        metrics.observe("builtin", name, "total", elapsed)
+        if recorder:
+            recorder.record(name, arguments, start, elapsed, content[0].text, is_error(result), tool_sha256)
+        return content
+    
+    def output_streamer():
+        """Callback that forwards a running command's output to the client of the current call"""
+        context = server.request_context
+        token = context.meta.progressToken if context.meta is not None else None
+        decoders = {}
+        sent = 0
+        
+        async def on_output(stream: str, chunk: bytes) -> None:
+            nonlocal sent
+            sent += len(chunk)
+            # Chunks can split a UTF-8 character, so each stream keeps its own decoder
+            decoder = decoders.setdefault(stream, codecs.getincrementaldecoder("utf-8")(errors="replace"))
+            text = decoder.decode(chunk)
+            if token is not None:
+                await context.session.send_progress_notification(
+                    token, sent, message=f"[{stream}] {text}", related_request_id=context.request_id
+                )
+            else:
+                await context.session.send_log_message(
+                    "info", {"stream": stream, "text": text}, logger="shell_command",
+                    related_request_id=context.request_id
+                )
+        return on_output
+    
+    async def dispatch(name: str, arguments: Dict[str, Any]) -> Any:
         try:
             if name == "search_tool":
                 keyword = arguments.get("keyword")
@@ -210,13 +637,17 @@ async def run_server():
                 tool_name = arguments["tool_name"]
                 parameters = arguments.get("parameters", {})
                 timeout = arguments.get("timeout", 30)
-                result = await tool_manager.execute_tool(tool_name, parameters, timeout)
+                profile = arguments.get("profile")
+                profile_top = arguments.get("profile_top", 20)
+                mode = arguments.get("mode")
+                result = await tool_manager.execute_tool(tool_name, parameters, timeout, profile, profile_top, mode)
                 
             elif name == "create_tool":
                 name = arguments["name"]
                 code = arguments["code"]
                 overwrite = arguments.get("overwrite", False)
-                result = await tool_manager.create_tool(name, code, overwrite)
+                preload = arguments.get("preload")
+                result = await tool_manager.create_tool(name, code, overwrite, preload)
                 
             elif name == "create_tool_test":
                 tool_name = arguments["tool_name"]
@@ -231,13 +662,21 @@ async def run_server():
             elif name == "run_test":
                 test_name = arguments["test_name"]
                 verbose = arguments.get("verbose", False)
-                result = await tool_manager.run_test(test_name, verbose)
+                shards = arguments.get("shards")
+                force = arguments.get("force", False)
+                result = await tool_manager.run_test(test_name, verbose, shards, force)
                 
             elif name == "shell_command":
                 command = arguments["command"]
                 timeout = arguments.get("timeout", 30)
                 cwd = arguments.get("cwd")
-                result = await tool_manager.shell_command(command, timeout, cwd)
+                max_output_bytes = arguments.get("max_output_bytes", DEFAULT_OUTPUT_LIMIT)
+                spill = arguments.get("spill", False)
+                on_output = output_streamer() if arguments.get("stream", False) else None
+                session_id = arguments.get("session_id")
+                result = await tool_manager.shell_command(
+                    command, timeout, cwd, max_output_bytes, spill, on_output, session_id
+                )
                 
             elif name == "list_tools":
                 tools = tool_manager.list_tools()
@@ -248,29 +687,115 @@ async def run_server():
                     "tools_directory": str(tool_manager.tools_dir)
                 }
                 
+            elif name == "server_stats":
+                result = {
+                    "success": True,
+                    **metrics.snapshot()
+                }
+                
+            elif name == "benchmark_tool":
+                result = await tool_manager.benchmark_tool(
+                    arguments["tool_name"],
+                    arguments.get("parameters", {}),
+                    iterations=arguments.get("iterations", 20),
+                    warmup=arguments.get("warmup", 3),
+                    concurrency=arguments.get("concurrency", 1),
+                    mode=arguments.get("mode"),
+                    timeout=arguments.get("timeout", 30)
+                )
+                
+            elif name == "import_tools":
+                result = await tool_manager.import_tools(arguments["source"], arguments.get("overwrite", False))
+                
+            elif name == "rollback_tool":
+                if arguments.get("list_only", False):
+                    result = tool_manager.tool_versions(arguments["name"])
+                else:
+                    result = await tool_manager.rollback_tool(arguments["name"], arguments.get("version"))
+                
+            elif name == "submit_job":
+                result = await tool_manager.submit_job(arguments["kind"], arguments.get("arguments", {}))
+                
+            elif name == "job_status":
+                result = tool_manager.job_status(arguments.get("job_id"))
+                
+            elif name == "job_output":
+                result = tool_manager.job_output(
+                    arguments["job_id"], arguments.get("offset", 0), arguments.get("max_bytes", 65536)
+                )
+                
+            elif name == "cancel_job":
+                result = await tool_manager.cancel_job(arguments["job_id"])
+                
             else:
                 result = {"error": f"Unknown tool: {name}"}
             
-            return [TextContent(
-                type="text",
-                text=json.dumps(result, indent=2)
-            )]
+            return result
             
         except Exception as e:
-            return [TextContent(
-                type="text",
-                text=json.dumps({"error": str(e)}, indent=2)
-            )]
+            return {"error": str(e)}
     
     # Create initialization options
     init_options = InitializationOptions(
         server_name="anymcp",
         server_version="1.0.0",
         capabilities=ServerCapabilities(
-            tools={}  # We support tools
+            tools={},  # We support tools
+            logging={}  # shell_command can stream output as log messages
         )
     )
     
+    # SIGINT/SIGTERM and stdin EOF all start the same graceful shutdown
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError, RuntimeError, AttributeError):
+            loop.add_signal_handler(sig, coordinator.signal_received)
+    
+    if debug:
+        enable_debug(loop, slow_callback=stall_threshold or 0.1)
+    
+    background = []
+    if stall_threshold > 0:
+        monitor = LoopMonitor(metrics, threshold=stall_threshold)
+        background.append(asyncio.create_task(monitor.run()))
+    if metrics_file:
+        background.append(asyncio.create_task(
+            metrics.export_periodically(Path(metrics_file), metrics_interval)
+        ))
+    
     # Run the server
     async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, init_options)
\ No newline at end of file
+        read_stream = ObservedReceiveStream(
+            read_stream,
+            on_message=lambda item: request_spans.received(*jsonrpc_fields(item)),
+            on_eof=coordinator.request_shutdown
+        )
+        write_stream = ObservedSendStream(
+            write_stream,
+            around_send=lambda item: request_spans.writing(jsonrpc_fields(item)[0])
+        )
+        serving = asyncio.create_task(server.run(read_stream, write_stream, init_options))
+        stop_requested = asyncio.create_task(coordinator.wait_requested())
+        try:
+            await asyncio.wait({serving, stop_requested}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_requested.cancel()
+            summary = await tool_manager.shutdown()
+            if summary["killed"]:
+                print(
+                    f"Shutdown: killed {summary['killed']} running tool process(es)",
+                    file=sys.stderr
+                )
+            serving.cancel()
+            await asyncio.wait({serving})
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            tracer.close()
+            if recorder:
+                recorder.close()
+        if not serving.cancelled() and serving.exception() is not None:
+            # Once the client has gone, late responses fail to write; that
+            # is expected during shutdown and not a server error.
+            if not coordinator.shutdown_requested:
+                raise serving.exception()
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Splitting a behave suite into shards that run in isolated workspaces
+"""
+
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+# Config files behave reads from the working directory
+BEHAVE_CONFIG_FILES = ("behave.ini", ".behaverc", "setup.cfg", "tox.ini", "pyproject.toml")
+
+_SCENARIO_LINE = re.compile(r"^\s*(Scenario|Scenario Outline|Example)\s*:", re.MULTILINE)
+_SUMMARY_LINE = re.compile(r"^(\d+) (feature|scenario|step)s? passed, (.*)$")
+_COUNT = re.compile(r"(\d+) ([a-z_]+)")
+
+
+def scenario_count(feature_file: Path) -> int:
+    """Rough cost of a feature file, used to balance shards"""
+    try:
+        return max(1, len(_SCENARIO_LINE.findall(feature_file.read_text(encoding="utf-8"))))
+    except OSError:
+        return 1
+
+
+def plan_shards(feature_files: Iterable[Path], shards: int) -> List[List[Path]]:
+    """Distribute feature files over at most ``shards`` groups, heaviest first"""
+    files = sorted(feature_files, key=lambda path: (-scenario_count(path), str(path)))
+    shards = max(1, min(shards, len(files)))
+    groups: List[List[Path]] = [[] for _ in range(shards)]
+    loads = [0] * shards
+    for path in files:
+        index = loads.index(min(loads))
+        groups[index].append(path)
+        loads[index] += scenario_count(path)
+    return [sorted(group) for group in groups if group]
+
+
+def prepare_workspace(project_dir: Path, features_dir: Path, tools_dir: Path,
+                      workspace: Path) -> None:
+    """Copy what a shard needs so its runs cannot touch the real tree.
+
+    The whole features directory is copied (steps and hooks may look at
+    sibling files); the shard selects its own ``.feature`` files on the
+    command line. The behave config and tools directory are copied too.
+    """
+    shutil.copytree(features_dir, workspace / "features",
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    for name in BEHAVE_CONFIG_FILES:
+        config = project_dir / name
+        if config.is_file():
+            shutil.copy2(config, workspace / name)
+    if tools_dir.is_dir():
+        shutil.copytree(tools_dir, workspace / "tools",
+                        ignore=shutil.ignore_patterns("__pycache__"))
+    else:
+        (workspace / "tools").mkdir()
+
+
+def parse_summary(output: str) -> Dict[str, Dict[str, int]]:
+    """Counts from behave's summary lines, e.g. ``{"steps": {"passed": 3, ...}}``"""
+    summary: Dict[str, Dict[str, int]] = {}
+    for line in output.splitlines():
+        match = _SUMMARY_LINE.match(line.strip())
+        if not match:
+            continue
+        counts = {"passed": int(match.group(1))}
+        for number, status in _COUNT.findall(match.group(3)):
+            counts[status] = counts.get(status, 0) + int(number)
+        summary[f"{match.group(2)}s"] = counts
+    return summary
+
+
+def merge_summaries(summaries: Iterable[Dict[str, Dict[str, int]]]) -> Dict[str, Dict[str, int]]:
+    merged: Dict[str, Dict[str, int]] = {}
+    for summary in summaries:
+        for kind, counts in summary.items():
+            totals = merged.setdefault(kind, {})
+            for status, number in counts.items():
+                totals[status] = totals.get(status, 0) + number
+    return merged
+
+
+def format_summary(kind: str, counts: Dict[str, int]) -> str:
+    """Render counts the way behave prints them"""
+    parts = [f"{counts.get('passed', 0)} {kind} passed",
+             f"{counts.get('failed', 0)} failed"]
+    if counts.get("error"):
+        parts.append(f"{counts['error']} error")
+    parts.append(f"{counts.get('skipped', 0)} skipped")
+    for status, number in counts.items():
+        if status not in ("passed", "failed", "error", "skipped") and number:
+            parts.append(f"{number} {status}")
+    return ", ".join(parts)
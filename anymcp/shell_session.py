@@ -0,0 +1,266 @@
+"""
+Long-lived ``/bin/sh`` processes that keep state (cwd, variables, functions)
+between ``shell_command`` calls with the same ``session_id``.
+
+Each command is run as ``command eval '<command>' </dev/null``, preceded by a
+begin line carrying a random sentinel on stdout and stderr, and followed by
+a line with the sentinel and its exit status on stdout, and the sentinel
+alone on stderr. Output is read from the begin lines until both end lines
+arrive, so a command's output and status are recovered without waiting for
+EOF, and anything an earlier command's background jobs wrote in between is
+discarded. ``command``
+keeps a syntax error from exiting the shell, and stdin is ``/dev/null`` so a
+command cannot read the lines that follow it. A command that times out leaves
+the shell in an unknown state, so its session is killed.
+"""
+
+import os
+import select
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .output_capture import CHUNK_SIZE, StreamCapture
+
+DEFAULT_IDLE_TIMEOUT = 600.0
+DEFAULT_MAX_SESSIONS = 8
+
+
+class ShellSessionError(RuntimeError):
+    """A session could not be started, is busy, or its shell died"""
+
+
+def shell_quote(text: str) -> str:
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
+class ShellSession:
+    """One shell process, running a single command at a time"""
+
+    def __init__(self, session_id: str, cwd: str, env: Optional[Dict[str, str]] = None):
+        self.session_id = session_id
+        try:
+            self.process = subprocess.Popen(
+                ["/bin/sh"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=cwd,
+                env=env,
+                start_new_session=True
+            )
+        except OSError as e:
+            raise ShellSessionError(f"cannot start shell: {e}") from e
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.commands = 0
+        # Callers handed this session by ShellSessions.acquire and not yet done with it
+        self.claims = 0
+
+    @property
+    def running(self) -> bool:
+        return self.process.poll() is None
+
+    @property
+    def busy(self) -> bool:
+        return self.claims > 0 or self.lock.locked()
+
+    def run(self, command: str, captures: List[StreamCapture], timeout: float,
+            on_chunk: Optional[Callable[[str, bytes], None]] = None) -> Optional[int]:
+        """Run ``command``, feeding stdout and stderr into ``captures``; returns its exit status.
+
+        ``None`` means the shell itself exited (``exit`` in the command), in
+        which case ``self.process.returncode`` is the status. Raises
+        TimeoutError if the sentinels do not arrive within ``timeout``.
+        """
+        sentinel = uuid.uuid4().hex.encode()
+        begin = sentinel + b"-begin\n"
+        script = (
+            f"printf '%s-begin\\n' {sentinel.decode()}\n"
+            f"printf '%s-begin\\n' {sentinel.decode()} >&2\n"
+            f"command eval {shell_quote(command)} </dev/null\n"
+            f"printf '%s %d\\n' {sentinel.decode()} $?\n"
+            f"printf '%s\\n' {sentinel.decode()} >&2\n"
+        )
+        self.commands += 1
+        try:
+            self.process.stdin.write(script.encode())
+            self.process.stdin.flush()
+        except OSError as e:
+            raise ShellSessionError(f"shell exited: {e}") from e
+
+        streams = {
+            self.process.stdout.fileno(): (captures[0], bytearray()),
+            self.process.stderr.fileno(): (captures[1], bytearray()),
+        }
+        trailers: Dict[int, bytes] = {}
+        begun = set()
+        deadline = time.monotonic() + timeout
+
+        def emit(capture: StreamCapture, data: bytes) -> None:
+            if data:
+                capture.feed(data)
+                if on_chunk is not None:
+                    on_chunk(capture.name, data)
+
+        try:
+            while len(trailers) < len(streams):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError
+                pending = [fd for fd in streams if fd not in trailers]
+                ready, _, _ = select.select(pending, [], [], remaining)
+                for fd in ready:
+                    capture, buffer = streams[fd]
+                    chunk = os.read(fd, CHUNK_SIZE)
+                    if not chunk:
+                        # The shell exited; what the command printed before still counts
+                        if fd in begun:
+                            emit(capture, bytes(buffer))
+                        buffer.clear()
+                        self.process.wait()
+                        return None
+                    buffer += chunk
+                    if fd not in begun:
+                        # Bytes before the begin line are late output of an earlier command
+                        start = buffer.find(begin)
+                        if start < 0:
+                            del buffer[:max(len(buffer) - len(begin) + 1, 0)]
+                            continue
+                        del buffer[:start + len(begin)]
+                        begun.add(fd)
+                    start = buffer.find(sentinel)
+                    if start < 0:
+                        # Hold back a possible partial sentinel at the end
+                        safe = len(buffer) - len(sentinel) + 1
+                        if safe > 0:
+                            emit(capture, bytes(buffer[:safe]))
+                            del buffer[:safe]
+                        continue
+                    emit(capture, bytes(buffer[:start]))
+                    del buffer[:start]
+                    end = buffer.find(b"\n")
+                    if end >= 0:
+                        trailers[fd] = bytes(buffer[len(sentinel):end])
+        finally:
+            self.last_used = time.monotonic()
+        return int(trailers[self.process.stdout.fileno()])
+
+    def kill(self) -> None:
+        """Kill the shell and whatever it is running; a blocked ``run`` then returns"""
+        if self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                self.process.kill()
+
+    def close(self) -> None:
+        self.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout, self.process.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class ShellSessions:
+    """Shell sessions by id, at most ``max_sessions`` of them.
+
+    Sessions idle for ``idle_timeout`` seconds are closed by a background
+    reaper thread. When the table is full, the least recently used idle
+    session is closed to make room for a new one.
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        if max_sessions < 1:
+            raise ValueError("At least one shell session must be allowed")
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[str, ShellSession] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    def acquire(self, session_id: str, cwd: str, env: Optional[Dict[str, str]] = None) -> Tuple[ShellSession, bool]:
+        """The running session ``session_id``, started in ``cwd`` if needed; also says whether it is new.
+
+        The session is claimed for the caller, so neither eviction nor the
+        reaper closes it before ``release``.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and session.running:
+                session.last_used = time.monotonic()
+                session.claims += 1
+                return session, False
+            if session is not None:
+                self._sessions.pop(session_id).close()
+            if len(self._sessions) >= self.max_sessions:
+                self._evict()
+            session = ShellSession(session_id, cwd, env)
+            session.claims += 1
+            self._sessions[session_id] = session
+            self._start_reaper()
+            return session, True
+
+    def release(self, session: ShellSession) -> None:
+        """Give up a claim taken by ``acquire``"""
+        with self._lock:
+            session.claims -= 1
+
+    def _evict(self) -> None:
+        idle = [s for s in self._sessions.values() if not s.busy]
+        if not idle:
+            raise ShellSessionError(f"All {self.max_sessions} shell sessions are busy")
+        oldest = min(idle, key=lambda s: s.last_used)
+        self._sessions.pop(oldest.session_id).close()
+
+    def discard(self, session: ShellSession) -> None:
+        """Close a session and forget it, unless it has already been replaced"""
+        with self._lock:
+            if self._sessions.get(session.session_id) is session:
+                del self._sessions[session.session_id]
+        session.close()
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            return sorted(self._sessions)
+
+    def sweep(self) -> int:
+        """Close sessions idle for longer than ``idle_timeout``; returns how many"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                s for s in self._sessions.values()
+                if not s.busy and (not s.running or now - s.last_used > self.idle_timeout)
+            ]
+            for session in expired:
+                del self._sessions[session.session_id]
+        for session in expired:
+            session.close()
+        return len(expired)
+
+    def _start_reaper(self) -> None:
+        if self._reaper is None or not self._reaper.is_alive():
+            self._closed.clear()
+            self._reaper = threading.Thread(target=self._reap_idle, name="shell-session-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_idle(self) -> None:
+        interval = max(min(self.idle_timeout / 4, 30.0), 0.05)
+        while not self._closed.wait(interval):
+            self.sweep()
+
+    def close(self) -> None:
+        """Kill every session's shell and stop the reaper"""
+        self._closed.set()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
@@ -0,0 +1,136 @@
+"""
+Graceful shutdown for the MCP server: stop accepting work, drain in-flight
+calls up to a deadline, then kill and reap whatever child processes remain.
+"""
+
+import asyncio
+import contextlib
+import os
+import signal
+from typing import Any, Dict, Optional, Set
+
+
+class ServerShuttingDown(Exception):
+    """Raised when a call arrives after shutdown has begun"""
+
+
+async def terminate_process(process: asyncio.subprocess.Process, grace: float = 0.0) -> None:
+    """Kill a child and its process group, then reap it so no zombie is left.
+
+    Children are started with ``start_new_session=True``, so their pid is also
+    the id of the process group holding anything they spawned themselves.
+    """
+    if process.returncode is None:
+        if grace > 0:
+            _signal_group(process, signal.SIGTERM)
+            try:
+                await asyncio.wait_for(process.wait(), timeout=grace)
+            except asyncio.TimeoutError:
+                pass
+        if process.returncode is None:
+            _signal_group(process, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+    await process.wait()
+
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, sig)
+            return
+        except (ProcessLookupError, PermissionError):
+            pass
+    with contextlib.suppress(ProcessLookupError):
+        process.send_signal(sig)
+
+
+class ShutdownCoordinator:
+    """Tracks in-flight calls and child processes for an orderly shutdown"""
+
+    def __init__(self, drain_timeout: float = 10.0, kill_grace: float = 1.0):
+        self.drain_timeout = drain_timeout
+        self.kill_grace = kill_grace
+        self.accepting = True
+        self._inflight = 0
+        self._processes: Set[asyncio.subprocess.Process] = set()
+        # Events are created lazily inside the running loop; a ToolManager may
+        # be driven by several consecutive asyncio.run() calls.
+        self._requested: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._forced = False
+        self._done = False
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @contextlib.asynccontextmanager
+    async def work(self):
+        """Admit one unit of work, refusing it once shutdown has started"""
+        if not self.accepting:
+            raise ServerShuttingDown("Server is shutting down")
+        self._inflight += 1
+        try:
+            yield
+        finally:
+            self._inflight -= 1
+            if self._inflight == 0 and self._idle is not None:
+                self._idle.set()
+
+    def track(self, process: asyncio.subprocess.Process) -> None:
+        self._processes.add(process)
+
+    def untrack(self, process: asyncio.subprocess.Process) -> None:
+        self._processes.discard(process)
+
+    @property
+    def shutdown_requested(self) -> bool:
+        return not self.accepting
+
+    def request_shutdown(self, force: bool = False) -> None:
+        """Ask for a graceful shutdown; ``force`` skips draining in-flight work"""
+        if force:
+            self._forced = True
+            if self._idle is not None:
+                self._idle.set()
+        self.accepting = False
+        self._requested_event().set()
+
+    def signal_received(self) -> None:
+        """Signal handler: the first signal drains, a repeated one forces"""
+        self.request_shutdown(force=self.shutdown_requested)
+
+    async def wait_requested(self) -> None:
+        await self._requested_event().wait()
+
+    def _requested_event(self) -> asyncio.Event:
+        if self._requested is None:
+            self._requested = asyncio.Event()
+        return self._requested
+
+    async def shutdown(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Drain in-flight work up to the deadline, then kill and reap children"""
+        self.accepting = False
+        timeout = self.drain_timeout if timeout is None else timeout
+
+        drained = True
+        if not self._done and self._inflight and not self._forced:
+            self._idle = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            drained = self._inflight == 0
+        self._done = True
+
+        remaining = [p for p in self._processes if p.returncode is None]
+        grace = 0.0 if self._forced else self.kill_grace
+        await asyncio.gather(
+            *(terminate_process(p, grace) for p in remaining),
+            return_exceptions=True
+        )
+        self._processes.clear()
+
+        return {
+            "drained": drained,
+            "killed": len(remaining)
+        }
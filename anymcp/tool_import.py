@@ -0,0 +1,88 @@
+"""
+Reading tool files out of a directory or a tar/zip archive for bulk import
+"""
+
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+
+# Larger files are reported as failures rather than read (archive bombs)
+MAX_TOOL_BYTES = 4 * 1024 * 1024
+
+
+class ToolSourceError(ValueError):
+    """The import source is not a readable directory, tar or zip archive"""
+
+
+def tool_name(member: str) -> Optional[str]:
+    """Tool a file or archive member defines: its stem, for ``*.py`` outside hidden and cache directories"""
+    parts = PurePosixPath(member.replace("\\", "/")).parts
+    if not parts or not parts[-1].endswith(".py") or parts[-1] == ".py":
+        return None
+    if any(part.startswith(".") or part == "__pycache__" for part in parts):
+        return None
+    return parts[-1][:-len(".py")]
+
+
+def _directory_members(source: Path):
+    for path in sorted(source.rglob("*.py")):
+        if path.is_file():
+            yield path.relative_to(source).as_posix(), path.stat().st_size, path.read_bytes
+
+
+def _tar_members(archive: tarfile.TarFile):
+    for member in archive.getmembers():
+        # Links and devices are never followed, only regular files read
+        if member.isfile():
+            yield member.name, member.size, lambda member=member: archive.extractfile(member).read()
+
+
+def _zip_members(archive: zipfile.ZipFile):
+    for info in archive.infolist():
+        if not info.is_dir():
+            yield info.filename, info.file_size, lambda info=info: archive.read(info)
+
+
+def _collect(members) -> Tuple[List[Tuple[str, str, bytes]], List[Dict[str, str]]]:
+    files: List[Tuple[str, str, bytes]] = []
+    failed: List[Dict[str, str]] = []
+    seen: Dict[str, str] = {}
+    for origin, size, read in members:
+        name = tool_name(origin)
+        if name is None:
+            continue
+        if name in seen:
+            failed.append({"name": name, "file": origin, "error": f"Duplicate tool name (also in {seen[name]})"})
+        elif size > MAX_TOOL_BYTES:
+            failed.append({"name": name, "file": origin, "error": f"File is larger than {MAX_TOOL_BYTES} bytes"})
+        else:
+            seen[name] = origin
+            try:
+                files.append((name, origin, read()))
+            except (OSError, tarfile.TarError, zipfile.BadZipFile) as e:
+                failed.append({"name": name, "file": origin, "error": f"Cannot read file: {e}"})
+    return files, failed
+
+
+def read_tool_sources(source: Path) -> Tuple[List[Tuple[str, str, bytes]], List[Dict[str, str]]]:
+    """``(name, file, contents)`` for every tool in ``source``, plus the files that could not be taken.
+
+    ``source`` is a directory (searched recursively) or a tar (optionally
+    compressed) or zip archive. Only file contents are read; nothing is
+    extracted, so member paths cannot point outside the tools directory.
+    The first file with a given name wins and later ones are reported.
+    """
+    source = Path(source)
+    try:
+        if source.is_dir():
+            return _collect(_directory_members(source))
+        if zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as archive:
+                return _collect(_zip_members(archive))
+        if source.is_file() and tarfile.is_tarfile(source):
+            with tarfile.open(source) as archive:
+                return _collect(_tar_members(archive))
+    except (OSError, tarfile.TarError, zipfile.BadZipFile) as e:
+        raise ToolSourceError(f"Cannot read '{source}': {e}") from e
+    raise ToolSourceError(f"'{source}' is not a directory, tar or zip archive")
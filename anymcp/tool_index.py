@@ -0,0 +1,139 @@
+"""
+In-process index of tool metadata and precompiled tool bytecode
+"""
+
+import ast
+import importlib.util
+import marshal
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .workload import classify
+
+# PEP 552 flags: hash-based pyc whose source hash the loader checks on import
+CHECKED_HASH_PYC = 0b11
+
+
+def tool_metadata(tree: Optional[ast.AST], tool_path: Path) -> Dict[str, Any]:
+    """Name, description, parameters, version and workload class of a parsed tool file"""
+    tool_info = {
+        "name": tool_path.stem,
+        "path": str(tool_path),
+        "description": "",
+        "parameters": {},
+        "version": "1.0.0",
+        "workload": classify(tree)
+    }
+    if tree is None:
+        return tool_info
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    if target.id == "__description__":
+                        if isinstance(node.value, ast.Constant):
+                            tool_info["description"] = node.value.value
+                    elif target.id == "__tool_name__":
+                        if isinstance(node.value, ast.Constant):
+                            tool_info["name"] = node.value.value
+                    elif target.id == "__version__":
+                        if isinstance(node.value, ast.Constant):
+                            tool_info["version"] = node.value.value
+                    elif target.id == "__parameters__":
+                        try:
+                            tool_info["parameters"] = ast.literal_eval(node.value)
+                        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+                            pass
+
+        elif isinstance(node, ast.FunctionDef) and node.name == "execute":
+            params = []
+            for arg in node.args.args:
+                param_info = {"name": arg.arg}
+                if arg.annotation:
+                    param_info["type"] = ast.unparse(arg.annotation)
+                params.append(param_info)
+
+            if not tool_info["parameters"]:
+                tool_info["parameters"] = {p["name"]: p for p in params}
+
+            if node.body and isinstance(node.body[0], ast.Expr):
+                if isinstance(node.body[0].value, ast.Constant):
+                    if not tool_info["description"]:
+                        tool_info["description"] = node.body[0].value.value
+
+    return tool_info
+
+
+def compile_tool(tree: ast.AST, tool_path: Path):
+    """Bytecode for a parsed tool; raises SyntaxError for errors only the compiler sees"""
+    return compile(tree, str(tool_path), "exec", dont_inherit=True)
+
+
+def write_bytecode(tool_path: Path, source: bytes, code) -> Path:
+    """Store compiled ``code`` where importing ``tool_path`` will find it.
+
+    The pyc is hash-based and checked (PEP 552), so it stays valid exactly as
+    long as the source bytes are unchanged, whatever the file's mtime. A
+    worker running a different Python version ignores it and compiles as usual.
+    """
+    pyc_path = Path(importlib.util.cache_from_source(str(tool_path)))
+    pyc_path.parent.mkdir(parents=True, exist_ok=True)
+    data = bytearray(importlib.util.MAGIC_NUMBER)
+    data += CHECKED_HASH_PYC.to_bytes(4, "little")
+    data += importlib.util.source_hash(source)
+    data += marshal.dumps(code)
+    tmp_path = pyc_path.with_name(f".{pyc_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, pyc_path)
+    return pyc_path
+
+
+def _stamp(tool_path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = tool_path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ToolIndex:
+    """Tool metadata keyed by file, valid while the file's mtime and size are unchanged.
+
+    Also keeps the resolution table from tool names (file stem and any
+    ``__tool_name__``) to paths, so resolving a tool does not need a scan.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        self._names: Dict[str, Path] = {}
+
+    def lookup(self, tool_path: Path) -> Optional[Dict[str, Any]]:
+        """Cached metadata for ``tool_path`` if the file has not changed since it was indexed"""
+        entry = self._entries.get(tool_path)
+        if entry is None or entry[0] != _stamp(tool_path):
+            return None
+        return entry[1]
+
+    def store(self, tool_path: Path, tool_info: Dict[str, Any]) -> None:
+        stamp = _stamp(tool_path)
+        if stamp is None:
+            return
+        self._entries[tool_path] = (stamp, tool_info)
+        self._names[tool_path.stem] = tool_path
+        self._names[tool_info["name"]] = tool_path
+
+    def resolve(self, name: str) -> Optional[Path]:
+        """Path of the tool called ``name``, if it is indexed and still exists"""
+        tool_path = self._names.get(name)
+        if tool_path is None or not tool_path.exists():
+            return None
+        return tool_path
+
+    def prune(self, present: Iterable[Path]) -> None:
+        """Forget files that a full scan no longer found"""
+        present = set(present)
+        for tool_path in [path for path in self._entries if path not in present]:
+            del self._entries[tool_path]
+        self._names = {name: path for name, path in self._names.items() if path in present}
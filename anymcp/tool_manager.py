@@ -4,21 +4,140 @@ import subprocess
 import tempfile
 import shutil
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import aiofiles
 import asyncio
+import contextlib
+import contextvars
+import os
+import threading
+import time
+import traceback
+import uuid
+
+from .behave_client import BehaveRunnerClient, BehaveRunnerError
+from .behave_report import formatter_args, load_report, summarize
+from .jobs import JOB_KINDS, JobTable
+from .harness import BUDGET_REPORT_USERDATA, TOOLS_DIR_USERDATA, load_budgets
+from .metrics import MetricsRegistry, distribution
+from .output_capture import DEFAULT_OUTPUT_LIMIT, OnChunk, StreamCapture, drain
+from .result_cache import ResultCache, feature_inputs, fingerprint, package_digest
+from .runtime import call_execute, encode_frame, format_output, iter_frames, trace_environ
+from .tool_import import ToolSourceError, read_tool_sources
+from .tool_index import ToolIndex, compile_tool, tool_metadata, write_bytecode
+from .tool_store import DEFAULT_RETAIN, ToolStore
+from .shell_session import DEFAULT_IDLE_TIMEOUT, DEFAULT_MAX_SESSIONS, ShellSessionError, ShellSessions, shell_quote
+from .sharding import format_summary, merge_summaries, parse_summary, plan_shards, prepare_workspace
+from .shutdown import ShutdownCoordinator, terminate_process
+from .tracing import Tracer
+from .worker import PROFILE_MODES, ToolCache
+from .worker_pool import WorkerPool, WorkerPoolError
+from .workload import ToolStdout, WorkloadRouter
+
+# Run by path rather than with -m so the child never imports the server package
+WORKER_SCRIPT = Path(__file__).resolve().with_name("worker.py")
+RUNTIME_SCRIPT = Path(__file__).resolve().with_name("runtime.py")
+
+# Tool parameters at least this large reach the child through a memfd rather than a pipe
+PARAMS_MEMFD_THRESHOLD = 1024 * 1024
+
+TEST_RUNNERS = ("persistent", "subprocess")
+
+# subprocess: a fresh interpreter per call; worker: a pool of warm worker processes;
+# auto: each tool where its workload class says (in-process, a thread or the pool)
+EXECUTION_MODES = ("subprocess", "worker", "auto")
+
+# sys.stdout is process-wide, so every ToolManager shares one router for it
+TOOL_STDOUT = ToolStdout()
+# Set while the current task holds an execution slot
+HOLDS_SLOT = contextvars.ContextVar("anymcp_holds_slot", default=False)
+
+# Directory containing the anymcp package, so shard workspaces can import it
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+# Shared step definitions for generated tests, and the module that loads them
+STEP_LIBRARY = Path(__file__).resolve().with_name("tool_steps.py")
+STEP_LOADER_NAME = "tool_steps.py"
+STEP_LOADER = '''"""Steps for tests generated by create_tool_test (defined in anymcp/tool_steps.py)"""
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp.tool_steps import *
+'''
+
+# Step functions the per-tool modules written by older create_tool_test defined
+LEGACY_STEP_SUFFIXES = ("tool_available", "execute_with_params", "check_result", "check_error")
+
+# The ``__main__`` blocks older create_tool appended to every tool, before anymcp.runtime
+LEGACY_MAIN_BLOCK = '''
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('params', nargs='?', default='{}')
+    args = parser.parse_args()
+    
+    params = json.loads(args.params)
+    result = execute(**params) if params else execute()
+    
+    if isinstance(result, (dict, list)):
+        print(json.dumps(result))
+    else:
+        print(result)
+'''
+LEGACY_MAIN_BLOCKS = frozenset(
+    ast.dump(ast.parse(block).body[0])
+    for block in (LEGACY_MAIN_BLOCK, LEGACY_MAIN_BLOCK.replace("import argparse", "import json\n    import argparse"))
+)
 
 
 class ToolManager:
-    def __init__(self, tools_dir: str = "tools"):
+    def __init__(self, tools_dir: str = "tools", drain_timeout: float = 10.0,
+                 max_concurrency: Optional[int] = None, tracer: Optional[Tracer] = None,
+                 test_runner: str = "persistent", execution_mode: str = "subprocess",
+                 pool_size: Optional[int] = None, retain_versions: int = DEFAULT_RETAIN,
+                 max_shell_sessions: int = DEFAULT_MAX_SESSIONS,
+                 shell_idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
         self.tools_dir = Path(tools_dir)
         self.tools_dir.mkdir(exist_ok=True)
+        self.coordinator = ShutdownCoordinator(drain_timeout=drain_timeout)
+        self.metrics = MetricsRegistry()
+        self.tracer = tracer or Tracer()
+        # Bounds concurrent tool executions; waiting for a slot is queue wait
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        # Server-side state (profiles, caches) lives next to the tools directory
+        self.state_dir = self.tools_dir.resolve().parent / ".anymcp"
+        self.profiles_dir = self.state_dir / "profiles"
+        self.test_cache = ResultCache(self.state_dir / "test_cache.json")
+        if test_runner not in TEST_RUNNERS:
+            raise ValueError(f"Unknown test runner: {test_runner}")
+        # Long-lived behave process that keeps step definitions loaded between runs
+        self.behave_runner = BehaveRunnerClient() if test_runner == "persistent" else None
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {execution_mode}")
+        self.execution_mode = execution_mode
+        # Workers start on first use, so the pool costs nothing in subprocess mode
+        self.worker_pool = WorkerPool(pool_size or os.cpu_count() or 1)
+        # Parsed tool metadata and name -> path table, refreshed when files change
+        self.index = ToolIndex()
+        # Published versions by content hash, with the last few kept for rollback
+        self.store = ToolStore(self.state_dir / "store", self.tools_dir, retain_versions)
+        # Executor per tool in auto mode, and the modules it runs in the server process
+        self.router = WorkloadRouter()
+        self._modules = ToolCache()
+        # Long-lived shells behind shell_command's session_id
+        self.shell_sessions = ShellSessions(max_shell_sessions, shell_idle_timeout)
+        # Calls submitted with submit_job, polled with job_status / job_output
+        self.jobs = JobTable()
         
     async def search_tools(self, keyword: Optional[str] = None, detailed: bool = False) -> List[Dict[str, Any]]:
         tools = []
+        present = []
         
         for tool_path in self.tools_dir.glob("*.py"):
-            tool_info = await self._extract_tool_info(tool_path)
+            present.append(tool_path)
+            tool_info = await self._tool_info(tool_path)
             
             if keyword:
                 keyword_lower = keyword.lower()
@@ -35,88 +154,165 @@ class ToolManager:
                     "path": str(tool_path)
                 })
         
+        self.index.prune(present)
         return tools
     
+    async def _tool_info(self, tool_path: Path) -> Dict[str, Any]:
+        """Indexed metadata for a tool file, parsing it only if it changed"""
+        tool_info = self.index.lookup(tool_path)
+        if tool_info is None:
+            tool_info = await self._extract_tool_info(tool_path)
+            self.index.store(tool_path, tool_info)
+        return dict(tool_info)
+    
     async def _extract_tool_info(self, tool_path: Path) -> Dict[str, Any]:
         async with aiofiles.open(tool_path, 'r') as f:
             content = await f.read()
         
-        tool_info = {
-            "name": tool_path.stem,
-            "path": str(tool_path),
-            "description": "",
-            "parameters": {},
-            "version": "1.0.0"
-        }
-        
         try:
             tree = ast.parse(content)
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(target, ast.Name):
-                            if target.id == "__description__":
-                                if isinstance(node.value, ast.Constant):
-                                    tool_info["description"] = node.value.value
-                            elif target.id == "__tool_name__":
-                                if isinstance(node.value, ast.Constant):
-                                    tool_info["name"] = node.value.value
-                            elif target.id == "__version__":
-                                if isinstance(node.value, ast.Constant):
-                                    tool_info["version"] = node.value.value
-                            elif target.id == "__parameters__":
-                                try:
-                                    tool_info["parameters"] = ast.literal_eval(node.value)
-                                except:
-                                    pass
-                
-                elif isinstance(node, ast.FunctionDef) and node.name == "execute":
-                    params = []
-                    for arg in node.args.args:
-                        param_info = {"name": arg.arg}
-                        if arg.annotation:
-                            param_info["type"] = ast.unparse(arg.annotation)
-                        params.append(param_info)
-                    
-                    if not tool_info["parameters"]:
-                        tool_info["parameters"] = {p["name"]: p for p in params}
-                    
-                    if node.body and isinstance(node.body[0], ast.Expr):
-                        if isinstance(node.body[0].value, ast.Constant):
-                            if not tool_info["description"]:
-                                tool_info["description"] = node.body[0].value.value
-        except:
-            pass
-        
-        return tool_info
-    
-    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any], timeout: int = 30) -> Dict[str, Any]:
-        tool_path = self.tools_dir / f"{tool_name}.py"
+        except (SyntaxError, ValueError):
+            tree = None
+        return tool_metadata(tree, tool_path)
+    
+    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any], timeout: int = 30,
+                           profile: Optional[str] = None, profile_top: int = 20,
+                           mode: Optional[str] = None) -> Dict[str, Any]:
+        start = time.perf_counter()
+        with self.tracer.span("tool.execute", tool=tool_name) as span:
+            result = await self._execute_tool(tool_name, parameters, timeout, profile, profile_top,
+                                              mode=mode)
+            if not result["success"]:
+                span.set_error(str(result["error"])[:200])
+        self.metrics.observe("tool", tool_name, "total", time.perf_counter() - start)
+        self.metrics.count_call("tool", tool_name, error=not result["success"])
+        return result
+    
+    async def measure_tool(self, tool_name: str, parameters: Dict[str, Any], repetitions: int = 5,
+                           timeout: int = 30) -> Dict[str, Any]:
+        """Time ``repetitions`` warm calls of a tool after a cold one, in one worker.
+
+        Returns the first call's result plus ``measurement``: cold latency,
+        the warm latency distribution (milliseconds) and the worker's peak
+        RSS in MB. ``timeout`` applies per call.
+        """
+        if not isinstance(repetitions, int) or repetitions < 1:
+            return {
+                "success": False,
+                "error": "repetitions must be a positive integer"
+            }
+        with self.tracer.span("tool.measure", tool=tool_name, repetitions=repetitions) as span:
+            result = await self._execute_tool(tool_name, parameters, timeout * (repetitions + 1),
+                                              None, 20, repetitions=repetitions)
+            if not result["success"]:
+                span.set_error(str(result["error"])[:200])
+        return result
+    
+    async def _execute_tool(self, tool_name: str, parameters: Dict[str, Any], timeout: int,
+                            profile: Optional[str], profile_top: int,
+                            repetitions: Optional[int] = None,
+                            mode: Optional[str] = None) -> Dict[str, Any]:
+        with self.tracer.span("tool.validate"):
+            if not isinstance(parameters, dict):
+                return {
+                    "success": False,
+                    "error": "Tool parameters must be an object"
+                }
+            if profile is not None and profile not in PROFILE_MODES:
+                return {
+                    "success": False,
+                    "error": f"Unknown profile mode '{profile}', expected one of: {', '.join(PROFILE_MODES)}"
+                }
+            mode = mode or self.execution_mode
+            if mode not in EXECUTION_MODES:
+                return {
+                    "success": False,
+                    "error": f"Unknown execution mode '{mode}', expected one of: {', '.join(EXECUTION_MODES)}"
+                }
         
-        if not tool_path.exists():
-            tools = await self.search_tools(tool_name)
-            if tools:
-                tool_path = Path(tools[0]["path"])
-            else:
+        with self.tracer.span("tool.resolve"):
+            tool_path = await self._resolve_tool_path(tool_name)
+            if tool_path is None:
                 return {
                     "success": False,
                     "error": f"Tool '{tool_name}' not found"
                 }
         
-        params_json = json.dumps(parameters)
+        # Profiled and measured runs always get a dedicated worker process
+        if mode == "auto" and not profile and repetitions is None:
+            run_path, origin = self._pin(tool_path)
+            try:
+                stat = run_path.stat()
+            except OSError:
+                # Deleted since it was resolved
+                return {
+                    "success": False,
+                    "error": f"Tool '{tool_name}' not found"
+                }
+            version = (str(run_path), stat.st_mtime_ns, stat.st_size)
+            workload = self.router.route(
+                str(tool_path), version, (await self._tool_info(tool_path))["workload"]
+            )
+            if workload["executor"] != "process":
+                return await self._execute_in_server(
+                    tool_name, tool_path, run_path, origin, version, workload, parameters, timeout
+                )
+            result = await self._execute_in_worker(tool_name, tool_path, parameters, timeout)
+            result["executor"] = "process"
+            return result
+        if mode == "worker" and not profile and repetitions is None:
+            return await self._execute_in_worker(tool_name, tool_path, parameters, timeout)
+        
+        encode_start = time.perf_counter()
+        with self.tracer.span("tool.encode"):
+            # Parameters never go on the command line (ARG_MAX, visible in ps):
+            # a pipe to stdin, or for large payloads a memfd the child reads
+            payload = json.dumps(parameters).encode("utf-8")
+            params_fd = self._params_memfd(payload) if len(payload) >= PARAMS_MEMFD_THRESHOLD else None
+        encode_time = time.perf_counter() - encode_start
+        process = None
+        framed = not profile and repetitions is None
+        
+        # Like the worker paths, run the immutable published object so a call
+        # keeps its version if the tool is republished while it runs
+        run_path, origin = self._pin(tool_path)
+        cmd = ["python", str(RUNTIME_SCRIPT if framed else WORKER_SCRIPT), str(run_path)]
+        if origin is not None:
+            cmd += ["--origin", str(origin)]
+        if params_fd is not None:
+            cmd += ["--params-fd", str(params_fd)]
+            request = None
+        elif framed:
+            request = encode_frame(payload)
+        else:
+            cmd += ["--params", "-"]
+            request = payload
+        if profile:
+            # Profiled runs go through the worker so execute() itself is measured
+            dump_path = self._profile_dump_path(tool_path.stem, profile)
+            cmd += ["--profile", profile, "--top", str(profile_top), "--dump", str(dump_path)]
+        elif repetitions is not None:
+            cmd += ["--repeat", str(repetitions)]
         
         try:
-            process = await asyncio.create_subprocess_exec(
-                "python", str(tool_path), params_json,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout
-            )
+            async with self._execution_slot(tool_name):
+                with self._phase(tool_name, "spawn", "tool.spawn"):
+                    process = await self._spawn(
+                        *cmd,
+                        stdin=subprocess.PIPE if request is not None else subprocess.DEVNULL,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        pass_fds=() if params_fd is None else (params_fd,)
+                    )
+                    if params_fd is not None:
+                        os.close(params_fd)
+                        params_fd = None
+                
+                with self._phase(tool_name, "execution", "tool.run"):
+                    stdout, stderr = await asyncio.wait_for(
+                        process.communicate(request),
+                        timeout=timeout
+                    )
             
             if process.returncode != 0:
                 return {
@@ -124,21 +320,47 @@ class ToolManager:
                     "error": stderr.decode() if stderr else "Tool execution failed"
                 }
             
-            try:
-                output = json.loads(stdout.decode())
-                return {
-                    "success": True,
-                    "result": output
-                }
-            except json.JSONDecodeError:
-                return {
-                    "success": True,
-                    "result": stdout.decode()
+            decode_start = time.perf_counter()
+            with self.tracer.span("tool.decode"):
+                text = stdout.decode()
+                report = measurement = None
+                if framed:
+                    # One framed response from the runtime
+                    response = json.loads(next(iter_frames(stdout), b"{}"))
+                    if "output" not in response:
+                        return {
+                            "success": False,
+                            "error": response.get("error") or stderr.decode() or "Tool execution failed"
+                        }
+                    text = response["output"]
+                elif profile or repetitions is not None:
+                    envelope = json.loads(text)
+                    text = envelope["output"]
+                    report = envelope.get("profile")
+                    measurement = envelope.get("measurement")
+                try:
+                    output = json.loads(text)
+                except json.JSONDecodeError:
+                    output = text
+            self.metrics.observe(
+                "tool", tool_name, "serialization",
+                encode_time + time.perf_counter() - decode_start
+            )
+            result = {
+                "success": True,
+                "result": output
+            }
+            if report is not None:
+                result["profile"] = report
+            if measurement is not None:
+                result["measurement"] = {
+                    "cold_ms": measurement["cold"] * 1000,
+                    "latency_ms": distribution(sample * 1000 for sample in measurement["warm"]),
+                    "peak_rss_mb": measurement["peak_rss_bytes"] / (1024 * 1024)
                 }
+            return result
                 
         except asyncio.TimeoutError:
-            process.kill()
-            await process.wait()  # Clean up the process
             return {
                 "success": False,
                 "error": f"Tool execution timed out after {timeout} seconds"
@@ -148,83 +370,503 @@ class ToolManager:
                 "success": False,
                 "error": str(e)
             }
+        finally:
+            if params_fd is not None:
+                os.close(params_fd)
+            if process is not None:
+                await self._reap(process)
     
-    async def create_tool(self, name: str, code: str, overwrite: bool = False) -> Dict[str, Any]:
-        tool_path = self.tools_dir / f"{name}.py"
+    @staticmethod
+    def _params_memfd(payload: bytes) -> Optional[int]:
+        """An anonymous in-memory file holding ``payload``, rewound for the child to read.
+
+        ``None`` where ``memfd_create`` is unavailable (or fails), in which
+        case the payload goes through the stdin pipe instead.
+        """
+        memfd_create = getattr(os, "memfd_create", None)
+        if memfd_create is None:
+            return None
+        try:
+            fd = memfd_create("anymcp-params", os.MFD_CLOEXEC)
+        except OSError:
+            return None
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+            os.lseek(fd, 0, os.SEEK_SET)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+    
+    async def _execute_in_worker(self, tool_name: str, tool_path: Path, parameters: Dict[str, Any],
+                                 timeout: int) -> Dict[str, Any]:
+        """Run a tool in a warm pool worker that keeps its module loaded"""
+        try:
+            async with self._execution_slot(tool_name):
+                with self._phase(tool_name, "execution", "tool.run"):
+                    # The published object is immutable, so this call keeps its
+                    # version even if the tool is republished meanwhile
+                    run_path, origin = self._pin(tool_path)
+                    token = object()
+                    try:
+                        response = await asyncio.to_thread(
+                            self.worker_pool.run, run_path, parameters, timeout, token, origin, self.tracer
+                        )
+                    except asyncio.CancelledError:
+                        # The thread cannot be interrupted, so stop the worker it waits on
+                        self.worker_pool.cancel(token)
+                        raise
+        except TimeoutError:
+            return {
+                "success": False,
+                "error": f"Tool execution timed out after {timeout} seconds"
+            }
+        except WorkerPoolError as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
         
-        if tool_path.exists() and not overwrite:
+        if "error" in response:
             return {
                 "success": False,
-                "error": f"Tool '{name}' already exists. Use overwrite=True to replace it."
+                "error": response["error"]
             }
+        decode_start = time.perf_counter()
+        with self.tracer.span("tool.decode"):
+            try:
+                output = json.loads(response["output"])
+            except json.JSONDecodeError:
+                output = response["output"]
+        self.metrics.observe("tool", tool_name, "serialization", time.perf_counter() - decode_start)
+        return {
+            "success": True,
+            "result": output
+        }
+    
+    async def _execute_in_server(self, tool_name: str, tool_path: Path, run_path: Path,
+                                 origin: Optional[Path], version: Tuple, workload: Dict[str, str], parameters: Dict[str, Any],
+                                 timeout: int) -> Dict[str, Any]:
+        """Run a pure, I/O-bound or looping tool in a thread of the server process.
+
+        The module stays loaded in the server, and each call runs off the
+        event loop under ``timeout``, so even a slow in-process call does not
+        stall other requests. A call cannot be killed: a thread that times
+        out finishes in the background, which is why anything that could
+        hang or disturb the process is classified for the worker pool. Each
+        call's wall and CPU time go to the router, which moves the tool to a
+        slower lane if it was misjudged.
+        """
+        executor = workload["executor"]
+        
+        def threaded_call() -> Tuple[str, float, float]:
+            # Importing may touch the disk, so it happens here rather than on the loop
+            module = self._modules.get(str(run_path), origin and str(origin))
+            start, cpu_start = time.perf_counter(), time.thread_time()
+            # to_thread copies the context, so this is the trace of "tool.run"
+            with TOOL_STDOUT.capture(), trace_environ(self.tracer.context()):
+                output = format_output(call_execute(module.execute, parameters))
+            return output, time.perf_counter() - start, time.thread_time() - cpu_start
         
         try:
-            ast.parse(code)
-        except SyntaxError as e:
+            async with self._execution_slot(tool_name):
+                with self._phase(tool_name, "execution", "tool.run"):
+                    output, wall, cpu = await asyncio.wait_for(asyncio.to_thread(threaded_call), timeout)
+        except asyncio.TimeoutError:
             return {
                 "success": False,
-                "error": f"Invalid Python syntax: {str(e)}"
+                "error": f"Tool execution timed out after {timeout} seconds"
+            }
+        except (Exception, SystemExit):
+            return {
+                "success": False,
+                "error": traceback.format_exc()
             }
         
-        if "def execute(" not in code:
-            wrapper_code = f'''
-import json
-from pathlib import Path
+        self.router.observe(str(tool_path), version, workload, executor, wall, cpu)
+        decode_start = time.perf_counter()
+        with self.tracer.span("tool.decode"):
+            try:
+                output = json.loads(output)
+            except json.JSONDecodeError:
+                pass
+        self.metrics.observe("tool", tool_name, "serialization", time.perf_counter() - decode_start)
+        return {
+            "success": True,
+            "result": output,
+            "executor": executor
+        }
+    
+    async def benchmark_tool(self, tool_name: str, parameters: Dict[str, Any], iterations: int = 20,
+                             warmup: int = 3, concurrency: int = 1, mode: Optional[str] = None,
+                             timeout: int = 30) -> Dict[str, Any]:
+        """Latency distribution of one tool, measured through ``execute_tool``.
 
-{code}
+        The first call is reported as the cold start, ``warmup`` more calls
+        are discarded, then ``iterations`` calls run with up to
+        ``concurrency`` in flight. Peak RSS comes from one extra measured run
+        in a dedicated worker.
+        """
+        for name, value, minimum in (("iterations", iterations, 1), ("warmup", warmup, 0),
+                                     ("concurrency", concurrency, 1)):
+            if not isinstance(value, int) or value < minimum:
+                return {
+                    "success": False,
+                    "error": f"{name} must be an integer >= {minimum}"
+                }
+        mode = mode or self.execution_mode
+        if mode not in EXECUTION_MODES:
+            return {
+                "success": False,
+                "error": f"Unknown execution mode '{mode}', expected one of: {', '.join(EXECUTION_MODES)}"
+            }
+        
+        async def timed_call() -> Tuple[float, Dict[str, Any]]:
+            start = time.perf_counter()
+            result = await self.execute_tool(tool_name, parameters, timeout, mode=mode)
+            return time.perf_counter() - start, result
+        
+        with self.tracer.span("tool.benchmark", tool=tool_name, mode=mode, iterations=iterations):
+            cold, first = await timed_call()
+            if not first["success"]:
+                return {
+                    "success": False,
+                    "error": f"Tool failed on the first call: {first['error']}"
+                }
+            for _ in range(warmup):
+                await timed_call()
+            
+            in_flight = asyncio.Semaphore(concurrency)
+            
+            async def measured_call() -> Tuple[float, Dict[str, Any]]:
+                async with in_flight:
+                    return await timed_call()
+            
+            started = time.perf_counter()
+            samples = await asyncio.gather(*(measured_call() for _ in range(iterations)))
+            wall_time = time.perf_counter() - started
+            footprint = await self.measure_tool(tool_name, parameters, repetitions=1, timeout=timeout)
+        
+        return {
+            "success": True,
+            "tool": tool_name,
+            "mode": mode,
+            "iterations": iterations,
+            "warmup": warmup,
+            "concurrency": concurrency,
+            "cold_ms": cold * 1000,
+            "latency_ms": distribution(duration * 1000 for duration, _ in samples),
+            "throughput": iterations / wall_time if wall_time > 0 else 0.0,
+            "wall_time": wall_time,
+            "errors": sum(1 for _, result in samples if not result["success"]),
+            "peak_rss_mb": footprint["measurement"]["peak_rss_mb"] if footprint["success"] else None
+        }
+    
+    async def execute_tool_batch(self, tool_name: str, cases: List[Dict[str, Any]],
+                                 timeout: int = 30) -> Dict[str, Any]:
+        """Run many parameter sets against one tool in a single worker process.
 
-if __name__ == "__main__":
-    import argparse
-    parser = argparse.ArgumentParser()
-    parser.add_argument('params', nargs='?', default='{{}}')
-    args = parser.parse_args()
+        The tool module is imported once and ``execute()`` is called for each
+        case in order; ``timeout`` applies per case. Results come back in the
+        same order, each shaped like an ``execute_tool`` result, so a failing
+        case does not affect the others.
+        """
+        if not isinstance(cases, list) or not all(isinstance(case, dict) for case in cases):
+            return {
+                "success": False,
+                "error": "Batch cases must be a list of parameter objects"
+            }
+        tool_path = await self._resolve_tool_path(tool_name)
+        if tool_path is None:
+            return {
+                "success": False,
+                "error": f"Tool '{tool_name}' not found"
+            }
+        if not cases:
+            return {"success": True, "results": [], "count": 0}
+        
+        process = None
+        # Every case runs the version that was current when the batch started
+        run_path, origin = self._pin(tool_path)
+        cmd = ["python", str(WORKER_SCRIPT), str(run_path), "--batch"]
+        if origin is not None:
+            cmd += ["--origin", str(origin)]
+        with self.tracer.span("tool.execute_batch", tool=tool_name, cases=len(cases)) as span:
+            try:
+                async with self._execution_slot(tool_name):
+                    with self._phase(tool_name, "spawn", "tool.spawn"):
+                        process = await self._spawn(
+                            *cmd,
+                            stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE
+                        )
+                    stdout, stderr = await asyncio.wait_for(
+                        process.communicate(json.dumps(cases).encode()),
+                        timeout=timeout * len(cases)
+                    )
+                if process.returncode != 0:
+                    raise RuntimeError(stderr.decode() if stderr else "Tool execution failed")
+                entries = json.loads(stdout.decode())["results"]
+            except asyncio.TimeoutError:
+                span.set_error("timeout")
+                return {
+                    "success": False,
+                    "error": f"Tool batch timed out after {timeout * len(cases)} seconds"
+                }
+            except Exception as e:
+                span.set_error(str(e)[:200])
+                return {
+                    "success": False,
+                    "error": str(e)
+                }
+            finally:
+                if process is not None:
+                    await self._reap(process)
+        
+        results = []
+        for entry in entries:
+            self.metrics.observe("tool", tool_name, "execution", entry["duration"])
+            self.metrics.count_call("tool", tool_name, error="error" in entry)
+            if "error" in entry:
+                results.append({"success": False, "error": entry["error"]})
+                continue
+            try:
+                output = json.loads(entry["output"])
+            except json.JSONDecodeError:
+                output = entry["output"]
+            results.append({"success": True, "result": output})
+        return {"success": True, "results": results, "count": len(results)}
     
-    params = json.loads(args.params)
-    result = execute(**params) if params else execute()
+    async def create_tool(self, name: str, code: str, overwrite: bool = False,
+                          preload: Optional[bool] = None) -> Dict[str, Any]:
+        """Write a tool and prepare it for its first call.
+
+        The final source is parsed once; that tree is validated, compiled to
+        bytecode (stored as the file's pyc), and mined for the metadata the
+        index serves to ``search_tools``, including its workload class. With
+        ``preload`` (the default in worker mode, and in auto mode for tools
+        classified for the pool) idle pool workers import the new module
+        straight away.
+        """
+        tool_path = self.tools_dir / f"{name}.py"
+        
+        if tool_path.exists() and not overwrite:
+            return {
+                "success": False,
+                "error": f"Tool '{name}' already exists. Use overwrite=True to replace it."
+            }
+        
+        with self.metrics.timer("tool", name, "precompile"):
+            try:
+                source, tree, bytecode = self._build_tool(code, tool_path)
+            except SyntaxError as e:
+                return {
+                    "success": False,
+                    "error": f"Invalid Python syntax: {str(e)}"
+                }
+        
+        source_bytes = source.encode("utf-8")
+        published = await asyncio.to_thread(self.store.publish, name, source_bytes)
+        prepared = await self._prepare_tool(
+            tool_path, source_bytes, tree, bytecode, preload, published["object_path"]
+        )
+        
+        return {
+            "success": True,
+            "message": f"Tool '{name}' created successfully",
+            "path": str(tool_path),
+            "content_hash": published["content_hash"],
+            **prepared
+        }
     
-    if isinstance(result, (dict, list)):
-        print(json.dumps(result))
-    else:
-        print(result)
-'''
-        else:
-            if "__main__" not in code:
-                code += '''
+    @staticmethod
+    def _build_tool(code: str, tool_path: Path) -> Tuple[str, ast.AST, Any]:
+        """Final source, syntax tree and bytecode for a tool; raises SyntaxError.
 
-if __name__ == "__main__":
-    import json
-    import argparse
+        Tools hold only their logic; anymcp.runtime calls execute(). Code that
+        does not define it gets the imports the old wrapper gave it, and error
+        line numbers stay relative to the code as written.
+        """
+        offset = 0
+        source = code
+        if "def execute(" not in code:
+            offset = 4
+            source = f"""
+import json
+from pathlib import Path
+
+{code}
+"""
+        try:
+            tree = ast.parse(source)
+            return source, tree, compile_tool(tree, tool_path)
+        except SyntaxError as e:
+            if e.lineno:
+                e.lineno = max(1, e.lineno - offset)
+            raise
     
-    parser = argparse.ArgumentParser()
-    parser.add_argument('params', nargs='?', default='{}')
-    args = parser.parse_args()
+    @staticmethod
+    def _write_bytecode(tool_path: Path, source: bytes, bytecode, object_path: Optional[Path] = None) -> bool:
+        try:
+            for path in filter(None, (tool_path, object_path)):
+                write_bytecode(path, source, bytecode)
+            return True
+        except OSError:
+            # A read-only __pycache__ only costs the first import a compile
+            return False
     
-    params = json.loads(args.params)
-    result = execute(**params) if params else execute()
+    async def _prepare_tool(self, tool_path: Path, source: bytes, tree: ast.AST, bytecode,
+                            preload: Optional[bool] = None,
+                            object_path: Optional[Path] = None) -> Dict[str, Any]:
+        """Store a published tool's bytecode and metadata, and optionally warm the workers"""
+        precompiled = self._write_bytecode(tool_path, source, bytecode, object_path)
+        tool_info = tool_metadata(tree, tool_path)
+        self.index.store(tool_path, tool_info)
+        
+        if preload is None:
+            preload = self.execution_mode == "worker" or (
+                self.execution_mode == "auto" and tool_info["workload"]["executor"] == "process"
+            )
+        warmed = 0
+        if preload:
+            with self.metrics.timer("tool", tool_path.stem, "preload"):
+                run_path, origin = self._pin(tool_path, object_path)
+                warmed = await asyncio.to_thread(self.worker_pool.preload, run_path, origin=origin)
+        return {"precompiled": precompiled, "warmed_workers": warmed}
     
-    if isinstance(result, (dict, list)):
-        print(json.dumps(result))
-    else:
-        print(result)
-'''
+    async def import_tools(self, source: str, overwrite: bool = False) -> Dict[str, Any]:
+        """Create every tool in a directory or a tar/zip archive as one batch.
+
+        Each ``*.py`` file becomes the tool named after its stem, with the
+        same source handling as ``create_tool``. Files are validated and
+        compiled concurrently, the valid ones published together through
+        ``ToolStore.publish_batch`` and then indexed in one pass. Files that
+        cannot be read, do not compile or would replace an existing tool
+        without ``overwrite`` are reported under ``failed``; the rest are
+        still imported. Workers load imported tools on first use.
+        """
+        try:
+            files, failed = await asyncio.to_thread(read_tool_sources, Path(source))
+        except ToolSourceError as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
         
-        async with aiofiles.open(tool_path, 'w') as f:
-            await f.write(wrapper_code if 'wrapper_code' in locals() else code)
+        def validate(name: str, origin: str, data: bytes) -> Dict[str, Any]:
+            tool_path = self.tools_dir / f"{name}.py"
+            if tool_path.exists() and not overwrite:
+                return {"error": f"Tool '{name}' already exists. Use overwrite=True to replace it."}
+            try:
+                tool_source, tree, bytecode = self._build_tool(data.decode("utf-8"), tool_path)
+            except UnicodeDecodeError as e:
+                return {"error": f"File is not UTF-8: {e}"}
+            except (SyntaxError, ValueError) as e:
+                return {"error": f"Invalid Python syntax: {str(e)}"}
+            return {
+                "source": tool_source.encode("utf-8"),
+                "bytecode": bytecode,
+                "metadata": tool_metadata(tree, tool_path)
+            }
+        
+        with self.metrics.timer("builtin", "import_tools", "validate"):
+            checked = await asyncio.gather(*(asyncio.to_thread(validate, *entry) for entry in files))
+        valid = {}
+        for (name, origin, _), outcome in zip(files, checked):
+            if "error" in outcome:
+                failed.append({"name": name, "file": origin, "error": outcome["error"]})
+            else:
+                valid[name] = outcome
         
-        tool_path.chmod(0o755)
+        published = {}
+        if valid:
+            try:
+                published = await asyncio.to_thread(
+                    self.store.publish_batch, {name: outcome["source"] for name, outcome in valid.items()}
+                )
+            except OSError as e:
+                return {
+                    "success": False,
+                    "error": f"Publishing the batch failed, no tool was changed: {e}",
+                    "failed": failed
+                }
+            await asyncio.gather(*(
+                asyncio.to_thread(
+                    self._write_bytecode, self.tools_dir / f"{name}.py", outcome["source"],
+                    outcome["bytecode"], published[name]["object_path"]
+                )
+                for name, outcome in valid.items()
+            ))
+            for name, outcome in valid.items():
+                self.index.store(self.tools_dir / f"{name}.py", outcome["metadata"])
         
+        result = {
+            "success": bool(published) or not failed,
+            "imported": [
+                {
+                    "name": name,
+                    "path": str(self.tools_dir / f"{name}.py"),
+                    "content_hash": published[name]["content_hash"]
+                }
+                for name in valid
+            ],
+            "failed": sorted(failed, key=lambda entry: entry["file"]),
+            "count": len(published)
+        }
+        if not result["success"]:
+            result["error"] = f"None of the {len(failed)} tools in '{source}' could be imported"
+        return result
+    
+    async def rollback_tool(self, name: str, version: Optional[str] = None,
+                            preload: Optional[bool] = None) -> Dict[str, Any]:
+        """Republish a retained version of a tool: the previous one, or ``version`` (a content hash prefix)"""
+        try:
+            published = await asyncio.to_thread(self.store.rollback, name, version)
+        except KeyError as e:
+            return {
+                "success": False,
+                "error": e.args[0]
+            }
+        
+        tool_path = self.tools_dir / f"{name}.py"
+        source = published["object_path"].read_bytes()
+        tree = ast.parse(source)
+        prepared = await self._prepare_tool(
+            tool_path, source, tree, compile_tool(tree, tool_path), preload, published["object_path"]
+        )
         return {
             "success": True,
-            "message": f"Tool '{name}' created successfully",
-            "path": str(tool_path)
+            "tool": name,
+            "content_hash": published["content_hash"],
+            "previous": published["previous"],
+            "versions": self.store.versions(name),
+            **prepared
+        }
+    
+    def tool_versions(self, name: str) -> Dict[str, Any]:
+        """Retained versions of a tool, newest first"""
+        versions = self.store.versions(name)
+        if not versions:
+            return {
+                "success": False,
+                "error": f"Tool '{name}' has no published versions"
+            }
+        return {
+            "success": True,
+            "tool": name,
+            "retain": self.store.retain,
+            "versions": versions
         }
     
     async def create_tool_test(self, tool_name: str, test_scenarios: List[Dict[str, Any]]) -> Dict[str, Any]:
         feature_path = Path("features") / f"test_{tool_name}.feature"
-        steps_path = Path("features/steps") / f"test_{tool_name}_steps.py"
+        steps_dir = Path("features/steps")
         
         feature_path.parent.mkdir(exist_ok=True)
-        steps_path.parent.mkdir(exist_ok=True)
+        steps_dir.mkdir(exist_ok=True)
         
         feature_content = f"""Feature: Test {tool_name} tool
   Testing the {tool_name} tool functionality
@@ -246,58 +888,93 @@ if __name__ == "__main__":
                 feature_content += f"    Then the result should be \"{scenario['expected']}\"\n"
             if "error" in scenario:
                 feature_content += f"    Then an error should occur with message \"{scenario['error']}\"\n"
-        
-        # Use a unique step function name to avoid conflicts
-        steps_content = f'''from behave import given, when, then
-import json
-from pathlib import Path
-import asyncio
-
-# Add parent directory to Python path for imports
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-from anymcp.tool_manager import ToolManager
-
-# Use the common step definitions if they exist, otherwise define them
-try:
-    from common_steps import *
-except ImportError:
-    @given('the "{{tool_name}}" tool is available')
-    def step_{tool_name}_tool_available(context, tool_name):
-        context.tool_manager = ToolManager()
-        context.tool_name = tool_name
-
-    @when('I execute "{{tool_name}}" with parameters')
-    def step_{tool_name}_execute_with_params(context, tool_name):
-        params = {{}}
-        for row in context.table:
-            params[row["parameter"]] = row["value"]
-        
-        result = asyncio.run(context.tool_manager.execute_tool(tool_name, params))
-        context.result = result
-
-    @then('the result should be "{{expected}}"')
-    def step_{tool_name}_check_result(context, expected):
-        assert context.result["success"], f"Tool execution failed: {{context.result}}"
-        assert str(context.result["result"]) == expected, f"Expected {{expected}}, got {{context.result['result']}}"
-
-    @then('an error should occur with message "{{message}}"')
-    def step_{tool_name}_check_error(context, message):
-        assert not context.result["success"], "Expected an error but tool succeeded"
-        assert message in context.result["error"], f"Expected error '{{message}}', got '{{context.result['error']}}"
-'''
+            repetitions = scenario.get("repetitions", 5)
+            if "max_latency_ms" in scenario:
+                feature_content += (f"    Then the warm latency over {repetitions} runs "
+                                    f"should be under {scenario['max_latency_ms']} ms\n")
+            if "max_memory_mb" in scenario:
+                feature_content += (f"    Then the peak memory over {repetitions} runs "
+                                    f"should be under {scenario['max_memory_mb']} MB\n")
         
         async with aiofiles.open(feature_path, 'w') as f:
             await f.write(feature_content)
         
-        async with aiofiles.open(steps_path, 'w') as f:
-            await f.write(steps_content)
+        # Steps come from the shared library; drop this tool's old generated module
+        self._write_step_loader(steps_dir)
+        legacy_path = steps_dir / f"test_{tool_name}_steps.py"
+        if legacy_path.exists() and self._is_generated_steps(legacy_path):
+            legacy_path.unlink()
         
         return {
             "success": True,
             "message": f"Test created for tool '{tool_name}'",
             "feature_file": str(feature_path),
-            "steps_file": str(steps_path)
+            "steps_file": str(STEP_LIBRARY),
+            "steps_loader": str(steps_dir / STEP_LOADER_NAME)
+        }
+    
+    async def migrate_test_steps(self) -> Dict[str, Any]:
+        """Replace generated ``test_<tool>_steps.py`` modules with the shared step library.
+
+        Modules that still look exactly like ``create_tool_test`` output are
+        deleted; anything with hand-written steps is left alone and reported.
+        """
+        steps_dir = Path("features/steps")
+        removed, kept = [], []
+        for path in sorted(steps_dir.glob("test_?*_steps.py")):
+            if self._is_generated_steps(path):
+                path.unlink()
+                removed.append(str(path))
+            else:
+                kept.append(str(path))
+        loader_path = self._write_step_loader(steps_dir)
+        return {
+            "success": True,
+            "removed": removed,
+            "kept": kept,
+            "steps_loader": str(loader_path)
+        }
+    
+    async def migrate_tools(self) -> Dict[str, Any]:
+        """Strip the ``__main__`` block older ``create_tool`` wrote into every tool.
+
+        Tools now run through ``anymcp.runtime``, so the block is dead code.
+        Only blocks identical to the generated ones are removed, and each
+        stripped file is published as a new version (``rollback_tool`` can
+        bring the old one back). Hand-written ``__main__`` blocks are kept.
+        """
+        migrated, kept, failed = [], [], []
+        for tool_path in sorted(self.tools_dir.glob("*.py")):
+            try:
+                source = tool_path.read_text(encoding="utf-8")
+                tree = ast.parse(source)
+            except (OSError, SyntaxError, ValueError) as e:
+                failed.append({"path": str(tool_path), "error": str(e)})
+                continue
+            mains = [
+                node for node in tree.body
+                if isinstance(node, ast.If) and "__main__" in ast.unparse(node.test)
+            ]
+            generated = [node for node in mains if ast.dump(node) in LEGACY_MAIN_BLOCKS]
+            if len(generated) < len(mains):
+                kept.append(str(tool_path))
+            if not generated:
+                continue
+            lines = source.splitlines(keepends=True)
+            for node in reversed(generated):
+                del lines[node.lineno - 1:node.end_lineno]
+            source_bytes = ("".join(lines).rstrip() + "\n").encode("utf-8")
+            tree = ast.parse(source_bytes)
+            published = await asyncio.to_thread(self.store.publish, tool_path.stem, source_bytes)
+            await self._prepare_tool(
+                tool_path, source_bytes, tree, compile_tool(tree, tool_path), False, published["object_path"]
+            )
+            migrated.append(str(tool_path))
+        return {
+            "success": True,
+            "migrated": migrated,
+            "kept": kept,
+            "failed": failed
         }
     
     async def test_tool(self, tool_name: str, verbose: bool = False) -> Dict[str, Any]:
@@ -309,24 +986,22 @@ except ImportError:
                 "error": f"No tests found for tool '{tool_name}'"
             }
         
-        cmd = ["behave", str(feature_file)]
-        if verbose:
-            cmd.append("-v")
-        
+        fd, budget_path = tempfile.mkstemp(prefix="anymcp_budgets_", suffix=".jsonl")
+        os.close(fd)
+        budget_path = Path(budget_path)
         try:
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+            returncode, stdout, stderr, report = await self._run_behave(
+                [str(feature_file)], verbose,
+                extra_args=["-D", f"{BUDGET_REPORT_USERDATA}={budget_path}"]
             )
             
-            stdout, stderr = await result.communicate()
-            
             return {
-                "success": result.returncode == 0,
-                "output": stdout.decode(),
-                "error": stderr.decode() if stderr else None,
-                "passed": result.returncode == 0
+                "success": returncode == 0,
+                "output": stdout,
+                "error": stderr or None,
+                "passed": returncode == 0,
+                "results": summarize(report),
+                "budgets": load_budgets(budget_path)
             }
             
         except Exception as e:
@@ -334,54 +1009,50 @@ except ImportError:
                 "success": False,
                 "error": str(e)
             }
+        finally:
+            budget_path.unlink(missing_ok=True)
     
-    async def run_test(self, test_name: str, verbose: bool = False) -> Dict[str, Any]:
-        """Run a specific test file or all tests"""
+    async def run_test(self, test_name: str, verbose: bool = False,
+                       shards: Optional[int] = None, force: bool = False) -> Dict[str, Any]:
+        """Run a specific test file or all tests.
+
+        ``all`` only re-runs feature files whose inputs changed since they
+        last passed (``force`` re-runs everything) and spreads them over up
+        to ``shards`` parallel behave processes (default: one per CPU).
+        """
         if test_name == "all":
-            feature_path = Path("features")
-        else:
-            feature_path = Path("features") / f"{test_name}.feature"
-            if not feature_path.exists():
-                feature_path = Path("features") / f"test_{test_name}.feature"
-            
-            if not feature_path.exists():
+            try:
+                return await self._run_all(verbose, shards, force)
+            except Exception as e:
                 return {
                     "success": False,
-                    "error": f"Test file not found: {test_name}"
+                    "error": str(e)
                 }
         
-        cmd = ["behave", str(feature_path)]
-        if verbose:
-            cmd.append("-v")
+        feature_path = Path("features") / f"{test_name}.feature"
+        if not feature_path.exists():
+            feature_path = Path("features") / f"test_{test_name}.feature"
+        
+        if not feature_path.exists():
+            return {
+                "success": False,
+                "error": f"Test file not found: {test_name}"
+            }
         
         try:
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=self.tools_dir.parent
+            returncode, output_text, stderr, report = await self._run_behave(
+                [str(feature_path)], verbose, cwd=self.tools_dir.parent
             )
             
-            stdout, stderr = await result.communicate()
-            
-            # Parse behave output for summary
-            output_text = stdout.decode()
-            passed = result.returncode == 0
-            
-            # Extract test statistics from output
-            stats = {}
-            for line in output_text.split('\n'):
-                if 'scenarios passed' in line or 'scenarios failed' in line:
-                    stats['scenarios'] = line.strip()
-                elif 'steps passed' in line or 'steps failed' in line:
-                    stats['steps'] = line.strip()
+            passed = returncode == 0
             
             return {
                 "success": passed,
                 "output": output_text,
-                "error": stderr.decode() if stderr and not passed else None,
+                "error": stderr if stderr and not passed else None,
                 "passed": passed,
-                "statistics": stats
+                "statistics": self._parse_statistics(output_text),
+                "results": summarize(report)
             }
             
         except Exception as e:
@@ -390,8 +1061,191 @@ except ImportError:
                 "error": str(e)
             }
     
-    async def shell_command(self, command: str, timeout: int = 30, cwd: str = None) -> Dict[str, Any]:
-        """Execute a shell command safely"""
+    async def _run_all(self, verbose: bool, shards: Optional[int], force: bool) -> Dict[str, Any]:
+        """Run every feature file, reusing cached results for unchanged ones"""
+        project_dir = self.tools_dir.parent
+        feature_files = sorted((project_dir / "features").glob("*.feature"))
+        keys = {path: path.relative_to(project_dir).as_posix() for path in feature_files}
+        def fingerprints() -> Dict[Path, str]:
+            package = package_digest()
+            return {
+                path: fingerprint(feature_inputs(path, project_dir, self.tools_dir), package)
+                for path in feature_files
+            }
+        
+        digests = await asyncio.to_thread(fingerprints)
+        cached = {} if force else {
+            path: entry for path in feature_files
+            if (entry := self.test_cache.lookup(keys[path], digests[path])) is not None
+        }
+        stale = [path for path in feature_files if path not in cached]
+        
+        if not stale and cached:
+            result = {
+                "success": True,
+                "output": f"All {len(cached)} feature files unchanged since they last passed; "
+                          "reporting cached results\n",
+                "error": None,
+                "passed": True
+            }
+            report = []
+        else:
+            shard_count = min(shards or os.cpu_count() or 1, len(stale))
+            if shard_count > 1:
+                result, report = await self._run_sharded(stale, shard_count, verbose)
+            else:
+                # Without cache hits, keep running the directory as a whole
+                paths = [f"features/{path.name}" for path in stale] if cached else ["features"]
+                returncode, output_text, stderr, report = await self._run_behave(
+                    paths, verbose, cwd=project_dir
+                )
+                passed = returncode == 0
+                result = {
+                    "success": passed,
+                    "output": output_text,
+                    "error": stderr if stderr and not passed else None,
+                    "passed": passed,
+                    "statistics": self._parse_statistics(output_text)
+                }
+        
+        self._record_results(report, keys, digests)
+        if cached:
+            report = report + [feature for entry in cached.values() for feature in entry["features"]]
+        result["results"] = summarize(report)
+        if cached:
+            totals = result["results"]["totals"]
+            result["statistics"] = {
+                kind: format_summary(kind, totals[kind]) for kind in ("scenarios", "steps")
+            }
+        result["ran"] = [path.name for path in stale]
+        result["cached"] = [path.name for path in cached]
+        return result
+    
+    @staticmethod
+    def _parse_statistics(output_text: str) -> Dict[str, str]:
+        """Extract behave's summary lines from its text output"""
+        stats = {}
+        for line in output_text.split('\n'):
+            if 'scenarios passed' in line or 'scenarios failed' in line:
+                stats['scenarios'] = line.strip()
+            elif 'steps passed' in line or 'steps failed' in line:
+                stats['steps'] = line.strip()
+        return stats
+    
+    def _record_results(self, report: List[Dict[str, Any]], keys: Dict[Path, str],
+                        digests: Dict[Path, str]) -> None:
+        """Cache each passing feature under the fingerprint its run started with"""
+        by_name = {path.name: path for path in keys}
+        for feature in report:
+            path = by_name.get(Path(feature.get("location", "").rsplit(":", 1)[0]).name)
+            if path is None:
+                continue
+            if feature.get("status") == "passed":
+                self.test_cache.record(keys[path], digests[path], [feature])
+            else:
+                self.test_cache.forget(keys[path])
+        self.test_cache.save()
+    
+    async def _run_sharded(self, feature_files: List[Path], shard_count: int,
+                           verbose: bool) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Run feature files in parallel shards; return the merged result and JSON report"""
+        started = time.perf_counter()
+        groups = plan_shards(feature_files, shard_count)
+        shards = await asyncio.gather(*(
+            self._run_shard(index, group, verbose) for index, group in enumerate(groups)
+        ))
+        
+        passed = all(shard["passed"] for shard in shards)
+        merged = merge_summaries(shard.pop("summary") for shard in shards)
+        report = [feature for shard in shards for feature in shard.pop("report")]
+        output = "\n".join(
+            f"=== shard {shard['shard']} ({shard['duration']:.2f}s): {', '.join(shard['features'])} ===\n"
+            f"{shard.pop('output')}"
+            for shard in shards
+        )
+        errors = "\n".join(error for error in (shard.pop("error") for shard in shards) if error)
+        
+        return {
+            "success": passed,
+            "output": output,
+            "error": errors if errors and not passed else None,
+            "passed": passed,
+            "statistics": {
+                kind: format_summary(kind, merged[kind])
+                for kind in ("scenarios", "steps") if kind in merged
+            },
+            "shards": shards,
+            "wall_time": time.perf_counter() - started
+        }, report
+    
+    async def _run_shard(self, index: int, feature_files: List[Path], verbose: bool) -> Dict[str, Any]:
+        """Run one shard with the behave CLI in a throwaway copy of the project"""
+        project_dir = self.tools_dir.parent.resolve()
+        workspace = Path(tempfile.mkdtemp(prefix=f"anymcp_shard{index}_"))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            path for path in (str(project_dir), str(PACKAGE_ROOT), env.get("PYTHONPATH")) if path
+        )
+        report_path = workspace / "report.json"
+        cmd = ["behave", *(f"features/{path.name}" for path in feature_files),
+               *formatter_args(report_path), *self._tools_dir_args(workspace / "tools")]
+        if verbose:
+            cmd.append("-v")
+        
+        process = None
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(
+                prepare_workspace, project_dir, project_dir / "features",
+                self.tools_dir.resolve(), workspace
+            )
+            with self.tracer.span("behave.shard", shard=index, features=len(feature_files)):
+                process = await self._spawn(
+                    *cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    cwd=workspace,
+                    env=env
+                )
+                stdout, stderr = await process.communicate()
+            report = load_report(report_path)
+        finally:
+            if process is not None:
+                await self._reap(process)
+            await asyncio.to_thread(shutil.rmtree, workspace, True)
+        
+        output = stdout.decode()
+        summary = parse_summary(output)
+        return {
+            "shard": index,
+            "features": [path.name for path in feature_files],
+            "duration": time.perf_counter() - started,
+            "passed": process.returncode == 0,
+            "statistics": {
+                kind: format_summary(kind, counts) for kind, counts in summary.items()
+            },
+            "summary": summary,
+            "report": report,
+            "output": output,
+            "error": stderr.decode()
+        }
+    
+    async def shell_command(self, command: str, timeout: int = 30, cwd: str = None,
+                            max_output_bytes: int = DEFAULT_OUTPUT_LIMIT, spill: bool = False,
+                            on_output: Optional[OnChunk] = None,
+                            session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Execute a shell command safely.
+
+        stdout and stderr are read as they are produced and each keeps only
+        its first and last ``max_output_bytes / 2`` bytes, with total byte
+        counts; with ``spill`` the complete streams are also written to files
+        under ``.anymcp/shell/``. ``on_output(stream, chunk)`` is awaited for
+        every chunk, to stream the output while the command runs.
+        
+        With ``session_id`` the command runs in that session's long-lived
+        shell (started on first use), so ``cd``, variables and functions
+        carry over to the session's next command.
+        """
         # Basic safety checks
         dangerous_commands = ['rm -rf /', 'format', 'dd if=']
         for dangerous in dangerous_commands:
@@ -400,45 +1254,464 @@ except ImportError:
                     "success": False,
                     "error": f"Command contains potentially dangerous operation: {dangerous}"
                 }
+        if not isinstance(max_output_bytes, int) or max_output_bytes < 0:
+            return {
+                "success": False,
+                "error": "max_output_bytes must be an integer >= 0"
+            }
         
+        process = None
+        captures = []
         try:
+            spill_path = self._shell_spill_path() if spill else None
+            captures = [
+                StreamCapture(name, max_output_bytes,
+                              spill_path.with_suffix(f".{name}") if spill_path else None)
+                for name in ("stdout", "stderr")
+            ]
+            if session_id is not None:
+                return await self._session_command(session_id, command, timeout, cwd, captures, on_output)
             # Use shell=True for complex commands, but with caution
-            process = await asyncio.create_subprocess_shell(
+            process = await self._spawn(
                 command,
+                shell=True,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=cwd or str(self.tools_dir.parent)
             )
             
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        drain(process.stdout, captures[0], on_output),
+                        drain(process.stderr, captures[1], on_output),
+                        process.wait()
+                    ),
                     timeout=timeout
                 )
-                
-                return {
+                result = {
                     "success": process.returncode == 0,
-                    "stdout": stdout.decode(),
-                    "stderr": stderr.decode(),
                     "exit_code": process.returncode
                 }
-                
             except asyncio.TimeoutError:
-                process.kill()
-                return {
+                # Whatever the command printed before it was stopped is still returned
+                result = {
                     "success": False,
                     "error": f"Command timed out after {timeout} seconds"
                 }
+            
+            return self._with_output(result, captures)
                 
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e)
             }
+        finally:
+            for capture in captures:
+                capture.close()
+            if process is not None:
+                await self._reap(process)
+    
+    @staticmethod
+    def _with_output(result: Dict[str, Any], captures: List[StreamCapture]) -> Dict[str, Any]:
+        """Add the captured stdout and stderr, their sizes and any spill files to a result"""
+        summaries = {}
+        for capture in captures:
+            capture.close()
+            result[capture.name] = capture.text()
+            summaries[capture.name] = capture.summary()
+            result[f"{capture.name}_bytes"] = summaries[capture.name]["bytes"]
+        result["truncated"] = any(summary["truncated"] for summary in summaries.values())
+        spill_files = {name: summary["spill_file"] for name, summary in summaries.items() if "spill_file" in summary}
+        if spill_files:
+            result["spill_files"] = spill_files
+        return result
+    
+    async def _session_command(self, session_id: str, command: str, timeout: int, cwd: Optional[str],
+                               captures: List[StreamCapture],
+                               on_output: Optional[OnChunk]) -> Dict[str, Any]:
+        """Run a command in a persistent shell session; a ``cwd`` changes the session's directory first"""
+        try:
+            session, started = await asyncio.to_thread(
+                self.shell_sessions.acquire, session_id, cwd or str(self.tools_dir.parent)
+            )
+        except ShellSessionError as e:
+            return {"success": False, "error": str(e)}
+        if cwd is not None and not started:
+            command = f"cd -- {shell_quote(cwd)} && {command}"
+        loop = asyncio.get_running_loop()
+        
+        def on_chunk(stream: str, chunk: bytes) -> None:
+            asyncio.run_coroutine_threadsafe(on_output(stream, chunk), loop).result()
+        
+        # Whether the command has started, or was cancelled before it could,
+        # and whether the claim acquire() took on the session was given up
+        state = {"started": False, "cancelled": False, "released": False}
+        state_lock = threading.Lock()
+        
+        def release() -> None:
+            with state_lock:
+                if state["released"]:
+                    return
+                state["released"] = True
+            self.shell_sessions.release(session)
+        
+        def run() -> Dict[str, Any]:
+            # Commands in one session run one at a time; waiting counts against the timeout
+            deadline = time.monotonic() + timeout
+            if not session.lock.acquire(timeout=timeout):
+                release()
+                return {"success": False, "error": f"Shell session '{session_id}' stayed busy for {timeout} seconds"}
+            try:
+                # Holding the session lock now keeps it from eviction
+                release()
+                with state_lock:
+                    if state["cancelled"]:
+                        return {"success": False, "error": "Command was cancelled"}
+                    state["started"] = True
+                exit_code = session.run(command, captures, max(deadline - time.monotonic(), 0),
+                                        on_chunk if on_output is not None else None)
+            except TimeoutError:
+                self.shell_sessions.discard(session)
+                return {
+                    "success": False,
+                    "error": f"Command timed out after {timeout} seconds; shell session '{session_id}' was closed"
+                }
+            except ShellSessionError as e:
+                self.shell_sessions.discard(session)
+                return {"success": False, "error": str(e)}
+            finally:
+                session.lock.release()
+            if exit_code is not None:
+                return {"success": exit_code == 0, "exit_code": exit_code}
+            # The command exited the shell itself
+            self.shell_sessions.discard(session)
+            returncode = session.process.returncode
+            return {"success": returncode == 0, "exit_code": returncode, "session_closed": True}
+        
+        try:
+            result = await asyncio.to_thread(run)
+        except asyncio.CancelledError:
+            # The thread cannot be interrupted: kill the shell it is reading
+            # from (it then sees EOF and drops the session), or keep a command
+            # still waiting for the session from starting
+            with state_lock:
+                state["cancelled"] = True
+                if state["started"]:
+                    session.kill()
+            raise
+        finally:
+            # run() may never have started if the call was cancelled first
+            release()
+        result.update(session_id=session_id, session_started=started)
+        return self._with_output(result, captures)
+    
+    async def submit_job(self, kind: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Start ``execute_tool``, ``run_test`` or ``shell_command`` in the background.
+
+        The job runs in this event loop as in-flight work (shutdown drains
+        it like a call) and stays queued until it holds an execution slot,
+        so ``max_concurrency`` bounds jobs and direct tool calls together. Shell
+        jobs stream their output into the job as it is produced; the others
+        add their output when they finish.
+        """
+        if kind not in JOB_KINDS:
+            return {
+                "success": False,
+                "error": f"Unknown job kind '{kind}', expected one of: {', '.join(JOB_KINDS)}"
+            }
+        if not isinstance(arguments, dict):
+            return {
+                "success": False,
+                "error": "Job arguments must be an object"
+            }
+        required = {"execute_tool": "tool_name", "run_test": "test_name", "shell_command": "command"}[kind]
+        if required not in arguments:
+            return {
+                "success": False,
+                "error": f"{kind} jobs need a '{required}' argument"
+            }
+        if self.coordinator.shutdown_requested:
+            return {
+                "success": False,
+                "error": "Server is shutting down"
+            }
+        job = self.jobs.create(kind, arguments)
+        job.task = asyncio.create_task(self._run_job(job))
+        return {
+            "success": True,
+            "job_id": job.job_id,
+            "status": job.status
+        }
+    
+    async def _run_job(self, job) -> None:
+        arguments = job.arguments
+        
+        async def on_output(stream: str, chunk: bytes) -> None:
+            job.output.append(chunk)
+        
+        # Built-in jobs wait under their own name, so server_stats' tools section only lists tools
+        if job.kind == "execute_tool":
+            slot = self._execution_slot(arguments["tool_name"])
+        else:
+            slot = self._execution_slot(job.kind, "builtin")
+        try:
+            async with self.coordinator.work(), slot:
+                job.start()
+                if job.kind == "execute_tool":
+                    result = await self.execute_tool(
+                        arguments["tool_name"], arguments.get("parameters", {}), arguments.get("timeout", 30),
+                        mode=arguments.get("mode")
+                    )
+                    output = result.get("result") if result["success"] else result.get("error")
+                    if output is not None and not isinstance(output, str):
+                        output = json.dumps(output)
+                elif job.kind == "run_test":
+                    result = await self.run_test(
+                        arguments["test_name"], arguments.get("verbose", False),
+                        arguments.get("shards"), arguments.get("force", False)
+                    )
+                    output = (result.get("output") or "") + (result.get("error") or "")
+                else:
+                    result = await self.shell_command(
+                        arguments["command"], arguments.get("timeout", 30), arguments.get("cwd"),
+                        arguments.get("max_output_bytes", DEFAULT_OUTPUT_LIMIT),
+                        arguments.get("spill", False), on_output, arguments.get("session_id")
+                    )
+                    output = None
+            if output:
+                job.output.append(output.encode("utf-8"))
+            job.finish("succeeded" if result.get("success") else "failed", result)
+        except asyncio.CancelledError:
+            job.finish("cancelled", {"success": False, "error": "Job was cancelled"})
+        except Exception as e:
+            job.finish("failed", {"success": False, "error": str(e)})
+    
+    def job_status(self, job_id: Optional[str] = None) -> Dict[str, Any]:
+        """State (and once finished, result) of a job, or a summary of every job"""
+        if job_id is None:
+            return {
+                "success": True,
+                "jobs": [job.describe(with_result=False) for job in self.jobs.jobs()]
+            }
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"success": False, "error": f"Job '{job_id}' not found"}
+        return {"success": True, **job.describe()}
+    
+    def job_output(self, job_id: str, offset: int = 0, max_bytes: int = 64 * 1024) -> Dict[str, Any]:
+        """Output of a job from byte ``offset``; pass ``next_offset`` back to tail it"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"success": False, "error": f"Job '{job_id}' not found"}
+        if not isinstance(offset, int) or offset < 0 or not isinstance(max_bytes, int) or max_bytes < 1:
+            return {"success": False, "error": "offset must be an integer >= 0 and max_bytes >= 1"}
+        data, start = job.output.read(offset, max_bytes)
+        next_offset = start + len(data)
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": job.status,
+            "output": data.decode(errors="replace"),
+            "offset": start,
+            "next_offset": next_offset,
+            # Bytes before the requested offset that were dropped to bound memory
+            "skipped": start - offset if start > offset else 0,
+            "done": job.done and next_offset >= job.output.end
+        }
+    
+    async def cancel_job(self, job_id: str) -> Dict[str, Any]:
+        """Cancel a queued or running job and stop what it started.
+
+        Tool and shell processes are killed and reaped, a warm worker running
+        the job's tool is killed and replaced, and a session command's shell
+        is killed (closing the session). Tools that auto mode runs in a server
+        thread cannot be stopped and run to completion in the background.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"success": False, "error": f"Job '{job_id}' not found"}
+        if job.done:
+            return {"success": False, "error": f"Job '{job_id}' already {job.status}"}
+        job.task.cancel()
+        # Let the job's cleanup (killing its processes) run before answering
+        await asyncio.wait({job.task}, timeout=5)
+        return {"success": True, "job_id": job_id, "status": job.status}
     
     def list_tools(self) -> List[str]:
         """List all available tools in the tools directory"""
         tools = []
         for tool_path in self.tools_dir.glob("*.py"):
             tools.append(tool_path.stem)
-        return tools
\ No newline at end of file
+        return tools
+    
+    async def shutdown(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Stop accepting work, drain in-flight calls and reap child processes"""
+        try:
+            return await self.coordinator.shutdown(timeout)
+        finally:
+            if self.behave_runner is not None:
+                await asyncio.to_thread(self.behave_runner.close)
+            await asyncio.to_thread(self.worker_pool.close)
+            await asyncio.to_thread(self.shell_sessions.close)
+    
+    async def _run_behave(self, paths: List[str], verbose: bool = False,
+                          cwd: Optional[Path] = None,
+                          extra_args: Optional[List[str]] = None) -> Tuple[int, str, str, List[Dict[str, Any]]]:
+        """Run behave and return (exit code, stdout, stderr, JSON report features).
+
+        Prefers the persistent runner; falls back to the behave CLI if the
+        helper cannot be started or dies.
+        """
+        cwd = Path(cwd if cwd is not None else Path.cwd()).resolve()
+        fd, report_path = tempfile.mkstemp(prefix="anymcp_report_", suffix=".json")
+        os.close(fd)
+        report_path = Path(report_path)
+        args = [*paths, *formatter_args(report_path), *self._tools_dir_args(self.tools_dir.resolve()),
+                *(extra_args or [])]
+        try:
+            if self.behave_runner is not None:
+                with self.tracer.span("behave.run", runner="persistent"):
+                    try:
+                        response = await asyncio.to_thread(self.behave_runner.run, args, str(cwd), verbose)
+                        return (response["returncode"], response["stdout"], response["stderr"],
+                                load_report(report_path))
+                    except BehaveRunnerError:
+                        pass
+            
+            cmd = ["behave", *args]
+            if verbose:
+                cmd.append("-v")
+            
+            process = None
+            with self.tracer.span("behave.run", runner="subprocess"):
+                try:
+                    process = await self._spawn(
+                        *cmd,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        cwd=cwd
+                    )
+                    stdout, stderr = await process.communicate()
+                    return process.returncode, stdout.decode(), stderr.decode(), load_report(report_path)
+                finally:
+                    if process is not None:
+                        await self._reap(process)
+        finally:
+            report_path.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _tools_dir_args(tools_dir: Path) -> List[str]:
+        """behave arguments telling generated tests which tools directory to use"""
+        return ["-D", f"{TOOLS_DIR_USERDATA}={tools_dir}"]
+    
+    @staticmethod
+    def _write_step_loader(steps_dir: Path) -> Path:
+        """Create the module that loads the shared step library, unless it exists"""
+        loader_path = steps_dir / STEP_LOADER_NAME
+        if not loader_path.exists():
+            steps_dir.mkdir(parents=True, exist_ok=True)
+            loader_path.write_text(STEP_LOADER, encoding="utf-8")
+        return loader_path
+    
+    @staticmethod
+    def _is_generated_steps(path: Path) -> bool:
+        """Whether a ``test_<tool>_steps.py`` only holds the old generated step definitions"""
+        tool_name = path.name[len("test_"):-len("_steps.py")]
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+        except (OSError, SyntaxError, ValueError):
+            return False
+        functions = {
+            node.name for node in ast.walk(tree)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        }
+        expected = {f"step_{tool_name}_{suffix}" for suffix in LEGACY_STEP_SUFFIXES}
+        return bool(functions) and functions <= expected
+    
+    def _pin(self, tool_path: Path, object_path: Optional[Path] = None) -> Tuple[Path, Optional[Path]]:
+        """File to run a tool from, and the working copy it runs as when that is its store object.
+
+        A call keeps the published version it started with through the
+        object, while ``__file__`` and the module name still come from
+        ``tools/<name>.py`` (see ``anymcp.runtime.load_tool``).
+        """
+        object_path = object_path or self.store.pinned(tool_path)
+        if object_path is None:
+            return tool_path.resolve(), None
+        return object_path.resolve(), tool_path.resolve()
+    
+    async def _resolve_tool_path(self, tool_name: str) -> Optional[Path]:
+        """``tools/<name>.py``, then the index's name table, then the first search match"""
+        tool_path = self.tools_dir / f"{tool_name}.py"
+        if tool_path.exists():
+            return tool_path
+        tool_path = self.index.resolve(tool_name)
+        if tool_path is not None:
+            return tool_path
+        tools = await self.search_tools(tool_name)
+        return Path(tools[0]["path"]) if tools else None
+    
+    def _shell_spill_path(self) -> Path:
+        """Stem of the files a spilled shell_command writes its stdout and stderr to"""
+        spill_dir = self.state_dir / "shell"
+        spill_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return spill_dir / f"{stamp}-{uuid.uuid4().hex[:8]}"
+    
+    def _profile_dump_path(self, tool_name: str, profile: str) -> Path:
+        """Where a profiled run leaves its .pstats / .tracemalloc dump"""
+        self.profiles_dir.mkdir(parents=True, exist_ok=True)
+        suffix = "pstats" if profile == "cpu" else "tracemalloc"
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return self.profiles_dir / f"{tool_name}-{stamp}-{uuid.uuid4().hex[:8]}.{suffix}"
+    
+    @contextlib.contextmanager
+    def _phase(self, tool_name: str, phase: str, span_name: str, kind: str = "tool"):
+        """Time one phase of a tool (or ``kind``) call as both a histogram sample and a span"""
+        with self.tracer.span(span_name), self.metrics.timer(kind, tool_name, phase):
+            yield
+    
+    @contextlib.asynccontextmanager
+    async def _execution_slot(self, tool_name: str, kind: str = "tool"):
+        """Hold one of the concurrent execution slots, recording the wait under ``kind`` and ``tool_name``.
+
+        A task that already holds a slot (a job running ``execute_tool``)
+        keeps using it rather than waiting for a second one.
+        """
+        if self._slots is None or HOLDS_SLOT.get():
+            yield
+            return
+        with self._phase(tool_name, "queue_wait", "tool.queue_wait", kind):
+            await self._slots.acquire()
+        token = HOLDS_SLOT.set(True)
+        try:
+            yield
+        finally:
+            HOLDS_SLOT.reset(token)
+            self._slots.release()
+    
+    async def _spawn(self, *args, shell: bool = False, **kwargs) -> asyncio.subprocess.Process:
+        """Start a child in its own process group and track it for shutdown"""
+        # Let the child's own logging carry the trace it was started under
+        env = self.tracer.child_env(kwargs.pop("env", None))
+        if env is not None:
+            kwargs["env"] = env
+        if shell:
+            process = await asyncio.create_subprocess_shell(
+                args[0], start_new_session=True, **kwargs
+            )
+        else:
+            process = await asyncio.create_subprocess_exec(
+                *args, start_new_session=True, **kwargs
+            )
+        self.coordinator.track(process)
+        return process
+    
+    async def _reap(self, process: asyncio.subprocess.Process) -> None:
+        """Kill the child's process group if it is still running and wait for it"""
+        try:
+            await terminate_process(process)
+        finally:
+            self.coordinator.untrack(process)
@@ -0,0 +1,94 @@
+"""
+Step definitions shared by every test generated with ``create_tool_test``.
+
+Generated feature files only use the parameterized steps below, so one module
+serves any number of tools. ``features/steps/tool_steps.py`` loads it with
+``from anymcp.tool_steps import *``.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+from behave import given, when, then
+
+from .harness import TOOLS_DIR_USERDATA, record_budget, result_for_step, table_params
+from .tool_manager import ToolManager
+
+__all__ = [
+    "step_tool_available",
+    "step_execute_with_params",
+    "step_check_result",
+    "step_check_error",
+    "step_check_latency_budget",
+    "step_check_memory_budget",
+]
+
+
+def _tools_dir(context) -> Path:
+    """The tools directory under test: passed by ToolManager, else the scenario's or ./tools"""
+    tools_dir = context.config.userdata.get(TOOLS_DIR_USERDATA)
+    if tools_dir:
+        return Path(tools_dir)
+    return Path(getattr(context, "tools_dir", "tools"))
+
+
+@given('the "{tool_name}" tool is available')
+def step_tool_available(context, tool_name):
+    if not hasattr(context, "tool_manager"):
+        context.tool_manager = ToolManager(tools_dir=str(_tools_dir(context)))
+    tools = asyncio.run(context.tool_manager.search_tools(tool_name))
+    assert any(tool_name in (tool["name"], Path(tool["path"]).stem) for tool in tools), \
+        f"Tool '{tool_name}' not found in {context.tool_manager.tools_dir}"
+    context.tool_name = tool_name
+
+
+@when('I execute "{tool_name}" with parameters:')
+def step_execute_with_params(context, tool_name):
+    # The first such step runs every case in the feature in one worker
+    params = table_params(context.table)
+    context.executed = {"tool": tool_name, "parameters": params}
+    context.result = result_for_step(context, tool_name, params)
+
+
+@then('the result should be "{expected}"')
+def step_check_result(context, expected):
+    assert context.result["success"], f"Tool execution failed: {context.result}"
+    assert str(context.result["result"]) == expected, f"Expected {expected}, got {context.result['result']}"
+
+
+@then('an error should occur with message "{message}"')
+def step_check_error(context, message):
+    assert not context.result["success"], "Expected an error but tool succeeded"
+    assert message in context.result["error"], f"Expected error '{message}', got '{context.result['error']}'"
+
+
+def _measurement(context, repetitions: int):
+    """Warm latency and peak RSS of the scenario's tool call, measured once per scenario"""
+    executed = context.executed
+    key = (executed["tool"], json.dumps(executed["parameters"], sort_keys=True), repetitions)
+    cached = getattr(context, "measurement", None)
+    if cached is None or cached[0] != key:
+        result = asyncio.run(context.tool_manager.measure_tool(
+            executed["tool"], executed["parameters"], repetitions
+        ))
+        assert result["success"], f"Measuring {executed['tool']} failed: {result['error']}"
+        context.measurement = (key, result["measurement"])
+    return context.measurement[1]
+
+
+@then('the warm latency over {repetitions:d} runs should be under {max_ms:g} ms')
+def step_check_latency_budget(context, repetitions, max_ms):
+    measurement = _measurement(context, repetitions)
+    p95 = measurement["latency_ms"]["p95"]
+    record_budget(context, "latency_ms", max_ms, p95, measurement)
+    assert p95 <= max_ms, \
+        f"p95 warm latency {p95:.3f} ms exceeds the {max_ms:g} ms budget: {measurement['latency_ms']}"
+
+
+@then('the peak memory over {repetitions:d} runs should be under {max_mb:g} MB')
+def step_check_memory_budget(context, repetitions, max_mb):
+    measurement = _measurement(context, repetitions)
+    peak = measurement["peak_rss_mb"]
+    record_budget(context, "memory_mb", max_mb, peak, measurement)
+    assert peak <= max_mb, f"peak RSS {peak:.1f} MB exceeds the {max_mb:g} MB budget"
@@ -0,0 +1,192 @@
+"""
+Content-addressed store of published tool versions.
+
+Every version a tool is published with is kept as an immutable
+``objects/<sha256>.py``. A per-tool ref (``refs/<name>.json``) names the
+current version and the ones before it; it and the working copy in
+``tools/<name>.py`` are both replaced with ``os.replace``, so a reader
+sees either the old version or the new one, never a partial write.
+Executions resolve a tool to its object once and keep that version for
+the whole call, and workers cache modules by the object's (hash) path.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_RETAIN = 5
+
+
+def _atomic_write(path: Path, data: bytes, mode: Optional[int] = None) -> None:
+    # The temporary name must not end in .py, or a concurrent glob could list it as a tool
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    if mode is not None:
+        os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+
+
+def _stamp(path: Path) -> Optional[List[int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ToolStore:
+    """Versions of the tools in ``tools_dir``, stored under ``root``"""
+
+    def __init__(self, root: Path, tools_dir: Path, retain: int = DEFAULT_RETAIN):
+        if retain < 1:
+            raise ValueError("At least one tool version must be retained")
+        self.root = Path(root)
+        self.tools_dir = Path(tools_dir)
+        self._tools_dir_resolved = self.tools_dir.resolve()
+        self.retain = retain
+        self.objects_dir = self.root / "objects"
+        self.refs_dir = self.root / "refs"
+        self._lock = threading.Lock()
+        # Tool name -> (working copy stamp, current content hash or None if unpinned)
+        self._pins: Dict[str, Tuple[Optional[List[int]], Optional[str]]] = {}
+
+    def object_path(self, content_hash: str) -> Path:
+        return self.objects_dir / f"{content_hash}.py"
+
+    def _ref_path(self, name: str) -> Path:
+        return self.refs_dir / f"{name}.json"
+
+    def ref(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._ref_path(name).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def publish(self, name: str, source: bytes) -> Dict[str, Any]:
+        """Store ``source`` as a new version of ``name`` and make it current.
+
+        Returns ``{"content_hash", "object_path", "retired"}``, where
+        ``retired`` lists versions that fell out of the retention window.
+        """
+        content_hash = hashlib.sha256(source).hexdigest()
+        with self._lock:
+            object_path = self.object_path(content_hash)
+            if not object_path.exists():
+                self.objects_dir.mkdir(parents=True, exist_ok=True)
+                _atomic_write(object_path, source, 0o644)
+            result = self._point(name, content_hash, source)
+            self._collect(result["retired"])
+            return result
+
+    def publish_batch(self, sources: Dict[str, bytes]) -> Dict[str, Dict[str, Any]]:
+        """Publish several tools together; returns ``publish``'s result for each name.
+
+        Every object is stored before any tool is switched to its new
+        version, so a failure while storing leaves all of them unchanged.
+        The switches then happen back to back under the store lock, with no
+        other publish or rollback in between, and retired versions are
+        collected once at the end.
+        """
+        hashes = {name: hashlib.sha256(source).hexdigest() for name, source in sources.items()}
+        with self._lock:
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            for name, source in sources.items():
+                object_path = self.object_path(hashes[name])
+                if not object_path.exists():
+                    _atomic_write(object_path, source, 0o644)
+            results = {name: self._point(name, hashes[name], source) for name, source in sources.items()}
+            self._collect([content_hash for result in results.values() for content_hash in result["retired"]])
+            return results
+
+    def rollback(self, name: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Make a retained version current again: the previous one, or the one ``content_hash`` starts with"""
+        with self._lock:
+            ref = self.ref(name)
+            if ref is None:
+                raise KeyError(f"Tool '{name}' has no published versions")
+            history = [entry["content_hash"] for entry in ref["versions"]]
+            if content_hash is None:
+                if len(history) < 2:
+                    raise KeyError(f"Tool '{name}' has no earlier version to roll back to")
+                target = history[1]
+            else:
+                matches = [h for h in history if h.startswith(content_hash)]
+                if len(matches) != 1:
+                    raise KeyError(
+                        f"Version '{content_hash}' of '{name}' is "
+                        f"{'ambiguous' if matches else 'not retained'}"
+                    )
+                target = matches[0]
+            source = self.object_path(target).read_bytes()
+            result = self._point(name, target, source)
+            self._collect(result["retired"])
+            result["previous"] = history[0]
+            return result
+
+    def _point(self, name: str, content_hash: str, source: bytes) -> Dict[str, Any]:
+        # Working copy first, then the ref: a crash in between leaves a ref
+        # whose stamp no longer matches, which readers treat as unpinned
+        tool_path = self.tools_dir / f"{name}.py"
+        _atomic_write(tool_path, source, 0o755)
+        ref = self.ref(name) or {"name": name, "versions": []}
+        versions = [{"content_hash": content_hash, "published": time.time()}]
+        versions += [entry for entry in ref["versions"] if entry["content_hash"] != content_hash]
+        retired = [entry["content_hash"] for entry in versions[self.retain:]]
+        ref.update(current=content_hash, stamp=_stamp(tool_path), versions=versions[:self.retain])
+        self.refs_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self._ref_path(name), json.dumps(ref).encode("utf-8"))
+        self._pins[name] = (ref["stamp"], content_hash)
+        return {"content_hash": content_hash, "object_path": self.object_path(content_hash), "retired": retired}
+
+    def _collect(self, retired: List[str]) -> None:
+        """Delete retired objects that no tool's retained versions still use"""
+        if not retired:
+            return
+        in_use = set()
+        for ref_path in self.refs_dir.glob("*.json"):
+            ref = self.ref(ref_path.stem) or {"versions": []}
+            in_use.update(entry["content_hash"] for entry in ref["versions"])
+        for content_hash in retired:
+            if content_hash not in in_use:
+                object_path = self.object_path(content_hash)
+                object_path.unlink(missing_ok=True)
+                Path(importlib.util.cache_from_source(str(object_path))).unlink(missing_ok=True)
+
+    def pinned(self, tool_path: Path) -> Optional[Path]:
+        """The immutable object behind ``tool_path`` if it is still the published version.
+
+        ``None`` when the tool was never published through the store or its
+        working copy has been edited since, in which case callers run the
+        working copy itself. The ref's content hash is cached against the
+        working copy's stamp, which every publish and rollback changes, so
+        a call normally costs one ``stat``.
+        """
+        tool_path = Path(tool_path)
+        if tool_path.parent != self.tools_dir and tool_path.parent.resolve() != self._tools_dir_resolved:
+            return None
+        name = tool_path.stem
+        stamp = _stamp(tool_path)
+        cached = self._pins.get(name)
+        if cached is None or cached[0] != stamp:
+            # Under the lock, so a publish is never seen between its working copy and its ref
+            with self._lock:
+                stamp = _stamp(tool_path)
+                ref = self.ref(name)
+                current = ref["current"] if ref is not None and ref.get("stamp") == stamp else None
+                if current is not None and not self.object_path(current).exists():
+                    current = None
+                cached = self._pins[name] = (stamp, current)
+        return self.object_path(cached[1]) if cached[1] is not None else None
+
+    def versions(self, name: str) -> List[Dict[str, Any]]:
+        """Retained versions of ``name``, newest first"""
+        ref = self.ref(name)
+        if ref is None:
+            return []
+        return [dict(entry, current=entry["content_hash"] == ref["current"]) for entry in ref["versions"]]
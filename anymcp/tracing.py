@@ -0,0 +1,264 @@
+"""
+Lightweight request tracing with spans exported as OpenTelemetry-shaped JSON lines
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+SERVICE_NAME = "anymcp"
+
+# Environment variables a tool process can read to correlate its own logs
+TRACEPARENT_ENV = "TRACEPARENT"
+TRACE_ID_ENV = "ANYMCP_TRACE_ID"
+SPAN_ID_ENV = "ANYMCP_SPAN_ID"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "anymcp_current_span", default=None
+)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("tracer", "trace_id", "span_id", "parent_span_id", "name",
+                 "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str,
+                 parent_span_id: Optional[str] = None, start_ns: Optional[int] = None):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = "UNSET"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = "ERROR"
+        self.status_message = message
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns if end_ns is not None else time.time_ns()
+            self.tracer._export(self)
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace-context header value for this span"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OTLP/JSON span shape, with the resource inlined on every line"""
+        record = {
+            "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": "SPAN_KIND_SERVER" if self.parent_span_id is None else "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": f"STATUS_CODE_{self.status}"}
+        }
+        if self.parent_span_id:
+            record["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            record["status"]["message"] = self.status_message
+        return record
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is disabled"""
+
+    trace_id = span_id = parent_span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonLinesExporter:
+    """Append spans to a JSON-lines file, rotating it by size"""
+
+    def __init__(self, path: Path, max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def export(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self.max_bytes and self._file.tell() + len(line) > self.max_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._file.flush()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporter; no-op without one"""
+
+    def __init__(self, exporter: Optional[JsonLinesExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(self, name: str, parent: Optional[Span] = None,
+                   start_ns: Optional[int] = None, **attributes: Any):
+        """Start a span under ``parent`` (default: the current span)"""
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = parent if parent is not None else _current_span.get()
+        if parent is None or parent is NOOP_SPAN:
+            span = Span(self, name, secrets.token_hex(16), start_ns=start_ns)
+        else:
+            span = Span(self, name, parent.trace_id, parent.span_id, start_ns=start_ns)
+        span.attributes.update(attributes)
+        return span
+
+    @contextlib.contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Iterator[Any]:
+        """Time a block as a span and make it current for nested spans"""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        span = self.start_span(name, parent, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    @contextlib.contextmanager
+    def activate(self, span: Any) -> Iterator[Any]:
+        """Make an already started span current without ending it"""
+        token = _current_span.set(span if isinstance(span, Span) else None)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    def context(self) -> Dict[str, str]:
+        """The current trace context as the environment variables a tool reads; empty if none"""
+        span = _current_span.get()
+        if not self.enabled or span is None:
+            return {}
+        return {
+            TRACEPARENT_ENV: span.traceparent,
+            TRACE_ID_ENV: span.trace_id,
+            SPAN_ID_ENV: span.span_id
+        }
+
+    def child_env(self, env: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+        """Environment for a child process carrying the current trace context"""
+        context = self.context()
+        if not context:
+            return env
+        env = dict(os.environ if env is None else env)
+        env.update(context)
+        return env
+
+    def _export(self, span: Span) -> None:
+        if self.exporter is not None:
+            self.exporter.export(span.to_dict())
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+class RequestSpans:
+    """Root spans for JSON-RPC requests, open from receipt until the response is written"""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self._pending: Dict[Any, Any] = {}
+
+    def received(self, request_id: Any, method: Optional[str]) -> None:
+        """Open the root span and a dispatch span when a request arrives"""
+        if not self.tracer.enabled or request_id is None or method is None:
+            return
+        root = self.tracer.start_span("mcp.request", **{"rpc.method": method, "rpc.id": request_id})
+        dispatch = self.tracer.start_span("mcp.dispatch", parent=root)
+        self._pending[request_id] = (root, dispatch)
+
+    def dispatched(self, request_id: Any) -> Any:
+        """End the dispatch span once a handler picks the request up; return the root"""
+        entry = self._pending.get(request_id)
+        if entry is None:
+            return NOOP_SPAN
+        root, dispatch = entry
+        dispatch.end()
+        return root
+
+    @contextlib.contextmanager
+    def writing(self, request_id: Any) -> Iterator[None]:
+        """Time writing the response, then close the request's root span"""
+        entry = self._pending.pop(request_id, None) if request_id is not None else None
+        if entry is None:
+            yield
+            return
+        root, dispatch = entry
+        dispatch.end()
+        try:
+            with self.tracer.span("mcp.write", parent=root):
+                yield
+        finally:
+            root.end()
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
@@ -0,0 +1,70 @@
+"""
+Observation hooks around the MCP transport streams
+"""
+
+import contextlib
+from typing import Any, Callable, ContextManager, Optional, Tuple
+
+
+def jsonrpc_fields(item: Any) -> Tuple[Any, Optional[str]]:
+    """Return (id, method) of a transported JSON-RPC message, if present"""
+    message = getattr(item, "message", item)
+    root = getattr(message, "root", message)
+    return getattr(root, "id", None), getattr(root, "method", None)
+
+
+class ObservedReceiveStream:
+    """Receive-stream proxy that reports each message and the client closing stdin"""
+
+    def __init__(self, stream, on_message: Optional[Callable[[Any], None]] = None,
+                 on_eof: Optional[Callable[[], None]] = None):
+        self._stream = stream
+        self._on_message = on_message
+        self._on_eof = on_eof
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    async def __aenter__(self):
+        await self._stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._stream.__aexit__(*exc_info)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            item = await self._stream.__anext__()
+        except StopAsyncIteration:
+            if self._on_eof is not None:
+                self._on_eof()
+            raise
+        if self._on_message is not None:
+            self._on_message(item)
+        return item
+
+
+class ObservedSendStream:
+    """Send-stream proxy that wraps every send in a caller-supplied context"""
+
+    def __init__(self, stream, around_send: Optional[Callable[[Any], ContextManager]] = None):
+        self._stream = stream
+        self._around_send = around_send
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    async def __aenter__(self):
+        await self._stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._stream.__aexit__(*exc_info)
+
+    async def send(self, item):
+        context = self._around_send(item) if self._around_send else contextlib.nullcontext()
+        with context:
+            await self._stream.send(item)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Child-side runner for tool code.
+
+Loads a tool file as a module (so its own ``__main__`` block does not run),
+calls ``execute()`` and prints a JSON envelope on stdout. Parameters come
+from ``--params`` (``-`` reads stdin) or ``--params-fd``. ``--repeat N``
+times N warm calls after the first and reports the process's peak RSS.
+``--batch`` reads a JSON list of parameter objects from stdin and runs every
+case against the one loaded module. ``--serve`` keeps the process alive for a
+worker pool: one JSON request per line on stdin, one JSON response per line
+on stdout, with loaded tool modules cached until their file changes. Tools
+are loaded and called by the helpers of ``anymcp.runtime``, so both runners
+behave alike. Only the standard library is used, so it works in whatever
+interpreter runs the tools.
+"""
+
+import argparse
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import traceback
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .runtime import call_execute, format_output, load_tool, trace_environ
+except ImportError:
+    # Run by path, as the pool and the profiler do: runtime.py sits next to this file
+    from runtime import call_execute, format_output, load_tool, trace_environ
+
+PROFILE_MODES = ("cpu", "memory")
+
+
+def run_profiled(func, params: Dict[str, Any], mode: str, top: int = 20,
+                 dump_path: Optional[Path] = None) -> Tuple[Any, Dict[str, Any]]:
+    """Run execute() under cProfile or tracemalloc and summarise the hot spots"""
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+
+    if mode == "cpu":
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            result = call_execute(func, params)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        report = {
+            "type": "cpu",
+            "wall_time": elapsed,
+            "top": _top_functions(profiler, top)
+        }
+        if dump_path is not None:
+            profiler.dump_stats(str(dump_path))
+            report["dump_path"] = str(dump_path)
+        return result, report
+
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(10)
+    tracemalloc.reset_peak()
+    try:
+        result = call_execute(func, params)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    report = {
+        "type": "memory",
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "top": [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count
+            }
+            for stat in snapshot.statistics("lineno")[:top]
+        ]
+    }
+    if dump_path is not None:
+        snapshot.dump(str(dump_path))
+        report["dump_path"] = str(dump_path)
+    return result, report
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far"""
+    # VmHWM belongs to the current image; ru_maxrss also counts whatever ran
+    # before exec (e.g. a launcher shim), so it is only the fallback
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_repeated(func, params: Dict[str, Any], repetitions: int) -> Tuple[Any, Dict[str, Any]]:
+    """Time a cold call followed by ``repetitions`` warm calls of execute()"""
+    start = time.perf_counter()
+    result = call_execute(func, params)
+    cold = time.perf_counter() - start
+    samples = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        call_execute(func, params)
+        samples.append(time.perf_counter() - start)
+    return result, {
+        "cold": cold,
+        "warm": samples,
+        "peak_rss_bytes": peak_rss_bytes()
+    }
+
+
+def run_batch(func, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run execute() once per case; a failing case does not stop the others"""
+    results = []
+    for params in cases:
+        start = time.perf_counter()
+        try:
+            entry = {"output": format_output(call_execute(func, params))}
+        except Exception:
+            entry = {"error": traceback.format_exc()}
+        entry["duration"] = time.perf_counter() - start
+        results.append(entry)
+    return results
+
+
+class ToolCache:
+    """Tool modules loaded by a serving worker, reloaded when their file changes"""
+
+    def __init__(self):
+        self._modules: Dict[Tuple[str, Optional[str]], Tuple[Tuple[int, int], Any]] = {}
+
+    def get(self, tool_path: str, origin: Optional[str] = None):
+        """The module for ``tool_path``, run as ``origin`` if given (see ``load_tool``)"""
+        stat = os.stat(tool_path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._modules.get((tool_path, origin))
+        if cached is None or cached[0] != key:
+            module = load_tool(Path(tool_path), origin and Path(origin))
+            cached = self._modules[(tool_path, origin)] = (key, module)
+        return cached[1]
+
+
+def handle_request(cache: ToolCache, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Answer one pool request: ``{"tool_path", "origin", "params", "trace"}``, or ``"load_only"`` to preload"""
+    start = time.perf_counter()
+    try:
+        module = cache.get(request["tool_path"], request.get("origin"))
+        if request.get("load_only"):
+            response = {"loaded": True}
+        else:
+            with trace_environ(request.get("trace")):
+                response = {"output": format_output(call_execute(module.execute, request.get("params") or {}))}
+    except Exception:
+        response = {"error": traceback.format_exc()}
+    response["duration"] = time.perf_counter() - start
+    response["peak_rss_bytes"] = peak_rss_bytes()
+    return response
+
+
+def serve() -> None:
+    # Keep the protocol on a private copy of stdout; anything the tools print
+    # (or their children write to fd 1) lands on stderr instead
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    cache = ToolCache()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            response = handle_request(cache, json.loads(line))
+        except ValueError:
+            response = {"error": "Malformed request", "duration": 0.0}
+        channel.write(json.dumps(response) + "\n")
+        channel.flush()
+
+
+def _top_functions(profiler: cProfile.Profile, top: int) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    functions = []
+    for (filename, lineno, name), (primitive_calls, calls, total, cumulative, _) in rows[:top]:
+        functions.append({
+            "function": f"{filename}:{lineno}({name})",
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "total_time": total,
+            "cumulative_time": cumulative
+        })
+    return functions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a tool's execute() function")
+    parser.add_argument("tool_path", nargs="?")
+    parser.add_argument("--origin",
+                        help="Working copy the tool_path store object runs as")
+    parser.add_argument("--params", default="{}",
+                        help="JSON parameters, or - to read them from stdin")
+    parser.add_argument("--params-fd", type=int,
+                        help="Read the JSON parameters from this inherited file descriptor")
+    parser.add_argument("--profile", choices=PROFILE_MODES)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--dump")
+    parser.add_argument("--repeat", type=int,
+                        help="Time this many warm calls after the first one")
+    parser.add_argument("--batch", action="store_true",
+                        help="Read a JSON list of parameter objects from stdin")
+    parser.add_argument("--serve", action="store_true",
+                        help="Answer JSON-lines requests on stdin until it closes")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve()
+        return
+    if args.tool_path is None:
+        parser.error("tool_path is required")
+
+    if args.batch:
+        cases = json.load(sys.stdin)
+        with contextlib.redirect_stdout(sys.stderr):
+            try:
+                module = load_tool(Path(args.tool_path), args.origin and Path(args.origin))
+            except Exception:
+                error = traceback.format_exc()
+                results = [{"error": error, "duration": 0.0} for _ in cases]
+            else:
+                results = run_batch(module.execute, cases)
+        print(json.dumps({"results": results}))
+        return
+
+    if args.params_fd is not None:
+        with open(args.params_fd, "rb") as source:
+            params = json.load(source)
+    elif args.params == "-":
+        params = json.load(sys.stdin.buffer)
+    else:
+        params = json.loads(args.params)
+    # Anything the tool prints must not corrupt the envelope on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        module = load_tool(Path(args.tool_path), args.origin and Path(args.origin))
+        report = measurement = None
+        if args.profile:
+            dump_path = Path(args.dump) if args.dump else None
+            result, report = run_profiled(module.execute, params, args.profile, args.top, dump_path)
+        elif args.repeat is not None:
+            result, measurement = run_repeated(module.execute, params, args.repeat)
+        else:
+            result = call_execute(module.execute, params)
+
+    envelope = {"output": format_output(result)}
+    if report is not None:
+        envelope["profile"] = report
+    if measurement is not None:
+        envelope["measurement"] = measurement
+    print(json.dumps(envelope))
+
+
+if __name__ == "__main__":
+    main()
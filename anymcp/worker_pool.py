@@ -0,0 +1,236 @@
+"""
+Pool of long-lived ``worker.py --serve`` processes that keep tool modules loaded
+"""
+
+import contextlib
+import json
+import os
+import select
+import signal
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .tracing import Tracer
+
+# Run by path rather than with -m so workers never import the server package
+WORKER_SCRIPT = Path(__file__).resolve().with_name("worker.py")
+
+
+class WorkerPoolError(RuntimeError):
+    """A worker could not be started or died mid-request"""
+
+
+class _Worker:
+    """One serving worker process, used by a single caller at a time"""
+
+    def __init__(self, python: str):
+        try:
+            self.process = subprocess.Popen(
+                [python, str(WORKER_SCRIPT), "--serve"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                start_new_session=True
+            )
+        except OSError as e:
+            raise WorkerPoolError(f"cannot start worker: {e}") from e
+
+    @property
+    def running(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, payload: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+        """Send one request and wait for its response; TimeoutError leaves the worker unusable"""
+        try:
+            self.process.stdin.write(json.dumps(payload) + "\n")
+            self.process.stdin.flush()
+            # Exactly one response per request, so nothing is left buffered
+            # from the previous one and select() on the pipe is reliable
+            ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+            if not ready:
+                raise TimeoutError
+            line = self.process.stdout.readline()
+        except TimeoutError:
+            raise
+        except OSError as e:
+            raise WorkerPoolError(f"worker died: {e}") from e
+        if not line:
+            raise WorkerPoolError("worker exited before answering")
+        return json.loads(line)
+
+    def kill(self) -> None:
+        if self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class WorkerPool:
+    """Up to ``size`` warm workers, started on demand and reused across calls.
+
+    Like the behave runner client, workers are driven with blocking pipes
+    (from ``asyncio.to_thread``) so the pool outlives any one event loop.
+    A worker that times out or dies is killed and replaced on next use.
+    """
+
+    def __init__(self, size: int, python: str = "python"):
+        if size < 1:
+            raise ValueError("Worker pool size must be at least 1")
+        self.size = size
+        self.python = python
+        self._idle: List[_Worker] = []
+        self._busy: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(size)
+        # Worker serving each request started with a token, and tokens cancelled
+        self._serving: Dict[Any, _Worker] = {}
+        self._cancelled = set()
+        self.stats: Dict[str, int] = {"spawned": 0, "requests": 0, "replaced": 0}
+
+    def run(self, tool_path: Path, params: Dict[str, Any],
+            timeout: Optional[float] = None, token: Any = None,
+            origin: Optional[Path] = None, tracer: Optional[Tracer] = None) -> Dict[str, Any]:
+        """Execute a tool in a warm worker; returns ``{"output"}`` or ``{"error"}`` plus timings.
+
+        ``token`` identifies the request for ``cancel``. ``origin`` is the
+        working copy a store object in ``tool_path`` runs as. With ``tracer``,
+        waiting for a worker is recorded as a ``tool.acquire`` span and the
+        current trace context travels with the request to the tool.
+        """
+        payload = self._payload(tool_path, origin, params=params)
+        trace = tracer.context() if tracer is not None else {}
+        if trace:
+            payload["trace"] = trace
+        return self._request(payload, timeout, token, tracer)
+
+    @staticmethod
+    def _payload(tool_path: Path, origin: Optional[Path], **fields) -> Dict[str, Any]:
+        payload = {"tool_path": str(tool_path), **fields}
+        if origin is not None:
+            payload["origin"] = str(origin)
+        return payload
+
+    def cancel(self, token: Any) -> None:
+        """Stop the request started with ``token``: kill its worker, or keep it from starting.
+
+        The caller blocked in ``run`` gets WorkerPoolError and the worker is replaced.
+        """
+        with self._lock:
+            worker = self._serving.get(token)
+            if worker is None:
+                self._cancelled.add(token)
+                return
+        try:
+            os.killpg(worker.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def preload(self, tool_path: Path, timeout: Optional[float] = 30, origin: Optional[Path] = None) -> int:
+        """Import a tool in every idle worker (starting one if none exist); returns how many loaded it.
+
+        Busy workers pick up the new module on their next call to it.
+        """
+        payload = self._payload(tool_path, origin, load_only=True)
+        with self._lock:
+            targets = [worker for worker in self._idle if worker.running]
+            start_one = not targets and not self._busy
+        if start_one:
+            response = self._request(payload, timeout)
+            return 0 if "error" in response else 1
+        loaded = 0
+        for worker in targets:
+            with self._lock:
+                if worker not in self._idle or not self._slots.acquire(blocking=False):
+                    continue
+                self._idle.remove(worker)
+                self._busy.append(worker)
+            healthy = False
+            try:
+                response = worker.request(payload, timeout)
+                healthy = True
+                loaded += "error" not in response
+            except (TimeoutError, WorkerPoolError):
+                pass
+            finally:
+                self._release(worker, healthy)
+        return loaded
+
+    def _request(self, payload: Dict[str, Any], timeout: Optional[float], token: Any = None,
+                 tracer: Optional[Tracer] = None) -> Dict[str, Any]:
+        with tracer.span("tool.acquire") if tracer is not None else contextlib.nullcontext():
+            worker = self._acquire()
+        healthy = True
+        try:
+            if token is not None:
+                with self._lock:
+                    if token in self._cancelled:
+                        self._cancelled.discard(token)
+                        raise WorkerPoolError("request was cancelled")
+                    self._serving[token] = worker
+            healthy = False
+            response = worker.request(payload, timeout)
+            healthy = True
+            return response
+        finally:
+            if token is not None:
+                with self._lock:
+                    self._serving.pop(token, None)
+            self._release(worker, healthy)
+
+    def _acquire(self) -> _Worker:
+        self._slots.acquire()
+        try:
+            with self._lock:
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.running:
+                        break
+                    worker.kill()
+                    self.stats["replaced"] += 1
+                else:
+                    worker = _Worker(self.python)
+                    self.stats["spawned"] += 1
+                self._busy.append(worker)
+                self.stats["requests"] += 1
+                return worker
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        with self._lock:
+            self._busy.remove(worker)
+            if healthy:
+                self._idle.append(worker)
+        if not healthy:
+            worker.kill()
+        self._slots.release()
+
+    def close(self) -> None:
+        """Stop idle workers by closing their stdin and kill busy ones"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            busy = list(self._busy)
+        for worker in idle:
+            try:
+                worker.process.stdin.close()
+                worker.process.wait(5)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            worker.kill()
+        for worker in busy:
+            # Unblocks the caller waiting on this worker; it discards it
+            try:
+                os.killpg(worker.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
@@ -0,0 +1,260 @@
+"""
+Workload classification that routes tools to an executor in ``auto`` mode.
+
+A tool is classified once per version from its syntax tree: pure, loop-free
+code runs in-process, blocking I/O and loops in a thread, and CPU-heavy or
+process-altering code in the worker pool. ``__executor__ = "inprocess" |
+"thread" | "process"`` in the tool overrides the guess. Both in-server lanes
+call ``execute()`` off the event loop under the call's timeout; an
+in-process tool is one expected to return within a few milliseconds.
+Measured calls then correct the guess: an in-process call that overruns
+that budget, or a threaded call that mostly burns CPU (holding the GIL the
+server needs), moves the tool down a lane.
+"""
+
+import ast
+import contextlib
+import sys
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+EXECUTORS = ("inprocess", "thread", "process")
+DECLARED = "declared by __executor__"
+
+# Modules whose use means the tool must not share the server's process:
+# they spawn children or threads, write to file descriptors, or change
+# process-wide state
+PROCESS_MODULES = {
+    "subprocess", "multiprocessing", "threading", "concurrent", "signal", "ctypes", "cffi", "pty", "resource",
+    "tkinter", "pdb", "code", "readline", "curses", "faulthandler", "atexit", "gc",
+    "importlib", "locale", "logging", "warnings",
+}
+# Modules that make a tool CPU-heavy
+CPU_MODULES = {
+    "numpy", "scipy", "pandas", "sklearn", "torch", "tensorflow", "sympy", "numba",
+    "zlib", "bz2", "lzma", "gzip", "zipfile", "tarfile", "hashlib", "cProfile",
+}
+# Modules that mean blocking I/O
+IO_MODULES = {
+    "socket", "ssl", "select", "selectors", "http", "urllib", "urllib3", "requests", "httpx",
+    "aiohttp", "ftplib", "smtplib", "imaplib", "poplib", "telnetlib", "sqlite3", "dbm",
+    "shelve", "shutil", "glob", "tempfile", "csv", "webbrowser", "asyncio", "queue",
+}
+# Calls (by dotted name or bare function name) with the same meanings
+PROCESS_CALLS = {
+    "os.system", "os.popen", "os.fork", "os.forkpty", "os.kill", "os.killpg", "os._exit",
+    "os.chdir", "os.write", "os.dup2", "os.putenv", "os.unsetenv", "os.setsid", "os.execv",
+    "os.execvp", "os.execve", "os.spawnv", "os.spawnl", "os.umask",
+    "sys.exit", "exit", "quit", "input", "breakpoint", "exec", "eval", "compile", "__import__",
+    "sys.setrecursionlimit", "sys.settrace", "sys.setprofile",
+}
+IO_CALLS = {"open", "time.sleep", "sleep", "urlopen", "os.listdir", "os.scandir", "os.walk", "os.stat",
+            "os.remove", "os.rename", "os.makedirs", "os.read"}
+IO_METHODS = {"read_text", "read_bytes", "write_text", "write_bytes", "iterdir", "rglob", "glob",
+              "mkdir", "unlink", "touch", "exists", "stat", "open"}
+# Attributes whose use means process-wide state or the server's stdio
+PROCESS_ATTRIBUTES = {"os.environ", "sys.stdin", "sys.stdout", "sys.__stdout__", "sys.modules", "sys.path"}
+
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+    return None
+
+
+def _declared_executor(tree: ast.AST) -> Optional[str]:
+    for node in getattr(tree, "body", []):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == "__executor__":
+                    if node.value.value in EXECUTORS:
+                        return node.value.value
+    return None
+
+
+def _loop_depth(node: ast.AST, depth: int = 0) -> int:
+    deepest = depth
+    for child in ast.iter_child_nodes(node):
+        inner = depth + 1 if isinstance(child, (ast.For, ast.AsyncFor, ast.While)) else depth
+        deepest = max(deepest, _loop_depth(child, inner))
+    return deepest
+
+
+def _has_loop(tree: ast.AST) -> bool:
+    return any(isinstance(node, (ast.For, ast.AsyncFor, ast.While, ast.comprehension)) for node in ast.walk(tree))
+
+
+def _calls_itself(tree: ast.AST) -> bool:
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if any(isinstance(call, ast.Call) and _dotted(call.func) == node.name for call in ast.walk(node)):
+                return True
+    return False
+
+
+def classify(tree: Optional[ast.AST]) -> Dict[str, str]:
+    """``{"executor", "reason"}`` for a parsed tool, from its imports, calls and loops.
+
+    Rules are checked in order and the first match decides: anything that
+    could disturb the server process, then CPU-heavy code, then blocking
+    I/O or any loop. Only a tool matching none of them runs in-process:
+    a call on the event loop cannot be timed out, so it must not iterate.
+    """
+    if tree is None:
+        return {"executor": "process", "reason": "source could not be parsed"}
+    declared = _declared_executor(tree)
+    if declared is not None:
+        return {"executor": declared, "reason": DECLARED}
+
+    # Imported names resolve to their module, so ``from time import sleep`` counts as time.sleep
+    aliases: Dict[str, str] = {}
+    modules, calls, methods, attributes, functions = set(), set(), set(), set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                modules.add(alias.name.split(".")[0])
+                aliases[alias.asname or alias.name.split(".")[0]] = alias.name
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.add(node.module.split(".")[0])
+            for alias in node.names:
+                aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.add(node.name)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            name = _dotted(node.func)
+            if name is not None:
+                head, _, rest = name.partition(".")
+                calls.update({name, ".".join(filter(None, (aliases.get(head, head), rest)))})
+            if isinstance(node.func, ast.Attribute):
+                methods.add(node.func.attr)
+        elif isinstance(node, ast.Attribute):
+            name = _dotted(node)
+            if name is not None:
+                attributes.add(name)
+
+    async_execute = any(
+        isinstance(node, ast.AsyncFunctionDef) and node.name == "execute" for node in ast.walk(tree)
+    )
+    rules = (
+        ("process", "imports", modules & PROCESS_MODULES),
+        ("process", "calls", calls & PROCESS_CALLS),
+        ("process", "uses", attributes & PROCESS_ATTRIBUTES),
+        ("process", "imports", modules & CPU_MODULES),
+        ("process", "has", {"nested loops"} if _loop_depth(tree) >= 2 else set()),
+        ("process", "has", {"a while loop"} if any(isinstance(n, ast.While) for n in ast.walk(tree)) else set()),
+        ("process", "is", {"recursive"} if _calls_itself(tree) else set()),
+        ("thread", "imports", modules & IO_MODULES),
+        ("thread", "calls", calls & IO_CALLS),
+        ("thread", "calls", {f".{name}()" for name in (methods & IO_METHODS) - functions}),
+        ("thread", "has", {"an async execute()"} if async_execute else set()),
+        ("thread", "has", {"a loop"} if _has_loop(tree) else set()),
+    )
+    for executor, verb, found in rules:
+        if found:
+            return {"executor": executor, "reason": f"{verb} {min(found)}"}
+    return {"executor": "inprocess", "reason": "pure: no I/O, loops or process-wide state"}
+
+
+class WorkloadRouter:
+    """Executor per tool version: the static classification, corrected by measured calls.
+
+    ``inprocess_budget`` is how long (seconds) an in-process call may take;
+    ``cpu_share`` and ``cpu_floor`` say when a threaded call counts as
+    CPU-bound. Demotions stick until the tool changes, and only
+    apply to classified tools, never to a declared ``__executor__``.
+    """
+
+    def __init__(self, inprocess_budget: float = 0.005, cpu_share: float = 0.5, cpu_floor: float = 0.02):
+        self.inprocess_budget = inprocess_budget
+        self.cpu_share = cpu_share
+        self.cpu_floor = cpu_floor
+        # Tool path -> (version it was measured at, corrected workload)
+        self._demoted: Dict[str, Tuple[Any, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def route(self, path: str, version: Any, workload: Dict[str, str]) -> Dict[str, str]:
+        """Workload to run ``path`` at ``version`` with: a correction if one was measured, else ``workload``"""
+        with self._lock:
+            entry = self._demoted.get(path)
+        if entry is None or entry[0] != version:
+            return workload
+        return entry[1]
+
+    def observe(self, path: str, version: Any, workload: Dict[str, str], executor: str,
+                wall: float, cpu: float) -> Optional[str]:
+        """Record one call's wall and CPU time; returns the new executor if the tool was moved"""
+        if workload.get("reason") == DECLARED:
+            return None
+        target = None
+        cpu_bound = cpu >= self.cpu_floor and cpu >= self.cpu_share * wall
+        if executor == "inprocess" and wall > self.inprocess_budget:
+            target = "process" if cpu_bound else "thread"
+        elif executor == "thread" and cpu_bound:
+            target = "process"
+        if target is None:
+            return None
+        with self._lock:
+            self._demoted[path] = (version, {
+                "executor": target,
+                "reason": f"measured {wall * 1000:.1f} ms wall, {cpu * 1000:.1f} ms CPU in {executor}"
+            })
+        return target
+
+
+class ToolStdout:
+    """``sys.stdout`` while in-server tool calls run, sending each call's writes to stderr.
+
+    The stdio transport writes through the stream it captured at startup,
+    so a tool's ``print`` must not reach fd 1. Rather than pointing the
+    process-wide stream at stderr, ``capture()`` sets the destination for
+    the calling context only; writes from any other context go to the
+    stream this object stands in for. Threads a tool starts itself do not
+    inherit the context, which is one reason ``threading`` marks a tool for
+    the worker pool. Nesting and concurrent calls are counted so the
+    original stream always comes back.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._saved = None
+        self._target: ContextVar[Optional[TextIO]] = ContextVar("anymcp_tool_stdout", default=None)
+
+    def _stream(self) -> TextIO:
+        return self._target.get() or self._saved or sys.__stdout__
+
+    def write(self, text: str) -> int:
+        return self._stream().write(text)
+
+    def flush(self) -> None:
+        self._stream().flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream(), name)
+
+    @contextlib.contextmanager
+    def capture(self, stream: Optional[TextIO] = None) -> Iterator[None]:
+        """Send what this context writes to ``sys.stdout`` to ``stream`` (stderr by default)"""
+        with self._lock:
+            if self._depth == 0:
+                self._saved = sys.stdout
+                sys.stdout = self
+            self._depth += 1
+        token = self._target.set(stream or sys.stderr)
+        try:
+            yield
+        finally:
+            self._target.reset(token)
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0:
+                    if sys.stdout is self:
+                        sys.stdout = self._saved
+                    self._saved = None
@@ -0,0 +1,22 @@
+Feature: Benchmark suite
+  As a maintainer
+  I want to benchmark anymcp's hot paths and compare runs against a baseline
+  So that performance regressions are caught before release
+
+  Scenario: Run a small benchmark suite
+    When I run the benchmark suite with registry sizes "10" in "worker" mode at concurrency "1,2"
+    Then the benchmark suite should exit with code 0
+    And the benchmark results should include "execute_tool/worker, search_tools/10, list_tools/10, throughput/worker/c2, serialize/execute_small"
+    And every benchmark result should have a unit and a positive value
+
+  Scenario: Compare a run against itself
+    Given a saved benchmark baseline
+    When I compare the benchmark results against the baseline
+    Then the benchmark suite should exit with code 0
+    And the comparison should report no regressions
+
+  Scenario: Flag a regression against a faster baseline
+    Given a saved benchmark baseline where "search_tools/10" was 4 times faster
+    When I compare the benchmark results against the baseline
+    Then the benchmark suite should exit with code 1
+    And the comparison should report "search_tools/10" as a "regression"
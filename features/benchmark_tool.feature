@@ -0,0 +1,23 @@
+Feature: Benchmark MCP tools
+  As an AI assistant or operator
+  I want to measure how fast a tool runs
+  So that I can compare execution modes and spot slow tools
+
+  Background:
+    Given the MCP tool system is initialized
+    And there is a sample calculator tool available
+
+  Scenario: Benchmark a tool in fresh processes
+    When I benchmark the "calculator" tool 5 times with 1 warmup call in "subprocess" mode
+    Then the benchmark should report 5 measured calls without errors
+    And the benchmark should report cold start, percentiles, throughput and peak memory
+
+  Scenario: Benchmark a tool in warm workers with concurrency
+    When I benchmark the "calculator" tool 8 times with 2 warmup calls in "worker" mode at concurrency 2
+    Then the benchmark should report 8 measured calls without errors
+    And the benchmark should report cold start, percentiles, throughput and peak memory
+    And at most 2 workers should have been started
+
+  Scenario: Reject an unknown execution mode
+    When I benchmark the "calculator" tool 5 times with 1 warmup call in "thread" mode
+    Then the benchmark should fail with an error mentioning "Unknown execution mode"
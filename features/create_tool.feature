@@ -126,4 +126,40 @@ Feature: Create new MCP tools
   Scenario: Create tool with large code
     When I create a tool with 1000 lines of code
     Then the tool should be created successfully
-    And the tool file should contain all the code
\ No newline at end of file
+    And the tool file should contain all the code
+
+  Scenario: Creating a tool precompiles and indexes it
+    When I create a tool named "greeter" with the following code:
+      """
+      __description__ = "Greets someone by name"
+
+      def execute(name: str) -> str:
+          return f"Hello, {name}"
+      """
+    Then the tool should be created successfully
+    And the tool's bytecode should be cached for its current source
+    And searching for "greets" should find the tool without parsing it again
+
+  Scenario: Reject code that only the compiler can tell is invalid
+    When I create a tool with invalid Python code:
+      """
+      def execute() -> int:
+          return 1
+      return 2
+      """
+    Then the tool creation should fail
+    And I should get a syntax error message
+    And no "invalid_tool" tool file should have been written
+
+  Scenario: Preload a new tool into warm workers
+    Given the tool system runs tools in warm workers
+    And there is a sample calculator tool available
+    When I execute the "calculator" tool with operation "add" and numbers 2 and 3 in a warm worker
+    And I create a tool named "greeter" with the following code:
+      """
+      def execute(name: str) -> str:
+          return f"Hello, {name}"
+      """
+    Then the tool should be created successfully
+    And the new tool should have been preloaded into 1 worker
+    And calling "greeter" with name "Ada" should return "Hello, Ada" from the same worker
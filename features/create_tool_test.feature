@@ -88,4 +88,35 @@ Feature: Create BDD tests for MCP tools
         And the results should be aggregated correctly
       """
     Then the test should handle async/await properly
-    And the test should use appropriate async test runners
\ No newline at end of file
+    And the test should use appropriate async test runners
+
+  Scenario: Generated tests still report one result per case
+    Given there is a tool named "echo_tool"
+    When I create a BDD test for "echo_tool" with inputs abc, xy and q expecting cba, yx and z
+    And I run the tests for "echo_tool"
+    Then the results should count 2 passed and 1 failed scenarios
+
+  Scenario: Generated tests share one step library
+    Given there is a tool named "first_tool"
+    And there is a tool named "second_tool"
+    When I create BDD tests for "first_tool" and "second_tool"
+    Then no per-tool step modules should be generated
+    And the tests should load the shared step library
+
+  Scenario: Migrate generated step modules to the shared step library
+    Given a project with a generated step module for "old_tool"
+    And the project has a hand-written step module for "custom_tool"
+    When I migrate the generated test steps
+    Then the step module for "old_tool" should be removed
+    And the step module for "custom_tool" should be kept
+    And the project should load the shared step library
+
+  Scenario: Generated tests enforce performance budgets
+    Given there is a tool named "budget_tool"
+    When I create a BDD test for "budget_tool" with budgets:
+      | text | expected | max_latency_ms | max_memory_mb |
+      | abc  | cba      | 1000           | 512           |
+      | xy   | yx       | 0.0001         | 512           |
+    And I run the tests for "budget_tool"
+    Then the results should count 1 passed and 1 failed scenarios
+    And the test result should report the measured latency and memory of each case
@@ -48,6 +48,11 @@ def before_scenario(context, scenario):
 
 def after_scenario(context, scenario):
     """Cleanup after each scenario"""
+    # Stop any warm tool workers and shell sessions the scenario started
+    if hasattr(context, 'tool_manager'):
+        context.tool_manager.worker_pool.close()
+        context.tool_manager.shell_sessions.close()
+    
     # Clean up scenario-specific directory
     if hasattr(context, 'test_dir') and context.test_dir.exists():
         shutil.rmtree(context.test_dir)
\ No newline at end of file
@@ -39,4 +39,49 @@ Feature: Execute MCP tools
     When I execute the tool with a timeout of 1 seconds
     And the tool takes longer than 1 seconds
     Then the execution should be terminated
-    And I should get a timeout error message
\ No newline at end of file
+    And I should get a timeout error message
+
+  Scenario: Profile a tool execution for CPU time
+    When I execute the "calculator" tool with operation "multiply" and numbers 6 and 7 under the "cpu" profiler
+    Then the tool should execute successfully
+    And the result should be 42
+    And the profile should list the hottest functions
+    And the profile dump should be saved
+
+  Scenario: Profile a tool execution for memory
+    When I execute the "calculator" tool with operation "add" and numbers 1 and 1 under the "memory" profiler
+    Then the tool should execute successfully
+    And the profile should report peak memory
+    And the profile dump should be saved
+
+  Scenario: Execute a batch of cases in one worker
+    When I execute the "calculator" tool with a batch of cases:
+      | operation | a | b |
+      | add       | 5 | 3 |
+      | multiply  | 6 | 7 |
+      | divide    | 1 | 0 |
+    Then batch case 1 should return 8
+    And batch case 2 should return 42
+    And batch case 3 should fail with "Division by zero"
+    And the "calculator" tool should have been spawned 1 time
+    And the stats for tool "calculator" should show 3 calls and 1 error
+
+  Scenario: Execute a tool in a warm worker
+    When I execute the "calculator" tool with operation "add" and numbers 5 and 3 in a warm worker
+    Then the tool should execute successfully
+    And the result should be 8
+    When the "calculator" tool is changed to multiply instead of add
+    And I execute the "calculator" tool with operation "add" and numbers 5 and 3 in a warm worker
+    Then the result should be 15
+    And 1 worker should have served 2 calls
+
+  Scenario: Pass parameters too large for a command-line argument
+    Given there is a tool that measures the length of its text parameter
+    When I execute the "measure_text" tool with a text of 200000 characters
+    Then the tool should execute successfully
+    And the result should be 200000
+    When I execute the "measure_text" tool with a text of 3000000 characters
+    Then the result should be 3000000
+    And the parameters should have been passed through a memfd
+    When I execute the "measure_text" tool with a text of 200000 characters under the "cpu" profiler
+    Then the result should be 200000
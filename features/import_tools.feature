@@ -0,0 +1,42 @@
+Feature: Import tools in bulk
+  As an AI assistant
+  I want to import a whole directory or archive of tools at once
+  So that seeding a new host does not take one create_tool call per tool
+
+  Background:
+    Given the MCP tool system is initialized
+    And the tools directory is writable
+
+  Scenario: Import a directory of tools, reporting the broken ones
+    Given a tool bundle with the tools "alpha, beta, gamma" and a broken tool "broken"
+    When I import the tool bundle as a directory
+    Then 3 tools should have been imported
+    And "broken" should be reported as failed with "Invalid Python syntax"
+    And executing the imported tool "beta" should return "beta"
+    And searching for "bundled" should find 3 tools
+
+  Scenario Outline: Import tools from an archive
+    Given a tool bundle with the tools "alpha, beta" and a broken tool "broken"
+    When I import the tool bundle as a <format> archive
+    Then 2 tools should have been imported
+    And "broken" should be reported as failed with "Invalid Python syntax"
+    And executing the imported tool "alpha" should return "alpha"
+
+    Examples:
+      | format |
+      | tar.gz |
+      | zip    |
+
+  Scenario: Existing tools are only replaced with overwrite
+    Given a tool bundle with the tools "alpha, beta" and a broken tool "broken"
+    And there is already a tool named "alpha"
+    When I import the tool bundle as a directory
+    Then 1 tools should have been imported
+    And "alpha" should be reported as failed with "already exists"
+    When I import the tool bundle as a directory with overwrite
+    Then 2 tools should have been imported
+    And executing the imported tool "alpha" should return "alpha"
+
+  Scenario: Import from a path that is not a directory or archive
+    When I import tools from "missing_bundle"
+    Then the import should fail with "not a directory, tar or zip archive"
@@ -0,0 +1,49 @@
+Feature: Background jobs
+  As an AI assistant
+  I want to start long operations and poll them
+  So that builds, test runs and slow tools neither block me nor hit call timeouts
+
+  Background:
+    Given the MCP tool system is initialized
+
+  Scenario: Tail a shell job's output while it runs
+    When I submit a shell job "echo first; sleep 0.3; echo second" and tail its output until it finishes
+    Then the job should have succeeded
+    And the tailed output should be "first\nsecond\n"
+    And the output should have arrived in more than one read
+
+  Scenario: Run a tool as a job
+    Given there is a sample calculator tool available
+    When I submit a "calculator" job with operation "add" and numbers 5 and 3 and wait for it
+    Then the job should have succeeded
+    And the job result should be 8
+    And the job output should be "8.0"
+
+  Scenario: Cancel a running job
+    When I submit a shell job "sleep 30" and cancel it once it is running
+    Then the job should be cancelled
+    And cancelling it again should fail
+
+  Scenario: Jobs share the execution slots with tool calls
+    Given the tool system allows 1 concurrent execution
+    When I submit the shell jobs "sleep 0.3" and "echo second" and wait for both
+    Then the second job should have been queued until the first finished
+    And the queue wait should be recorded for the "shell_command" built-in, not as a tool
+
+  Scenario: Reject an unknown job kind
+    When I submit a "compile" job
+    Then the submission should fail with "Unknown job kind"
+
+  Scenario: Cancelling a job stops a warm worker running its tool
+    Given the tool system runs tools in warm workers
+    And there is a tool that records its pid and sleeps
+    When I submit a job for the sleeping tool and cancel it once the tool is running
+    Then the job should be cancelled
+    And the tool's process should be gone
+
+  Scenario: Cancelling a job stops its command in a shell session
+    When I submit "echo $$ > shell.pid; sleep 30" to shell session "build" as a job and cancel it once it is running
+    Then the job should be cancelled
+    And the session's shell should be gone
+    When I run "echo fresh" in shell session "build"
+    Then the shell session "build" should have been restarted
@@ -0,0 +1,21 @@
+Feature: End-to-end load generator
+  As a maintainer
+  I want to drive MCP traffic at a real server over stdio
+  So that protocol and transport overhead show up in throughput and latency numbers
+
+  Scenario: Drive a closed-loop traffic mix
+    When I run the load generator for 20 requests at concurrency 2 with mix "search_tool=1,execute_tool=1,list_tools=1,create_tool=1"
+    Then the benchmark suite should exit with code 0
+    And the load report should count 20 requests without errors
+    And the load report should include "search_tool, execute_tool, list_tools, create_tool"
+    And the load report should have latency percentiles and throughput
+
+  Scenario: Drive traffic at a target rate
+    When I run the load generator for 10 requests at 40 requests per second with mix "execute_tool=1"
+    Then the benchmark suite should exit with code 0
+    And the load report should count 10 requests without errors
+    And the load report should include "execute_tool"
+
+  Scenario: Reject an unknown operation in the mix
+    When I run the load generator for 5 requests at concurrency 1 with mix "delete_everything=1"
+    Then the benchmark suite should exit with code 2
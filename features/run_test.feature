@@ -55,4 +55,57 @@ Feature: Run tests for tools
     Given there is a test in a subdirectory
     When I run the test from a different directory
     Then the test should still execute correctly
-    And the working directory should be handled properly
\ No newline at end of file
+    And the working directory should be handled properly
+
+  Scenario: Repeated runs reuse the loaded step definitions
+    Given a project with a passing behave feature
+    When I run the test "all" 3 times without the result cache
+    Then every test run should pass
+    And the step definitions should have been loaded 1 time
+    When I change the project's step definitions
+    And I run the test "all" 1 times without the result cache
+    Then every test run should pass
+    And the step definitions should have been loaded 2 times
+
+  Scenario: Run all tests in parallel shards
+    Given a project with 3 passing behave features
+    When I run the test "all" with 2 shards
+    Then the test execution should succeed
+    And the merged statistics should report 3 scenarios passed
+    And the report should list 2 shards with their timings
+    And the results should count 3 passed and 0 failed scenarios
+
+  Scenario: Return structured results
+    Given a project with 2 passing behave features
+    And the project has a failing scenario
+    When I run the test "all" with 1 shards
+    Then the test execution should fail
+    And the results should count 2 passed and 1 failed scenarios
+    And the results should report the failure message "expected 'goodbye world'"
+    And the results should list the slowest scenarios first
+
+  Scenario: Reuse cached results for unchanged features
+    Given a project with 2 passing behave features
+    When I run the test "all" with 1 shards
+    Then 2 features should have been run and 0 reported from the cache
+    And the result cache should be stored in the state directory
+    When I change the feature "greeting_1.feature"
+    And I run the test "all" with 1 shards
+    Then 1 features should have been run and 1 reported from the cache
+    And the results should count 2 passed and 0 failed scenarios
+    When I run the test "all" forcing a full run
+    Then 2 features should have been run and 0 reported from the cache
+
+  Scenario Outline: A change to <module> in the anymcp package invalidates cached results
+    Given a project with 2 passing behave features
+    And the anymcp package is a copy inside the project
+    When I run the test "all" with 1 shards
+    Then 2 features should have been run and 0 reported from the cache
+    When I change <module> in the copied package
+    And I run the test "all" with 1 shards
+    Then 2 features should have been run and 0 reported from the cache
+
+    Examples:
+      | module          |
+      | tool_steps.py   |
+      | tool_manager.py |
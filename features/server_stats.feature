@@ -0,0 +1,25 @@
+Feature: Server statistics
+  As an operator
+  I want per-tool latency and error statistics
+  So that I can see where time goes
+
+  Background:
+    Given the MCP tool system is initialized
+    And there is a sample calculator tool available
+
+  Scenario: Executions are counted per tool
+    When I execute the "calculator" tool with operation "add" and numbers 5 and 3
+    And I execute the "calculator" tool without parameters
+    Then the stats for tool "calculator" should show 2 calls and 1 error
+    And the stats for tool "calculator" should include p50, p95 and p99 for "execution"
+
+  Scenario: Export statistics in Prometheus format
+    When I execute the "calculator" tool with operation "add" and numbers 1 and 2
+    And I write the metrics to a Prometheus file
+    Then the metrics file should report 1 call for tool "calculator"
+
+  Scenario: Count event loop stalls
+    Given the event loop monitor is running with a 100 ms threshold
+    When the event loop is blocked for 300 ms
+    Then 1 loop stall should be counted
+    And the loop lag should be reported in the stats
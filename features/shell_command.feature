@@ -67,4 +67,22 @@ Feature: Execute shell commands
     Then the command should execute successfully
     And the stdout should contain "1"
     And the stdout should contain "100"
-    And the output should have 100 lines
\ No newline at end of file
+    And the output should have 100 lines
+
+  Scenario: Keep only the head and tail of output over the limit
+    When I execute the shell command "seq 1 100000" keeping 64 bytes of output
+    Then the command should execute successfully
+    And the stdout should start with "1\n2\n3\n"
+    And the stdout should end with "99999\n100000\n"
+    And the stdout should report 588895 bytes with the rest omitted
+
+  Scenario: Spill and stream the complete output
+    When I execute the shell command "seq 1 100000" keeping 64 bytes of output, spilled and streamed
+    Then the command should execute successfully
+    And the spill file should hold all 588895 bytes of stdout
+    And the streamed chunks should add up to the spill file
+
+  Scenario: Return the output of a command that timed out
+    When I execute the shell command "echo started; sleep 5" with timeout 1 seconds
+    Then the command should timeout
+    And the stdout should contain "started"
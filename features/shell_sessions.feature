@@ -0,0 +1,75 @@
+Feature: Persistent shell sessions
+  As an AI assistant
+  I want consecutive shell commands to share one shell
+  So that I do not repeat cd, source and environment setup on every call
+
+  Background:
+    Given the MCP tool system is initialized
+
+  Scenario: Directory, variables and functions carry over between commands
+    When I run "cd /tmp && export GREETING=hello && greet() { echo "$GREETING $1"; }" in shell session "work"
+    And I run "pwd; greet world" in shell session "work"
+    Then the command should execute successfully
+    And the stdout should contain "/tmp"
+    And the stdout should contain "hello world"
+    And the shell session "work" should not have been restarted
+
+  Scenario: Each command reports its own exit code and output
+    When I run "echo before; false" in shell session "codes"
+    Then the exit code should be 1
+    And the stdout should contain "before"
+    When I run "echo after" in shell session "codes"
+    Then the exit code should be 0
+    And the stdout should contain "after"
+    And the stdout should not contain "before"
+
+  Scenario: A syntax error does not end the session
+    When I run "export KEPT=yes" in shell session "typo"
+    And I run "if then" in shell session "typo"
+    Then the command should fail
+    When I run "echo $KEPT" in shell session "typo"
+    Then the stdout should contain "yes"
+    And the shell session "typo" should not have been restarted
+
+  Scenario: A command that exits the shell closes its session
+    When I run "exit 3" in shell session "gone"
+    Then the exit code should be 3
+    And the shell session "gone" should be closed
+
+  Scenario: A timed-out command closes its session
+    When I run "export LOST=yes; sleep 5" in shell session "slow" with timeout 1 seconds
+    Then the command should timeout
+    When I run "echo ${LOST:-unset}" in shell session "slow"
+    Then the stdout should contain "unset"
+    And the shell session "slow" should have been restarted
+
+  Scenario: The least recently used session makes room for a new one
+    Given shell sessions are limited to 2 and closed after 600 seconds idle
+    When I run "true" in shell session "first"
+    And I run "true" in shell session "second"
+    And I run "true" in shell session "first"
+    And I run "true" in shell session "third"
+    Then the open shell sessions should be "first, third"
+
+  Scenario: Idle sessions are closed
+    Given shell sessions are limited to 2 and closed after 0.2 seconds idle
+    When I run "true" in shell session "idle"
+    And I wait 0.6 seconds
+    Then no shell sessions should be open
+
+  Scenario: Late output from an earlier command's background job is not mixed in
+    When I run "(sleep 0.3; echo late; echo late >&2) &" in shell session "jobs"
+    And I wait 0.6 seconds
+    And I run "echo next" in shell session "jobs"
+    Then the stdout should contain "next"
+    And the stdout should not contain "late"
+    And the stderr should not contain "late"
+    And the shell session "jobs" should not have been restarted
+
+  Scenario: A session handed out for a command is not closed before the command runs
+    Given shell sessions are limited to 1 and closed after 0 seconds idle
+    When shell session "claimed" is handed out but its command has not started
+    Then starting shell session "other" should fail with "busy"
+    And after 0.3 seconds the open shell sessions should be "claimed"
+    When the claim on shell session "claimed" is given up
+    Then after 0.3 seconds no shell sessions should be open
@@ -0,0 +1,27 @@
+Feature: Graceful shutdown
+  As a server operator
+  I want shutdown to drain in-flight calls and then stop what is left
+  So that no tool process outlives the server
+
+  Background:
+    Given the MCP tool system is initialized
+    And the tools directory is writable
+
+  Scenario: A call still running at the deadline is killed with its process group
+    Given there is a tool that ignores SIGTERM and starts a child process
+    When the tool is running and the server shuts down with a 0.2 second drain
+    Then shutdown should report that it did not drain
+    And shutdown should report 1 killed process
+    And the tool's process group should be gone
+    And the interrupted call should have failed
+
+  Scenario: Calls that finish within the drain deadline are waited for
+    Given there is a sample calculator tool available
+    When a calculator call is running and the server shuts down with a 10 second drain
+    Then shutdown should report that it drained
+    And shutdown should report 0 killed processes
+    And the interrupted call should have succeeded
+
+  Scenario: No new work is accepted once shutdown has started
+    When the server shuts down with a 0.2 second drain
+    Then new work should be refused
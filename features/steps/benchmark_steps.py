@@ -0,0 +1,48 @@
+from behave import when, then
+import asyncio
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+@when('I benchmark the "{tool_name}" tool {iterations:d} times with {warmup:d} warmup call in "{mode}" mode')
+@when('I benchmark the "{tool_name}" tool {iterations:d} times with {warmup:d} warmup calls in "{mode}" mode at concurrency {concurrency:d}')
+def step_benchmark_tool(context, tool_name, iterations, warmup, mode, concurrency=1):
+    context.benchmark = asyncio.run(context.tool_manager.benchmark_tool(
+        tool_name,
+        {"operation": "add", "a": 2, "b": 3},
+        iterations=iterations,
+        warmup=warmup,
+        concurrency=concurrency,
+        mode=mode
+    ))
+
+
+@then('the benchmark should report {count:d} measured calls without errors')
+def step_check_benchmark_count(context, count):
+    assert context.benchmark["success"], context.benchmark
+    assert context.benchmark["latency_ms"]["count"] == count, context.benchmark
+    assert context.benchmark["errors"] == 0, context.benchmark
+
+
+@then('the benchmark should report cold start, percentiles, throughput and peak memory')
+def step_check_benchmark_fields(context):
+    result = context.benchmark
+    latency = result["latency_ms"]
+    assert result["cold_ms"] > 0
+    assert 0 < latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    assert result["throughput"] > 0
+    assert result["peak_rss_mb"] > 0
+
+
+@then('at most {count:d} workers should have been started')
+def step_check_worker_count(context, count):
+    assert 1 <= context.tool_manager.worker_pool.stats["spawned"] <= count, context.tool_manager.worker_pool.stats
+
+
+@then('the benchmark should fail with an error mentioning "{message}"')
+def step_check_benchmark_error(context, message):
+    assert not context.benchmark["success"]
+    assert message in context.benchmark["error"], context.benchmark["error"]
@@ -0,0 +1,92 @@
+from behave import given, when, then
+import json
+import subprocess
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from anymcp.bench import compare_results, write_results
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def _run_bench(context, *args):
+    context.bench_process = subprocess.run(
+        [sys.executable, "-m", "anymcp.bench", *args],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=300
+    )
+
+
+def _latency(value):
+    return {"unit": "ms", "better": "lower", "value": value}
+
+
+@when('I run the benchmark suite with registry sizes "{sizes}" in "{mode}" mode at concurrency "{levels}"')
+def step_run_bench_suite(context, sizes, mode, levels):
+    context.bench_output = context.test_dir / "bench.json"
+    _run_bench(
+        context, "run", "--output", str(context.bench_output), "--sizes", sizes,
+        "--modes", mode, "--concurrency", levels, "--iterations", "5", "--repeat", "2"
+    )
+
+
+@given('a saved benchmark baseline')
+@given('a saved benchmark baseline where "{metric}" was {factor:d} times faster')
+def step_saved_baseline(context, metric=None, factor=1):
+    current = {"results": {"search_tools/10": _latency(8.0), "throughput/worker/c1": {
+        "unit": "calls/s", "better": "higher", "value": 500.0
+    }}}
+    baseline = json.loads(json.dumps(current))
+    if metric:
+        baseline["results"][metric]["value"] /= factor
+    context.bench_baseline = context.test_dir / "baseline.json"
+    context.bench_output = context.test_dir / "current.json"
+    write_results(baseline, context.bench_baseline)
+    write_results(current, context.bench_output)
+
+
+@when('I compare the benchmark results against the baseline')
+def step_compare_bench(context):
+    _run_bench(context, "compare", "--json", str(context.bench_baseline), str(context.bench_output))
+
+
+@then('the benchmark suite should exit with code {code:d}')
+def step_check_bench_exit(context, code):
+    process = context.bench_process
+    assert process.returncode == code, f"exit {process.returncode}\n{process.stdout}\n{process.stderr}"
+
+
+@then('the benchmark results should include "{names}"')
+def step_check_bench_names(context, names):
+    results = json.loads(context.bench_output.read_text())["results"]
+    missing = [name.strip() for name in names.split(",") if name.strip() not in results]
+    assert not missing, f"Missing {missing} in {sorted(results)}"
+
+
+@then('every benchmark result should have a unit and a positive value')
+def step_check_bench_values(context):
+    data = json.loads(context.bench_output.read_text())
+    assert data["environment"]["python"]
+    for name, entry in data["results"].items():
+        assert entry["unit"] and entry["better"] in ("lower", "higher"), (name, entry)
+        assert entry["value"] > 0, (name, entry)
+
+
+@then('the comparison should report no regressions')
+def step_check_no_regressions(context):
+    comparison = json.loads(context.bench_process.stdout)
+    assert not comparison["regressed"], comparison
+    assert comparison["summary"]["ok"] == len(comparison["metrics"]), comparison
+
+
+@then('the comparison should report "{metric}" as a "{status}"')
+def step_check_comparison_status(context, metric, status):
+    comparison = json.loads(context.bench_process.stdout)
+    statuses = {m["name"]: m["status"] for m in comparison["metrics"]}
+    assert statuses.get(metric) == status, statuses
+    # compare_results is what the CLI prints; check it agrees in-process too
+    baseline = json.loads(context.bench_baseline.read_text())
+    current = json.loads(context.bench_output.read_text())
+    assert compare_results(baseline, current)["regressed"] == (status == "regression")
@@ -176,49 +176,3 @@ def step_check_matching_results(context):
 def step_search_tools(context):
     result = asyncio.run(context.tool_manager.search_tools())
     context.results.append(result)
-
-
-@given('the "{tool_name}" tool is available')
-def step_tool_available(context, tool_name):
-    # Initialize tool manager if needed
-    if not hasattr(context, 'tool_manager'):
-        tools_dir = str(context.tools_dir) if hasattr(context, 'tools_dir') else "tools"
-        context.tool_manager = ToolManager(tools_dir=tools_dir)
-    
-    # Create the tool
-    code = f'''
-def execute(x: int = 1) -> int:
-    return x
-'''
-    asyncio.run(context.tool_manager.create_tool(tool_name, code, overwrite=True))
-    context.tool_name = tool_name
-
-
-@when('I execute "{tool_name}" with parameters:')
-def step_execute_with_params(context, tool_name):
-    params = {}
-    for row in context.table:
-        params[row["parameter"]] = row["value"]
-        # Try to convert to appropriate type
-        try:
-            params[row["parameter"]] = int(row["value"])
-        except ValueError:
-            try:
-                params[row["parameter"]] = float(row["value"])
-            except ValueError:
-                pass  # Keep as string
-    
-    result = asyncio.run(context.tool_manager.execute_tool(tool_name, params))
-    context.result = result
-
-
-@then('the result should be "{expected}"')
-def step_check_result(context, expected):
-    assert context.result["success"], f"Tool execution failed: {context.result}"
-    assert str(context.result["result"]) == expected, f"Expected {expected}, got {context.result['result']}"
-
-
-@then('an error should occur with message "{message}"')
-def step_check_error(context, message):
-    assert not context.result["success"], "Expected an error but tool succeeded"
-    assert message in context.result["error"], f"Expected error '{message}', got '{context.result['error']}"
\ No newline at end of file
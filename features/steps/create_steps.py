@@ -224,4 +224,44 @@ def step_create_large_tool(context, count):
 @then('the tool file should contain all the code')
 def step_check_all_code(context):
     """Check that all code was saved"""
-    assert context.creation_result["success"] == True
\ No newline at end of file
+    assert context.creation_result["success"] == True
+
+@then("the tool's bytecode should be cached for its current source")
+def step_check_bytecode_cached(context):
+    import importlib.util
+    tool_path = Path(context.creation_result["path"])
+    assert context.creation_result["precompiled"], context.creation_result
+    pyc = Path(importlib.util.cache_from_source(str(tool_path))).read_bytes()
+    assert pyc[:4] == importlib.util.MAGIC_NUMBER
+    assert pyc[8:16] == importlib.util.source_hash(tool_path.read_bytes())
+
+
+@then('searching for "{keyword}" should find the tool without parsing it again')
+def step_check_indexed_search(context, keyword):
+    async def no_parse(tool_path):
+        raise AssertionError(f"{tool_path} was parsed again")
+    context.tool_manager._extract_tool_info = no_parse
+    tools = asyncio.run(context.tool_manager.search_tools(keyword))
+    assert [tool["path"] for tool in tools] == [context.creation_result["path"]], tools
+
+
+@then('no "{name}" tool file should have been written')
+def step_check_no_tool_file(context, name):
+    assert not (context.tool_manager.tools_dir / f"{name}.py").exists()
+
+
+@given('the tool system runs tools in warm workers')
+def step_worker_mode(context):
+    context.tool_manager = ToolManager(tools_dir=str(context.tools_dir), execution_mode="worker")
+
+
+@then('the new tool should have been preloaded into {count:d} worker')
+def step_check_preloaded(context, count):
+    assert context.creation_result["warmed_workers"] == count, context.creation_result
+
+
+@then('calling "{tool_name}" with name "{name}" should return "{expected}" from the same worker')
+def step_check_preloaded_call(context, tool_name, name, expected):
+    result = asyncio.run(context.tool_manager.execute_tool(tool_name, {"name": name}))
+    assert result["success"] and result["result"] == expected, result
+    assert context.tool_manager.worker_pool.stats["spawned"] == 1, context.tool_manager.worker_pool.stats
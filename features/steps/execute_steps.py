@@ -46,6 +46,39 @@ def step_execute_calculator(context, tool_name, op, a, b):
     context.execution_result = result
 
 
+@when('I execute the "{tool_name}" tool with operation "{op}" and numbers {a:d} and {b:d} under the "{profile}" profiler')
+def step_execute_calculator_profiled(context, tool_name, op, a, b, profile):
+    result = asyncio.run(context.tool_manager.execute_tool(
+        tool_name,
+        {"operation": op, "a": float(a), "b": float(b)},
+        profile=profile
+    ))
+    context.execution_result = result
+
+
+@when('I execute the "{tool_name}" tool with operation "{op}" and numbers {a:d} and {b:d} in a warm worker')
+def step_execute_calculator_in_worker(context, tool_name, op, a, b):
+    result = asyncio.run(context.tool_manager.execute_tool(
+        tool_name,
+        {"operation": op, "a": a, "b": b},
+        mode="worker"
+    ))
+    context.execution_result = result
+
+
+@when('the "{tool_name}" tool is changed to multiply instead of add')
+def step_change_calculator(context, tool_name):
+    tool_path = context.tool_manager.tools_dir / f"{tool_name}.py"
+    source = tool_path.read_text().replace("return a + b", "return a * b")
+    tool_path.write_text(source)
+
+
+@then('{workers:d} worker should have served {calls:d} calls')
+def step_check_worker_reuse(context, workers, calls):
+    stats = context.tool_manager.worker_pool.stats
+    assert stats["spawned"] == workers and stats["requests"] == calls, stats
+
+
 @when('I execute the "{tool_name}" tool without parameters')
 def step_execute_without_params(context, tool_name):
     result = asyncio.run(context.tool_manager.execute_tool(tool_name, {}))
@@ -206,4 +239,96 @@ def step_check_terminated(context):
 @then('I should get a timeout error message')
 def step_check_timeout_error(context):
     error = context.execution_result.get("error", "")
-    assert "timeout" in error.lower() or "timed out" in error.lower(), f"Expected timeout error, got: {error}"
\ No newline at end of file
+    assert "timeout" in error.lower() or "timed out" in error.lower(), f"Expected timeout error, got: {error}"
+
+
+@then('the profile should list the hottest functions')
+def step_check_cpu_profile(context):
+    profile = context.execution_result["profile"]
+    assert profile["type"] == "cpu"
+    functions = [entry["function"] for entry in profile["top"]]
+    assert any("(execute)" in function for function in functions), functions
+
+
+@then('the profile should report peak memory')
+def step_check_memory_profile(context):
+    profile = context.execution_result["profile"]
+    assert profile["type"] == "memory"
+    assert profile["peak_bytes"] >= 0
+    assert isinstance(profile["top"], list)
+
+
+@then('the profile dump should be saved')
+def step_check_profile_dump(context):
+    dump_path = Path(context.execution_result["profile"]["dump_path"])
+    assert dump_path.exists(), f"Profile dump missing: {dump_path}"
+
+
+@when('I execute the "{tool_name}" tool with a batch of cases:')
+def step_execute_batch(context, tool_name):
+    cases = [
+        {key: value if key == "operation" else float(value) for key, value in row.items()}
+        for row in context.table
+    ]
+    context.batch_result = asyncio.run(context.tool_manager.execute_tool_batch(tool_name, cases))
+    assert context.batch_result["success"], context.batch_result
+
+
+@then('batch case {index:d} should return {expected:d}')
+def step_check_batch_case(context, index, expected):
+    result = context.batch_result["results"][index - 1]
+    assert result["success"], result
+    assert result["result"] == expected, result
+
+
+@then('batch case {index:d} should fail with "{message}"')
+def step_check_batch_case_error(context, index, message):
+    result = context.batch_result["results"][index - 1]
+    assert not result["success"], result
+    assert message in result["error"], result["error"]
+
+
+@then('the "{tool_name}" tool should have been spawned {count:d} time')
+def step_check_spawn_count(context, tool_name, count):
+    spawn = context.tool_manager.metrics.snapshot()["tools"][tool_name]["phases"]["spawn"]
+    assert spawn["count"] == count, spawn
+
+
+@given('there is a tool that measures the length of its text parameter')
+def step_measure_text_tool(context):
+    result = asyncio.run(context.tool_manager.create_tool(
+        "measure_text",
+        "def execute(text: str) -> int:\n    return len(text)\n",
+        overwrite=True
+    ))
+    assert result["success"], result
+
+
+@when('I execute the "{tool_name}" tool with a text of {length:d} characters')
+def step_execute_large_text(context, tool_name, length):
+    manager = context.tool_manager
+    memfd_sizes = context.memfd_sizes = []
+    params_memfd = manager._params_memfd
+
+    def recording_memfd(payload):
+        memfd_sizes.append(len(payload))
+        return params_memfd(payload)
+
+    manager._params_memfd = recording_memfd
+    try:
+        context.execution_result = asyncio.run(manager.execute_tool(tool_name, {"text": "x" * length}))
+    finally:
+        del manager._params_memfd
+
+
+@when('I execute the "{tool_name}" tool with a text of {length:d} characters under the "{profile}" profiler')
+def step_execute_large_text_profiled(context, tool_name, length, profile):
+    context.execution_result = asyncio.run(context.tool_manager.execute_tool(
+        tool_name, {"text": "x" * length}, profile=profile
+    ))
+    assert context.execution_result["success"], context.execution_result
+
+
+@then('the parameters should have been passed through a memfd')
+def step_check_memfd(context):
+    assert context.memfd_sizes, "parameters went through the stdin pipe"
@@ -0,0 +1,77 @@
+from behave import given, when, then
+import asyncio
+import shutil
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+@given('a tool bundle with the tools "{names}" and a broken tool "{broken}"')
+def step_tool_bundle(context, names, broken):
+    bundle = context.test_dir / "bundle"
+    (bundle / "nested").mkdir(parents=True)
+    for index, name in enumerate(name.strip() for name in names.split(",")):
+        # Half the tools sit in a subdirectory, as they often do in archives
+        folder = bundle / "nested" if index % 2 else bundle
+        (folder / f"{name}.py").write_text(
+            f'__description__ = "A bundled tool"\n\ndef execute() -> str:\n    return "{name}"\n'
+        )
+    (bundle / f"{broken}.py").write_text("def execute(:\n    pass\n")
+    (bundle / "README.txt").write_text("not a tool")
+    context.bundle = bundle
+
+
+@when('I import the tool bundle as a directory')
+def step_import_directory(context):
+    context.import_result = asyncio.run(context.tool_manager.import_tools(str(context.bundle)))
+
+
+@when('I import the tool bundle as a directory with overwrite')
+def step_import_directory_overwrite(context):
+    context.import_result = asyncio.run(context.tool_manager.import_tools(str(context.bundle), overwrite=True))
+
+
+@when('I import the tool bundle as a {archive_format} archive')
+def step_import_archive(context, archive_format):
+    kind = {"tar.gz": "gztar", "zip": "zip"}[archive_format]
+    archive = shutil.make_archive(str(context.test_dir / "bundle_archive"), kind, context.test_dir, "bundle")
+    context.import_result = asyncio.run(context.tool_manager.import_tools(archive))
+
+
+@when('I import tools from "{source}"')
+def step_import_from(context, source):
+    context.import_result = asyncio.run(context.tool_manager.import_tools(str(context.test_dir / source)))
+
+
+@then('{count:d} tools should have been imported')
+def step_check_imported(context, count):
+    result = context.import_result
+    assert result["success"] and result["count"] == count, result
+    for tool in result["imported"]:
+        assert Path(tool["path"]).exists(), tool
+
+
+@then('"{name}" should be reported as failed with "{message}"')
+def step_check_import_failure(context, name, message):
+    failures = [entry for entry in context.import_result["failed"] if entry["name"] == name]
+    assert failures and message in failures[0]["error"], context.import_result["failed"]
+
+
+@then('executing the imported tool "{name}" should return "{expected}"')
+def step_check_imported_tool(context, name, expected):
+    result = asyncio.run(context.tool_manager.execute_tool(name, {}))
+    assert result["success"] and result["result"] == expected, result
+
+
+@then('searching for "{keyword}" should find {count:d} tools')
+def step_check_search_count(context, keyword, count):
+    tools = asyncio.run(context.tool_manager.search_tools(keyword))
+    assert len(tools) == count, tools
+
+
+@then('the import should fail with "{message}"')
+def step_check_import_error(context, message):
+    result = context.import_result
+    assert not result["success"] and message in result["error"], result
@@ -0,0 +1,205 @@
+from behave import given, when, then
+import asyncio
+import os
+import time
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp.tool_manager import ToolManager
+
+# Jobs run as tasks of the event loop they were submitted in, so each step
+# submits and polls within a single asyncio.run()
+
+
+async def wait_for_job(tool_manager, job_id):
+    while tool_manager.job_status(job_id)["status"] not in ("succeeded", "failed", "cancelled"):
+        await asyncio.sleep(0.02)
+    return tool_manager.job_status(job_id)
+
+
+@given('the tool system allows {count:d} concurrent execution')
+def step_limit_concurrency(context, count):
+    context.tool_manager = ToolManager(tools_dir=str(context.tools_dir), max_concurrency=count)
+
+
+@when('I submit a shell job "{command}" and tail its output until it finishes')
+def step_submit_and_tail(context, command):
+    async def run():
+        manager = context.tool_manager
+        job_id = (await manager.submit_job("shell_command", {"command": command}))["job_id"]
+        reads, offset = [], 0
+        while True:
+            page = manager.job_output(job_id, offset)
+            offset = page["next_offset"]
+            if page["output"]:
+                reads.append(page["output"])
+            if page["done"]:
+                return job_id, reads
+            await asyncio.sleep(0.05)
+
+    job_id, context.job_reads = asyncio.run(run())
+    context.job = context.tool_manager.job_status(job_id)
+
+
+@when('I submit a "{tool_name}" job with operation "{op}" and numbers {a:d} and {b:d} and wait for it')
+def step_submit_tool_job(context, tool_name, op, a, b):
+    async def run():
+        submitted = await context.tool_manager.submit_job("execute_tool", {
+            "tool_name": tool_name,
+            "parameters": {"operation": op, "a": float(a), "b": float(b)}
+        })
+        return await wait_for_job(context.tool_manager, submitted["job_id"])
+
+    context.job = asyncio.run(run())
+
+
+@when('I submit a shell job "{command}" and cancel it once it is running')
+def step_submit_and_cancel(context, command):
+    async def run():
+        manager = context.tool_manager
+        job_id = (await manager.submit_job("shell_command", {"command": command}))["job_id"]
+        while manager.job_status(job_id)["status"] != "running":
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.1)
+        cancelled = await manager.cancel_job(job_id)
+        assert cancelled["success"], cancelled
+        return manager.job_status(job_id), await manager.cancel_job(job_id)
+
+    context.job, context.second_cancel = asyncio.run(run())
+
+
+@when('I submit the shell jobs "{first}" and "{second}" and wait for both')
+def step_submit_two(context, first, second):
+    async def run():
+        manager = context.tool_manager
+        ids = [(await manager.submit_job("shell_command", {"command": command}))["job_id"]
+               for command in (first, second)]
+        return [await wait_for_job(manager, job_id) for job_id in ids]
+
+    context.jobs = asyncio.run(run())
+
+
+@when('I submit a "{kind}" job')
+def step_submit_unknown(context, kind):
+    context.submission = asyncio.run(context.tool_manager.submit_job(kind, {}))
+
+
+@given('there is a tool that records its pid and sleeps')
+def step_pid_sleeper(context):
+    result = asyncio.run(context.tool_manager.create_tool("pid_sleeper", (
+        "import os\n"
+        "import time\n\n"
+        "def execute(pid_file: str) -> str:\n"
+        "    with open(pid_file, 'w') as f:\n"
+        "        f.write(str(os.getpid()))\n"
+        "    time.sleep(30)\n"
+        "    return 'woke up'\n"
+    )))
+    assert result["success"], result
+
+
+async def submit_and_cancel_when(context, kind, arguments, pid_file):
+    """Submit a job, cancel it once ``pid_file`` shows it has started, and return its status"""
+    manager = context.tool_manager
+    job_id = (await manager.submit_job(kind, arguments))["job_id"]
+    while not pid_file.exists() or not pid_file.read_text().strip():
+        await asyncio.sleep(0.02)
+    context.job_pid = int(pid_file.read_text())
+    cancelled = await manager.cancel_job(job_id)
+    assert cancelled["success"], cancelled
+    return manager.job_status(job_id)
+
+
+@when('I submit a job for the sleeping tool and cancel it once the tool is running')
+def step_cancel_worker_job(context):
+    pid_file = context.test_dir / "tool.pid"
+    arguments = {"tool_name": "pid_sleeper", "parameters": {"pid_file": str(pid_file)}, "timeout": 60}
+    context.job = asyncio.run(submit_and_cancel_when(context, "execute_tool", arguments, pid_file))
+
+
+@when('I submit "{command}" to shell session "{session_id}" as a job and cancel it once it is running')
+def step_cancel_session_job(context, command, session_id):
+    arguments = {"command": command, "session_id": session_id, "cwd": str(context.test_dir), "timeout": 60}
+    pid_file = context.test_dir / "shell.pid"
+    context.job = asyncio.run(submit_and_cancel_when(context, "shell_command", arguments, pid_file))
+
+
+def process_gone(pid):
+    # Killed processes are reaped by the thread that was waiting on them
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@then("the tool's process should be gone")
+def step_check_tool_process_gone(context):
+    assert process_gone(context.job_pid), f"Worker {context.job_pid} is still running"
+
+
+@then("the session's shell should be gone")
+def step_check_shell_gone(context):
+    assert process_gone(context.job_pid), f"Shell {context.job_pid} is still running"
+
+
+@then('the job should have succeeded')
+def step_check_job_succeeded(context):
+    assert context.job["status"] == "succeeded", context.job
+
+
+@then('the tailed output should be "{text}"')
+def step_check_tailed_output(context, text):
+    assert "".join(context.job_reads) == text.replace("\\n", "\n"), context.job_reads
+
+
+@then('the output should have arrived in more than one read')
+def step_check_incremental(context):
+    assert len(context.job_reads) > 1, context.job_reads
+
+
+@then('the job result should be {expected:d}')
+def step_check_job_result(context, expected):
+    assert context.job["result"]["result"] == expected, context.job
+
+
+@then('the job output should be "{text}"')
+def step_check_job_output(context, text):
+    page = context.tool_manager.job_output(context.job["job_id"])
+    assert page["output"] == text and page["done"], page
+
+
+@then('the job should be cancelled')
+def step_check_cancelled(context):
+    assert context.job["status"] == "cancelled", context.job
+
+
+@then('cancelling it again should fail')
+def step_check_second_cancel(context):
+    assert not context.second_cancel["success"]
+    assert "already cancelled" in context.second_cancel["error"]
+
+
+@then('the second job should have been queued until the first finished')
+def step_check_queued(context):
+    first, second = context.jobs
+    assert first["status"] == second["status"] == "succeeded", context.jobs
+    assert second["started"] >= first["finished"] - 0.01, context.jobs
+
+
+@then('the queue wait should be recorded for the "{name}" built-in, not as a tool')
+def step_check_queue_wait_kind(context, name):
+    stats = context.tool_manager.metrics.snapshot()
+    assert name not in stats.get("tools", {}), stats
+    assert stats["builtins"][name]["phases"]["queue_wait"]["count"] == 2, stats
+
+
+@then('the submission should fail with "{message}"')
+def step_check_submission_failed(context, message):
+    assert not context.submission["success"]
+    assert message in context.submission["error"], context.submission
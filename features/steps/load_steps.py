@@ -0,0 +1,57 @@
+from behave import when, then
+import json
+import subprocess
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def _run_load(context, mix, requests, *args):
+    context.load_report_path = context.test_dir / "load.json"
+    context.bench_process = subprocess.run(
+        [sys.executable, "-m", "anymcp.bench", "load", "--mix", mix, "--requests", str(requests),
+         "--duration", "60", "--warmup", "1", "--server-args", "--execution-mode worker",
+         "--output", str(context.load_report_path), *args],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=300
+    )
+
+
+@when('I run the load generator for {requests:d} requests at concurrency {concurrency:d} with mix "{mix}"')
+def step_run_load_closed(context, requests, concurrency, mix):
+    _run_load(context, mix, requests, "--concurrency", str(concurrency))
+
+
+@when('I run the load generator for {requests:d} requests at {rate:g} requests per second with mix "{mix}"')
+def step_run_load_rate(context, requests, rate, mix):
+    _run_load(context, mix, requests, "--rate", str(rate))
+
+
+def _report(context):
+    return json.loads(context.load_report_path.read_text())
+
+
+@then('the load report should count {count:d} requests without errors')
+def step_check_load_count(context, count):
+    report = _report(context)
+    assert report["requests"] == count, report
+    assert report["errors"] == 0, report["top_errors"]
+
+
+@then('the load report should include "{operations}"')
+def step_check_load_operations(context, operations):
+    report = _report(context)
+    for name in (op.strip() for op in operations.split(",")):
+        assert report["operations"].get(name, {}).get("requests", 0) > 0, (name, report["operations"])
+
+
+@then('the load report should have latency percentiles and throughput')
+def step_check_load_stats(context):
+    report = _report(context)
+    latency = report["latency_ms"]
+    assert 0 < latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"], latency
+    assert report["throughput"] > 0
+    assert report["settings"]["transport"] == "stdio"
@@ -0,0 +1,75 @@
+from behave import given, when, then
+import asyncio
+import time
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp.loop_monitor import LoopMonitor
+
+
+@then('the stats for tool "{tool_name}" should show {calls:d} calls and {errors:d} error')
+def step_check_tool_call_counts(context, tool_name, calls, errors):
+    """Check call and error counts for a tool"""
+    stats = context.tool_manager.metrics.snapshot()["tools"][tool_name]
+    assert stats["calls"] == calls, f"Expected {calls} calls, got {stats['calls']}"
+    assert stats["errors"] == errors, f"Expected {errors} errors, got {stats['errors']}"
+
+
+@then('the stats for tool "{tool_name}" should include p50, p95 and p99 for "{phase}"')
+def step_check_tool_quantiles(context, tool_name, phase):
+    """Check that a phase reports percentiles"""
+    summary = context.tool_manager.metrics.snapshot()["tools"][tool_name]["phases"][phase]
+    for key in ("p50", "p95", "p99"):
+        assert key in summary
+    assert summary["p50"] <= summary["p95"] <= summary["p99"]
+
+
+@when('I write the metrics to a Prometheus file')
+def step_write_prometheus(context):
+    """Write the metrics text file into the scenario directory"""
+    context.metrics_file = context.test_dir / "metrics.prom"
+    context.tool_manager.metrics.write_prometheus(context.metrics_file)
+
+
+@then('the metrics file should report {count:d} call for tool "{tool_name}"')
+def step_check_metrics_file(context, count, tool_name):
+    """Check the call counter in the metrics file"""
+    content = context.metrics_file.read_text()
+    line = f'anymcp_calls_total{{kind="tool",name="{tool_name}"}} {count}'
+    assert line in content, f"Expected '{line}' in:\n{content}"
+
+
+@given('the event loop monitor is running with a {threshold:d} ms threshold')
+def step_loop_monitor(context, threshold):
+    """Prepare a loop monitor bound to the tool manager's metrics"""
+    context.loop_monitor = LoopMonitor(context.tool_manager.metrics, threshold=threshold / 1000)
+
+
+@when('the event loop is blocked for {duration:d} ms')
+def step_block_loop(context, duration):
+    """Run the monitor while a coroutine blocks the loop synchronously"""
+    async def scenario():
+        monitor = asyncio.create_task(context.loop_monitor.run())
+        await asyncio.sleep(0.1)
+        time.sleep(duration / 1000)
+        await asyncio.sleep(0.1)
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+@then('{count:d} loop stall should be counted')
+def step_check_stall_count(context, count):
+    """Check the stall counter"""
+    counters = context.tool_manager.metrics.snapshot()["counters"]
+    assert counters.get("loop_stalls") == count, f"Expected {count} stalls, got {counters}"
+
+
+@then('the loop lag should be reported in the stats')
+def step_check_loop_lag(context):
+    """Check the loop lag histogram"""
+    lag = context.tool_manager.metrics.snapshot()["histograms"]["loop_lag"]
+    assert lag["max"] >= context.loop_monitor.threshold
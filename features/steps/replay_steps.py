@@ -0,0 +1,142 @@
+from behave import given, when, then
+import asyncio
+import json
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from anymcp.bench.load import stdio_session
+from anymcp.bench.replay import replay_recording
+from anymcp.recording import load_recording, normalize_result
+
+DOUBLER_V1 = "def execute(x: int) -> int:\n    return x * 2\n"
+DOUBLER_V2 = "def execute(x: int) -> int:\n    return x + x\n"
+
+
+async def _record_session(workspace, recording):
+    async with stdio_session(["--record", str(recording)], workspace) as session:
+        await session.call_tool("create_tool", {"name": "doubler", "code": DOUBLER_V1})
+        await session.call_tool("execute_tool", {"tool_name": "doubler", "parameters": {"x": 2}})
+        await session.call_tool("search_tool", {"keyword": "doubler"})
+        await session.call_tool("create_tool", {"name": "doubler", "code": DOUBLER_V2, "overwrite": True})
+        await session.call_tool("execute_tool", {"tool_name": "doubler", "parameters": {"x": 21}})
+
+
+@given('a recorded session that creates, executes and rewrites a "doubler" tool')
+def step_record_session(context):
+    context.recording = context.test_dir / "traffic.jsonl"
+    asyncio.run(_record_session(context.test_dir, context.recording))
+
+
+async def _record_external_edits(workspace, recording):
+    tool_path = workspace / "tools" / "tripler.py"
+    tool_path.parent.mkdir(parents=True, exist_ok=True)
+    tool_path.write_text("def execute(x: int) -> int:\n    return x * 3\n")
+    async with stdio_session(["--record", str(recording)], workspace) as session:
+        await session.call_tool("execute_tool", {"tool_name": "tripler", "parameters": {"x": 2}})
+        tool_path.write_text("def execute(x: int) -> str:\n    return str(x) * 3\n")
+        await session.call_tool("execute_tool", {"tool_name": "tripler", "parameters": {"x": 2}})
+
+
+@given('a recorded session that executes a "tripler" tool edited on disk between calls')
+def step_record_external_edits(context):
+    context.recording = context.test_dir / "external.jsonl"
+    asyncio.run(_record_external_edits(context.test_dir, context.recording))
+
+
+@given('the recorded result of call {seq:d} was changed')
+def step_tamper_recording(context, seq):
+    lines = context.recording.read_text().splitlines()
+    for index, line in enumerate(lines):
+        record = json.loads(line)
+        if record["type"] == "call" and record["seq"] == seq:
+            result = json.loads(record["result"])
+            result["tampered"] = True
+            record["result"] = json.dumps(result, indent=2)
+            record["result_sha256"] = "0" * 64
+            lines[index] = json.dumps(record)
+    context.recording.write_text("\n".join(lines) + "\n")
+
+
+@when('I replay the recording at {speed:g}x speed')
+@when('I replay the recording at full speed')
+def step_replay(context, speed=0):
+    context.replay = asyncio.run(replay_recording(
+        context.recording, speed=speed, workspace=context.test_dir / "replay"
+    ))
+
+
+@then('the recording should contain {sessions:d} session with {calls:d} calls')
+def step_check_recording_shape(context, sessions, calls):
+    recording = load_recording(context.recording)
+    assert len(recording["sessions"]) == sessions, recording["sessions"]
+    assert len(recording["sessions"][0]["calls"]) == calls, recording["sessions"][0]["calls"]
+
+
+@then('every recorded call should have a start offset, a duration and a result digest')
+def step_check_recorded_calls(context):
+    calls = load_recording(context.recording)["sessions"][0]["calls"]
+    offsets = [call["t"] for call in calls]
+    assert offsets == sorted(offsets) and offsets[0] >= 0, offsets
+    for call in calls:
+        assert call["duration_ms"] > 0 and len(call["result_sha256"]) == 64, call
+        assert not call["error"], call
+
+
+@then('the recording should hold {count:d} snapshots of the "{tool_name}" tool')
+def step_check_snapshots(context, count, tool_name):
+    recording = load_recording(context.recording)
+    snapshots = [s for s in recording["snapshots"].values() if s["tool"] == tool_name]
+    assert len(snapshots) == count, snapshots
+    executed = [c for c in recording["sessions"][0]["calls"] if c["tool"] == "execute_tool"]
+    assert {c["tool_sha256"] for c in executed} == {s["sha256"] for s in snapshots}
+
+
+@then('the replay should cover {calls:d} calls with no differences')
+def step_check_replay_clean(context, calls):
+    assert context.replay["calls"] == calls, context.replay
+    assert context.replay["errors"] == 0, context.replay["differences"]
+    assert context.replay["mismatches"] == 0, context.replay["differences"]
+
+
+@then('the replay should report recorded and replayed latency per tool')
+def step_check_replay_latency(context):
+    tools = context.replay["tools"]
+    assert set(tools) == {"create_tool", "execute_tool", "search_tool"}, tools
+    for stats in tools.values():
+        assert stats["recorded_ms"]["p50"] > 0 and stats["replayed_ms"]["p50"] > 0, stats
+
+
+@then('the replay should report call {seq:d} as different with a diff')
+def step_check_replay_difference(context, seq):
+    differences = {d["seq"]: d for d in context.replay["differences"]}
+    assert list(differences) == [seq], context.replay["differences"]
+    assert '"tampered": true' in differences[seq]["diff"], differences[seq]["diff"]
+
+
+def _normalized(tool, value):
+    return normalize_result(json.dumps(value), "/tools", tool)
+
+
+@then('an "{tool}" result of {first} should not match {second}')
+def step_check_ordered(context, tool, first, second):
+    assert _normalized(tool, json.loads(first)) != _normalized(tool, json.loads(second))
+
+
+@then('a "{tool}" result of {first} should match {second}')
+def step_check_unordered(context, tool, first, second):
+    assert _normalized(tool, json.loads(first)) == _normalized(tool, json.loads(second))
+
+
+@then('a "list_tools" result listing {first} should match one listing {second}')
+def step_check_listing_unordered(context, first, second):
+    listing = lambda names: {"success": True, "tools": json.loads(names)}
+    assert _normalized("list_tools", listing(first)) == _normalized("list_tools", listing(second))
+
+
+@then('a "list_tools" result whose "{name}" tool takes {first} should not match one taking {second}')
+def step_check_nested_ordered(context, name, first, second):
+    listing = lambda params: {"tools": [{"name": "a"}, {"name": name, "parameters": json.loads(params)}]}
+    assert _normalized("list_tools", listing(first)) != _normalized("list_tools", listing(second))
@@ -2,10 +2,12 @@ from behave import given, when, then
 import asyncio
 from pathlib import Path
 import json
+import shutil
 
 # Add parent directory to Python path for imports
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp import result_cache
 from anymcp.tool_manager import ToolManager
 
 
@@ -252,4 +254,164 @@ def step_check_test_executes(context):
 def step_check_working_dir(context):
     """Check working directory handling"""
     # If test ran, working directory was handled
-    assert context.test_result is not None
\ No newline at end of file
+    assert context.test_result is not None
+
+@given('a project with a passing behave feature')
+@given('a project with {count:d} passing behave features')
+def step_create_behave_project(context, count=1):
+    """Create a minimal behave project next to the scenario's tools directory"""
+    features_dir = context.test_dir / "features"
+    (features_dir / "steps").mkdir(parents=True, exist_ok=True)
+    for index in range(count):
+        (features_dir / f"greeting_{index}.feature").write_text(
+            f"Feature: Greeting {index}\n\n"
+            "  Scenario: Say hello\n"
+            f"    When I greet \"world {index}\"\n"
+            f"    Then the greeting should be \"hello world {index}\"\n"
+        )
+    context.project_steps = features_dir / "steps" / "greeting_steps.py"
+    context.project_steps.write_text(
+        "from behave import when, then\n\n"
+        "@when('I greet \"{name}\"')\n"
+        "def step_greet(context, name):\n"
+        "    context.greeting = f'hello {name}'\n\n"
+        "@then('the greeting should be \"{expected}\"')\n"
+        "def step_check(context, expected):\n"
+        "    assert context.greeting == expected, f'expected {expected!r}'\n"
+    )
+
+
+@when("I change the project's step definitions")
+def step_change_project_steps(context):
+    """Edit the step module so the runner has to reload it"""
+    with open(context.project_steps, "a") as f:
+        f.write("\n# edited\n")
+
+
+@when('I run the test "{test_name}" {count:d} times without the result cache')
+def step_run_test_repeatedly(context, test_name, count):
+    """Run the same test several times with one tool manager"""
+    context.test_results = [
+        asyncio.run(context.tool_manager.run_test(test_name, force=True)) for _ in range(count)
+    ]
+
+
+@then('every test run should pass')
+def step_check_all_runs_passed(context):
+    """Check each of the repeated runs passed"""
+    for result in context.test_results:
+        assert result["passed"], result.get("output") or result.get("error")
+
+
+@then('the step definitions should have been loaded {count:d} time')
+@then('the step definitions should have been loaded {count:d} times')
+def step_check_step_loads(context, count):
+    """Check how often the persistent runner executed the step modules"""
+    stats = context.tool_manager.behave_runner.stats
+    assert stats["step_loads"] == count, f"Expected {count} step loads, got {stats}"
+
+
+@when('I run the test "{test_name}" with {shards:d} shards')
+def step_run_test_sharded(context, test_name, shards):
+    """Run tests split across parallel shards"""
+    context.test_result = asyncio.run(context.tool_manager.run_test(test_name, shards=shards))
+
+
+@then('the merged statistics should report {count:d} scenarios passed')
+def step_check_merged_statistics(context, count):
+    """Check the statistics combined from every shard"""
+    scenarios = context.test_result["statistics"]["scenarios"]
+    assert scenarios.startswith(f"{count} scenarios passed, 0 failed"), scenarios
+
+
+@then('the report should list {count:d} shards with their timings')
+def step_check_shard_report(context, count):
+    """Check the per-shard breakdown"""
+    shards = context.test_result["shards"]
+    assert len(shards) == count, shards
+    assert sorted(name for shard in shards for name in shard["features"]) == [
+        f"greeting_{index}.feature" for index in range(3)
+    ]
+    for shard in shards:
+        assert shard["passed"] and shard["duration"] > 0, shard
+
+
+@given('the project has a failing scenario')
+def step_add_failing_feature(context):
+    """Add a feature whose assertion fails"""
+    (context.test_dir / "features" / "farewell.feature").write_text(
+        "Feature: Farewell\n\n"
+        "  Scenario: Say goodbye\n"
+        "    When I greet \"world\"\n"
+        "    Then the greeting should be \"goodbye world\"\n"
+    )
+
+
+@then('the results should count {passed:d} passed and {failed:d} failed scenarios')
+def step_check_result_totals(context, passed, failed):
+    """Check scenario totals from the structured results"""
+    totals = context.test_result["results"]["totals"]["scenarios"]
+    assert totals.get("passed", 0) == passed and totals.get("failed", 0) == failed, totals
+
+
+@then('the results should report the failure message "{message}"')
+def step_check_result_failure(context, message):
+    """Check the failing scenario carries its assertion message"""
+    failures = context.test_result["results"]["failures"]
+    assert len(failures) == 1, failures
+    assert failures[0]["scenario"] == "Say goodbye"
+    assert message in failures[0]["message"], failures[0]
+
+
+@then('the results should list the slowest scenarios first')
+def step_check_result_slowest(context):
+    """Check the slowest-scenario ranking"""
+    durations = [entry["duration"] for entry in context.test_result["results"]["slowest"]]
+    assert durations and durations == sorted(durations, reverse=True), durations
+
+
+@when('I change the feature "{name}"')
+def step_change_feature(context, name):
+    """Edit a feature file so its cached result no longer applies"""
+    with open(context.test_dir / "features" / name, "a") as f:
+        f.write("\n  # edited\n")
+
+
+@when('I run the test "{test_name}" forcing a full run')
+def step_run_test_forced(context, test_name):
+    """Run tests bypassing the result cache"""
+    context.test_result = asyncio.run(context.tool_manager.run_test(test_name, shards=1, force=True))
+
+
+@then('{ran:d} features should have been run and {cached:d} reported from the cache')
+def step_check_cache_usage(context, ran, cached):
+    """Check which features ran and which came from the cache"""
+    result = context.test_result
+    assert result["passed"], result
+    assert len(result["ran"]) == ran, result["ran"]
+    assert len(result["cached"]) == cached, result["cached"]
+
+
+@then('the result cache should be stored in the state directory')
+def step_check_cache_file(context):
+    """Check the cache file lives under the tool manager's state directory"""
+    cache_file = context.tool_manager.state_dir / "test_cache.json"
+    assert cache_file.exists()
+    assert "features/greeting_0.feature" in json.loads(cache_file.read_text())
+
+
+@given('the anymcp package is a copy inside the project')
+def step_copy_package(context):
+    """Point the cache's package digest at a copy that the scenario may edit"""
+    package_dir = context.test_dir / "anymcp"
+    shutil.copytree(result_cache.PACKAGE_DIR, package_dir, ignore=shutil.ignore_patterns("__pycache__"))
+    original = result_cache.PACKAGE_DIR
+    result_cache.PACKAGE_DIR = package_dir
+    context.add_cleanup(setattr, result_cache, "PACKAGE_DIR", original)
+
+
+@when('I change {module} in the copied package')
+def step_change_package_module(context, module):
+    """Edit a package module the way an update of the package would"""
+    with open(result_cache.PACKAGE_DIR / module, "a") as f:
+        f.write("\n# changed\n")
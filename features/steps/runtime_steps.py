@@ -0,0 +1,74 @@
+from behave import given, when, then
+import asyncio
+import json
+import subprocess
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp.runtime import encode_frame, iter_frames
+from anymcp.tool_manager import LEGACY_MAIN_BLOCK, RUNTIME_SCRIPT
+
+ADDER = '''
+import json
+
+def execute(a: int, b: int) -> dict:
+    return {"sum": a + b}
+'''
+
+
+@given('a tool file "{name}" written with the generated __main__ block')
+def step_legacy_tool(context, name):
+    (context.tools_dir / f"{name}.py").write_text(ADDER + "\n" + LEGACY_MAIN_BLOCK)
+
+
+@given('a tool file "{name}" with a hand-written __main__ block')
+def step_custom_main_tool(context, name):
+    (context.tools_dir / f"{name}.py").write_text(
+        ADDER + '\nif __name__ == "__main__":\n    print(execute(1, 2))\n'
+    )
+
+
+@when('I migrate the tools')
+def step_migrate_tools(context):
+    context.migration = asyncio.run(context.tool_manager.migrate_tools())
+    assert context.migration["success"], context.migration
+
+
+@when('I send the runtime for "{name}" the frames {first} and {second}')
+def step_send_frames(context, name, first, second):
+    tool_path = context.tool_manager.tools_dir / f"{name}.py"
+    process = subprocess.run(
+        [sys.executable, str(RUNTIME_SCRIPT), str(tool_path)],
+        input=encode_frame(first.encode()) + encode_frame(second.encode()),
+        capture_output=True,
+        timeout=30
+    )
+    assert process.returncode == 0, process.stderr
+    context.runtime_responses = [json.loads(frame) for frame in iter_frames(process.stdout)]
+
+
+@then('the "{name}" tool file should not contain a __main__ block')
+def step_check_no_main(context, name):
+    source = (context.tool_manager.tools_dir / f"{name}.py").read_text()
+    assert "__main__" not in source and "argparse" not in source, source
+
+
+@then('executing "{name}" with a={a:d} and b={b:d} should return a sum of {total:d}')
+def step_check_sum(context, name, a, b, total):
+    result = asyncio.run(context.tool_manager.execute_tool(name, {"a": a, "b": b}))
+    assert result["success"] and result["result"] == {"sum": total}, result
+
+
+@then('the runtime should answer with a sum of {total:d} and then an error')
+def step_check_runtime_responses(context, total):
+    first, second = context.runtime_responses
+    assert json.loads(first["output"]) == {"sum": total}, first
+    assert "TypeError" in second["error"], second
+
+
+@then('"{name}" should be reported as {outcome}')
+def step_check_migration_outcome(context, name, outcome):
+    paths = context.migration[outcome]
+    assert str(context.tool_manager.tools_dir / f"{name}.py") in paths, context.migration
@@ -3,10 +3,12 @@ import asyncio
 from pathlib import Path
 import tempfile
 import shutil
+import time
 
 # Add parent directory to Python path for imports
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp.shell_session import ShellSessionError, ShellSessions
 from anymcp.tool_manager import ToolManager
 
 
@@ -91,6 +93,13 @@ def step_check_stdout_not_contains(context, text):
     assert text not in stdout, f"Unexpected '{text}' found in stdout: {stdout}"
 
 
+@then('the stderr should not contain "{text}"')
+def step_check_stderr_not_contains(context, text):
+    """Check if stderr doesn't contain text"""
+    stderr = context.shell_result.get("stderr", "")
+    assert text not in stderr, f"Unexpected '{text}' found in stderr: {stderr}"
+
+
 @then('the stderr should contain error message')
 def step_check_stderr_has_error(context):
     """Check if stderr contains error message"""
@@ -154,6 +163,166 @@ def step_check_line_count(context, count):
     assert len(lines) == count, f"Expected {count} lines, got {len(lines)}"
 
 
+@when('I execute the shell command "{command}" keeping {limit:d} bytes of output')
+def step_execute_command_with_limit(context, command, limit):
+    """Execute command with a bounded output capture"""
+    result = asyncio.run(context.tool_manager.shell_command(command, max_output_bytes=limit))
+    context.shell_result = result
+
+
+@when('I execute the shell command "{command}" keeping {limit:d} bytes of output, spilled and streamed')
+def step_execute_command_spilled_and_streamed(context, command, limit):
+    """Execute command with spill files and a streaming callback"""
+    context.streamed = []
+
+    async def on_output(stream, chunk):
+        context.streamed.append((stream, chunk))
+
+    result = asyncio.run(context.tool_manager.shell_command(
+        command, max_output_bytes=limit, spill=True, on_output=on_output
+    ))
+    context.shell_result = result
+
+
+@then('the stdout should start with "{text}"')
+def step_check_stdout_starts(context, text):
+    """Check the head of the captured stdout"""
+    stdout = context.shell_result["stdout"]
+    assert stdout.startswith(text.replace("\\n", "\n")), stdout
+
+
+@then('the stdout should end with "{text}"')
+def step_check_stdout_ends(context, text):
+    """Check the tail of the captured stdout"""
+    stdout = context.shell_result["stdout"]
+    assert stdout.endswith(text.replace("\\n", "\n")), stdout
+
+
+@then('the stdout should report {count:d} bytes with the rest omitted')
+def step_check_stdout_truncated(context, count):
+    """Check the byte count and omission marker of truncated stdout"""
+    result = context.shell_result
+    assert result["stdout_bytes"] == count, result["stdout_bytes"]
+    assert result["truncated"] is True
+    assert f"[{count - 64} bytes omitted]" in result["stdout"], result["stdout"]
+
+
+@then('the spill file should hold all {count:d} bytes of stdout')
+def step_check_spill_file(context, count):
+    """Check that the spill file has the complete stdout"""
+    spill_file = Path(context.shell_result["spill_files"]["stdout"])
+    assert spill_file.stat().st_size == count
+    assert context.shell_result["stdout_bytes"] == count
+
+
+@then('the streamed chunks should add up to the spill file')
+def step_check_streamed_chunks(context):
+    """Check that streaming delivered the whole stdout in order"""
+    streamed = b"".join(chunk for stream, chunk in context.streamed if stream == "stdout")
+    assert streamed == Path(context.shell_result["spill_files"]["stdout"]).read_bytes()
+
+
+@given('shell sessions are limited to {count:d} and closed after {seconds:g} seconds idle')
+def step_limit_shell_sessions(context, count, seconds):
+    """Replace the session table with one using the given limits"""
+    context.tool_manager.shell_sessions.close()
+    context.tool_manager.shell_sessions = ShellSessions(count, seconds)
+
+
+@when('I run "{command}" in shell session "{session_id}"')
+def step_run_in_session(context, command, session_id):
+    """Run a command in a persistent shell session"""
+    result = asyncio.run(context.tool_manager.shell_command(command, session_id=session_id))
+    context.shell_result = result
+
+
+@when('I run "{command}" in shell session "{session_id}" with timeout {timeout:d} seconds')
+def step_run_in_session_with_timeout(context, command, session_id, timeout):
+    """Run a command in a persistent shell session with a timeout"""
+    result = asyncio.run(context.tool_manager.shell_command(command, timeout=timeout, session_id=session_id))
+    context.shell_result = result
+
+
+@when('I wait {seconds:g} seconds')
+def step_wait(context, seconds):
+    """Let time pass"""
+    time.sleep(seconds)
+
+
+@then('the shell session "{session_id}" should not have been restarted')
+def step_check_session_reused(context, session_id):
+    """Check that the last command ran in an existing shell"""
+    assert context.shell_result["session_id"] == session_id
+    assert context.shell_result["session_started"] is False, context.shell_result
+
+
+@then('the shell session "{session_id}" should have been restarted')
+def step_check_session_restarted(context, session_id):
+    """Check that the last command needed a new shell"""
+    assert context.shell_result["session_id"] == session_id
+    assert context.shell_result["session_started"] is True, context.shell_result
+
+
+@then('the shell session "{session_id}" should be closed')
+def step_check_session_closed(context, session_id):
+    """Check that a session's shell exited and was forgotten"""
+    assert context.shell_result.get("session_closed") is True, context.shell_result
+    assert session_id not in context.tool_manager.shell_sessions.sessions()
+
+
+@then('the open shell sessions should be "{names}"')
+def step_check_open_sessions(context, names):
+    """Check which sessions are still open"""
+    sessions = context.tool_manager.shell_sessions.sessions()
+    assert sessions == names.split(", "), sessions
+
+
+@then('no shell sessions should be open')
+def step_check_no_sessions(context):
+    """Check that every session has been closed"""
+    sessions = context.tool_manager.shell_sessions.sessions()
+    assert sessions == [], sessions
+
+
+@when('shell session "{session_id}" is handed out but its command has not started')
+def step_claim_session(context, session_id):
+    """Acquire a session the way shell_command does, without running anything yet"""
+    sessions = context.tool_manager.shell_sessions
+    context.claimed_session, _ = sessions.acquire(session_id, str(context.test_dir))
+
+
+@when('the claim on shell session "{session_id}" is given up')
+def step_release_session(context, session_id):
+    """Release the claim taken by acquire"""
+    assert context.claimed_session.session_id == session_id
+    context.tool_manager.shell_sessions.release(context.claimed_session)
+
+
+@then('starting shell session "{session_id}" should fail with "{message}"')
+def step_check_session_start_fails(context, session_id, message):
+    """Check that no session could be evicted to make room"""
+    try:
+        context.tool_manager.shell_sessions.acquire(session_id, str(context.test_dir))
+    except ShellSessionError as e:
+        assert message in str(e), e
+    else:
+        raise AssertionError(f"Shell session '{session_id}' was started")
+
+
+@then('after {seconds:g} seconds the open shell sessions should be "{names}"')
+def step_check_open_sessions_later(context, seconds, names):
+    """Let the reaper run, then check which sessions are still open"""
+    time.sleep(seconds)
+    step_check_open_sessions(context, names)
+
+
+@then('after {seconds:g} seconds no shell sessions should be open')
+def step_check_no_sessions_later(context, seconds):
+    """Let the reaper run, then check that every session has been closed"""
+    time.sleep(seconds)
+    step_check_no_sessions(context)
+
+
 @given('there is a test directory "{directory}"')
 def step_create_test_directory(context, directory):
     """Create a test directory"""
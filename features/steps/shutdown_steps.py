@@ -0,0 +1,124 @@
+from behave import given, when, then
+import asyncio
+import os
+import time
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp.shutdown import ServerShuttingDown
+
+STUBBORN_TOOL = '''
+import signal
+import subprocess
+import time
+
+def execute(pid_file: str) -> str:
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    child = subprocess.Popen(["sleep", "60"])
+    with open(pid_file, "w") as f:
+        f.write(str(child.pid))
+    time.sleep(60)
+    return "finished"
+'''
+
+
+async def call_and_shut_down(context, tool_name, parameters, drain):
+    """Run one call as in-flight work and shut down once its process is up"""
+    manager = context.tool_manager
+
+    async def call():
+        async with manager.coordinator.work():
+            return await manager.execute_tool(tool_name, parameters, timeout=120)
+
+    task = asyncio.create_task(call())
+    while not manager.coordinator._processes:
+        await asyncio.sleep(0.01)
+    context.tool_pids = [process.pid for process in manager.coordinator._processes]
+    if "pid_file" in parameters:
+        while not Path(parameters["pid_file"]).exists():
+            await asyncio.sleep(0.01)
+    context.shutdown_summary = await manager.shutdown(timeout=drain)
+    context.call_result = await task
+
+
+@given('there is a tool that ignores SIGTERM and starts a child process')
+def step_stubborn_tool(context):
+    result = asyncio.run(context.tool_manager.create_tool("stubborn", STUBBORN_TOOL))
+    assert result["success"], result
+
+
+@when('the tool is running and the server shuts down with a {drain:g} second drain')
+def step_shutdown_stubborn(context, drain):
+    context.pid_file = context.test_dir / "child.pid"
+    asyncio.run(call_and_shut_down(context, "stubborn", {"pid_file": str(context.pid_file)}, drain))
+
+
+@when('a calculator call is running and the server shuts down with a {drain:g} second drain')
+def step_shutdown_calculator(context, drain):
+    parameters = {"operation": "add", "a": 2, "b": 3}
+    asyncio.run(call_and_shut_down(context, "calculator", parameters, drain))
+
+
+@when('the server shuts down with a {drain:g} second drain')
+def step_shutdown_idle(context, drain):
+    context.shutdown_summary = asyncio.run(context.tool_manager.shutdown(timeout=drain))
+
+
+@then('shutdown should report that it did not drain')
+def step_check_not_drained(context):
+    assert context.shutdown_summary["drained"] is False, context.shutdown_summary
+
+
+@then('shutdown should report that it drained')
+def step_check_drained(context):
+    assert context.shutdown_summary["drained"] is True, context.shutdown_summary
+
+
+@then('shutdown should report {count:d} killed process')
+@then('shutdown should report {count:d} killed processes')
+def step_check_killed(context, count):
+    assert context.shutdown_summary["killed"] == count, context.shutdown_summary
+
+
+def alive(kill, target):
+    try:
+        kill(target, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@then("the tool's process group should be gone")
+def step_check_group_gone(context):
+    # The tool's own child is reparented when the group dies, so give its
+    # new parent a moment to reap it
+    grandchild = int(context.pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while any(alive(os.killpg, pid) for pid in context.tool_pids) or alive(os.kill, grandchild):
+        assert time.monotonic() < deadline, f"Process group {context.tool_pids} is still alive"
+        time.sleep(0.05)
+
+
+@then('the interrupted call should have failed')
+def step_check_call_failed(context):
+    assert context.call_result["success"] is False, context.call_result
+
+
+@then('the interrupted call should have succeeded')
+def step_check_call_succeeded(context):
+    assert context.call_result["success"] is True, context.call_result
+
+
+@then('new work should be refused')
+def step_check_refused(context):
+    async def attempt():
+        async with context.tool_manager.coordinator.work():
+            pass
+
+    try:
+        asyncio.run(attempt())
+    except ServerShuttingDown:
+        return
+    raise AssertionError("Work was admitted after shutdown")
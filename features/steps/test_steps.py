@@ -1,5 +1,6 @@
 from behave import given, when, then
 import asyncio
+import os
 from pathlib import Path
 import json
 
@@ -273,4 +274,135 @@ def step_check_async_handling(context):
 def step_check_async_runners(context):
     with open(context.test_creation_result["steps_file"], 'r') as f:
         content = f.read()
-    assert "asyncio.run" in content
\ No newline at end of file
+    assert "asyncio.run" in content
+
+@when('I create a BDD test for "{tool_name}" with inputs {inputs} expecting {outputs}')
+def step_create_test_with_inputs(context, tool_name, inputs, outputs):
+    def values(text):
+        return [value.strip() for value in text.replace(" and ", ",").split(",")]
+    test_scenarios = [
+        {"input": {"text": text}, "expected": expected}
+        for text, expected in zip(values(inputs), values(outputs))
+    ]
+    context.test_creation_result = asyncio.run(
+        context.tool_manager.create_tool_test(tool_name, test_scenarios)
+    )
+
+
+@when('I create BDD tests for "{first}" and "{second}"')
+def step_create_tests_for_two_tools(context, first, second):
+    context.test_creation_results = [
+        asyncio.run(context.tool_manager.create_tool_test(name, [{"input": {"text": "ab"}, "expected": "ba"}]))
+        for name in (first, second)
+    ]
+
+
+@then('no per-tool step modules should be generated')
+def step_check_no_per_tool_steps(context):
+    for result in context.test_creation_results:
+        name = Path(result["feature_file"]).stem
+        assert not (Path("features/steps") / f"{name}_steps.py").exists(), name
+
+
+@then('the tests should load the shared step library')
+def step_check_shared_library(context):
+    for result in context.test_creation_results:
+        loader = Path(result["steps_loader"]).read_text()
+        assert "from anymcp.tool_steps import *" in loader
+        assert Path(result["steps_file"]).name == "tool_steps.py"
+
+
+LEGACY_STEPS = """from behave import given, when, then
+import asyncio
+
+try:
+    from common_steps import *
+except ImportError:
+    @given('the "{{tool_name}}" tool is available')
+    def step_{name}_tool_available(context, tool_name):
+        context.tool_name = tool_name
+
+    @then('the result should be "{{expected}}"')
+    def step_{name}_check_result(context, expected):
+        assert str(context.result["result"]) == expected
+"""
+
+
+@given('a project with a generated step module for "{tool_name}"')
+def step_create_legacy_steps(context, tool_name):
+    context.project_dir = context.test_dir / "project"
+    steps_dir = context.project_dir / "features" / "steps"
+    steps_dir.mkdir(parents=True, exist_ok=True)
+    (steps_dir / f"test_{tool_name}_steps.py").write_text(LEGACY_STEPS.format(name=tool_name))
+
+
+@given('the project has a hand-written step module for "{tool_name}"')
+def step_create_custom_steps(context, tool_name):
+    steps_dir = context.project_dir / "features" / "steps"
+    (steps_dir / f"test_{tool_name}_steps.py").write_text(
+        "from behave import then\n\n"
+        f"@then('the {tool_name} output should be tidy')\n"
+        "def step_check_tidy(context):\n"
+        "    pass\n"
+    )
+
+
+@when('I migrate the generated test steps')
+def step_migrate_test_steps(context):
+    # migrate_test_steps works on ./features/steps; contextlib.chdir needs Python 3.11
+    previous = os.getcwd()
+    os.chdir(context.project_dir)
+    try:
+        context.migration_result = asyncio.run(context.tool_manager.migrate_test_steps())
+    finally:
+        os.chdir(previous)
+    assert context.migration_result["success"], context.migration_result
+
+
+@then('the step module for "{tool_name}" should be removed')
+def step_check_steps_removed(context, tool_name):
+    path = context.project_dir / "features" / "steps" / f"test_{tool_name}_steps.py"
+    assert not path.exists(), context.migration_result
+
+
+@then('the step module for "{tool_name}" should be kept')
+def step_check_steps_kept(context, tool_name):
+    path = context.project_dir / "features" / "steps" / f"test_{tool_name}_steps.py"
+    assert path.exists(), context.migration_result
+    assert str(Path("features/steps") / path.name) in context.migration_result["kept"]
+
+
+@then('the project should load the shared step library')
+def step_check_project_loader(context):
+    loader = context.project_dir / "features" / "steps" / "tool_steps.py"
+    assert "from anymcp.tool_steps import *" in loader.read_text()
+
+
+@when('I create a BDD test for "{tool_name}" with budgets:')
+def step_create_test_with_budgets(context, tool_name):
+    test_scenarios = [
+        {
+            "input": {"text": row["text"]},
+            "expected": row["expected"],
+            "max_latency_ms": float(row["max_latency_ms"]),
+            "max_memory_mb": float(row["max_memory_mb"])
+        }
+        for row in context.table
+    ]
+    context.test_creation_result = asyncio.run(
+        context.tool_manager.create_tool_test(tool_name, test_scenarios)
+    )
+
+
+@then('the test result should report the measured latency and memory of each case')
+def step_check_budget_report(context):
+    budgets = context.test_result["budgets"]
+    assert {(entry["scenario"], entry["budget"]) for entry in budgets} >= {
+        ("Test case 1", "latency_ms"), ("Test case 1", "memory_mb"), ("Test case 2", "latency_ms")
+    }, budgets
+    for entry in budgets:
+        latency = entry["measurement"]["latency_ms"]
+        assert latency["count"] == 5 and latency["p50"] <= latency["p95"], entry
+        assert entry["measurement"]["peak_rss_mb"] > 0, entry
+    failed = [entry for entry in budgets if not entry["passed"]]
+    assert [(entry["scenario"], entry["budget"]) for entry in failed] == [("Test case 2", "latency_ms")], budgets
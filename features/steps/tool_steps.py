@@ -0,0 +1,7 @@
+"""Steps for tests generated by create_tool_test (defined in anymcp/tool_steps.py)"""
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp.tool_steps import *
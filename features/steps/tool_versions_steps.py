@@ -0,0 +1,123 @@
+from behave import given, when, then
+import asyncio
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp.tool_manager import ToolManager
+
+
+@given('the tool store keeps {count:d} versions of each tool')
+def step_retain_versions(context, count):
+    context.tool_manager = ToolManager(tools_dir=str(context.tools_dir), retain_versions=count)
+
+
+@when('I publish version {version:d} of a tool named "{name}"')
+def step_publish_version(context, version, name):
+    code = f"def execute() -> int:\n    return {version}\n"
+    result = asyncio.run(context.tool_manager.create_tool(name, code, overwrite=True))
+    assert result["success"], result
+    context.published = getattr(context, "published", {})
+    context.published[version] = result["content_hash"]
+
+
+@when('I roll back the tool "{name}"')
+def step_roll_back(context, name):
+    context.rollback_result = asyncio.run(context.tool_manager.rollback_tool(name))
+
+
+@when('the working copy of "{name}" is edited to return "{value}"')
+def step_edit_working_copy(context, name, value):
+    tool_path = context.tool_manager.tools_dir / f"{name}.py"
+    tool_path.write_text(f"def execute() -> str:\n    return {value!r}\n")
+
+
+@then('executing "{name}" should return "{expected}"')
+def step_check_version_result(context, name, expected):
+    result = asyncio.run(context.tool_manager.execute_tool(name, {}))
+    assert result["success"] and str(result["result"]) == expected, result
+
+
+@then('the rollback should succeed and replace version {version:d}')
+def step_check_rollback(context, version):
+    result = context.rollback_result
+    assert result["success"], result
+    assert result["previous"] == context.published[version], result
+    assert result["content_hash"] != result["previous"], result
+
+
+@then('the tool "{name}" should have {count:d} retained versions')
+def step_check_retained(context, name, count):
+    result = context.tool_manager.tool_versions(name)
+    assert result["success"] and len(result["versions"]) == count, result
+    assert sum(entry["current"] for entry in result["versions"]) == 1, result
+
+
+@then('the stored object for version {version:d} should have been removed')
+def step_check_collected(context, version):
+    store = context.tool_manager.store
+    assert not store.object_path(context.published[version]).exists()
+    for kept in list(context.published.values())[-store.retain:]:
+        assert store.object_path(kept).exists()
+
+
+@then('rolling "{name}" back to version {version:d} should fail with "{message}"')
+def step_check_rollback_fails(context, name, version, message):
+    result = asyncio.run(context.tool_manager.rollback_tool(name, context.published[version]))
+    assert not result["success"] and message in result["error"], result
+
+
+@then('both versions should have run from the tool store in {count:d} worker')
+def step_check_pinned_runs(context, count):
+    pool = context.tool_manager.worker_pool
+    assert pool.stats["spawned"] == count, pool.stats
+    for content_hash in context.published.values():
+        assert context.tool_manager.store.object_path(content_hash).exists()
+
+
+@given('the tool system runs tools in "{mode}" mode')
+def step_execution_mode(context, mode):
+    context.tool_manager = ToolManager(tools_dir=str(context.tools_dir), execution_mode=mode)
+
+
+@when('I publish a tool named "{name}" that returns its own file')
+def step_publish_whereami(context, name):
+    code = "def execute() -> dict:\n    return {'file': __file__, 'module': __name__}\n"
+    result = asyncio.run(context.tool_manager.create_tool(name, code, overwrite=True))
+    assert result["success"], result
+    context.published = {1: result["content_hash"]}
+
+
+@then('executing "{name}" should report the working copy as its file and module')
+def step_check_identity(context, name):
+    result = asyncio.run(context.tool_manager.execute_tool(name, {}))
+    assert result["success"], result
+    working_copy = (context.tool_manager.tools_dir / f"{name}.py").resolve()
+    assert Path(result["result"]["file"]) == working_copy, (result["result"], working_copy)
+    assert result["result"]["module"] == f"anymcp_tool_{name}", result["result"]
+    # The code still came from the store: the published object is what got pinned
+    assert context.tool_manager.store.pinned(working_copy) == \
+        context.tool_manager.store.object_path(context.published[1])
+
+
+@when('the stored object of "{name}" is rewritten to return "{value}"')
+def step_rewrite_object(context, name, value):
+    # Only the store's copy changes, so whatever returns value ran from it
+    object_path = context.tool_manager.store.object_path(context.published[1])
+    object_path.write_text(f"def execute() -> dict:\n    return {{'file': __file__, 'value': {value!r}}}\n")
+
+
+@when('I run a batch of {count:d} cases against "{name}"')
+def step_run_batch(context, count, name):
+    context.batch_result = asyncio.run(context.tool_manager.execute_tool_batch(name, [{}] * count))
+
+
+@then('every batch case should have returned "{value}" with the working copy as its file')
+def step_check_batch_identity(context, value):
+    result = context.batch_result
+    assert result["success"], result
+    working_copy = (context.tool_manager.tools_dir / "whereami.py").resolve()
+    for case in result["results"]:
+        assert case["success"] and case["result"]["value"] == value, case
+        assert Path(case["result"]["file"]) == working_copy, case
@@ -0,0 +1,76 @@
+from behave import given, then
+import asyncio
+import json
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from anymcp.tracing import JsonLinesExporter, Tracer
+
+
+def _read_spans(context):
+    context.tool_manager.tracer.close()
+    return [json.loads(line) for line in context.trace_file.read_text().splitlines()]
+
+
+@given('tracing is written to a file')
+def step_enable_tracing(context):
+    """Give the tool manager a tracer that exports into the scenario directory"""
+    context.trace_file = context.test_dir / "trace.jsonl"
+    context.tool_manager.tracer = Tracer(JsonLinesExporter(context.trace_file))
+
+
+@given('the traced tool system runs tools in "{mode}" mode')
+def step_traced_execution_mode(context, mode):
+    """Switch the execution mode without replacing the traced tool manager"""
+    context.tool_manager.execution_mode = mode
+
+
+@given('there is a tool that returns its trace context')
+def step_traceparent_tool(context):
+    """Create a tool that echoes the trace environment variables"""
+    asyncio.run(context.tool_manager.create_tool(
+        "traceparent",
+        '''
+import os
+
+def execute() -> dict:
+    """Return the trace context this process was started with"""
+    return {
+        "traceparent": os.environ.get("TRACEPARENT"),
+        "trace_id": os.environ.get("ANYMCP_TRACE_ID")
+    }
+''',
+        overwrite=True
+    ))
+
+
+@then('the trace file should contain spans "{names}"')
+def step_check_span_names(context, names):
+    """Check that every expected span was exported"""
+    exported = {span["name"] for span in _read_spans(context)}
+    for name in (n.strip() for n in names.split(",")):
+        assert name in exported, f"Span {name} missing from {sorted(exported)}"
+
+
+@then('all spans should belong to one trace')
+def step_check_single_trace(context):
+    """Check that the spans share a trace id and link to their parents"""
+    spans = _read_spans(context)
+    assert len({span["traceId"] for span in spans}) == 1
+    span_ids = {span["spanId"] for span in spans}
+    for span in spans:
+        if "parentSpanId" in span:
+            assert span["parentSpanId"] in span_ids, f"Orphan span {span['name']}"
+
+
+@then('the tool should see the trace id of the "{name}" span')
+def step_check_child_trace(context, name):
+    """Check that the tool process received the trace context"""
+    result = context.execution_result
+    assert result["success"], result
+    seen = result["result"]
+    span = next(span for span in _read_spans(context) if span["name"] == name)
+    assert seen["trace_id"] == span["traceId"]
+    assert seen["traceparent"].startswith(f"00-{span['traceId']}-")
@@ -0,0 +1,94 @@
+from behave import given, when, then
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+@given('the tool system routes tools by workload')
+def step_auto_mode(context):
+    context.tool_manager.execution_mode = "auto"
+
+
+@when('I execute the "{tool_name}" tool without parameters while watching stdout')
+def step_execute_watching_stdout(context, tool_name):
+    watched, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        context.execution_result = asyncio.run(context.tool_manager.execute_tool(tool_name, {}))
+        context.stdout_written = sys.stdout.getvalue()
+    finally:
+        sys.stdout = watched
+
+
+@when('I execute the "{tool_name}" tool while the server prints "{text}" to stdout')
+def step_execute_beside_server_output(context, tool_name, text):
+    async def call_and_print():
+        call = asyncio.create_task(context.tool_manager.execute_tool(tool_name, {}))
+        await asyncio.sleep(0.2)
+        print(text)
+        return await call
+
+    watched, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        context.execution_result = asyncio.run(call_and_print())
+        context.stdout_written = sys.stdout.getvalue()
+    finally:
+        sys.stdout = watched
+
+
+@when('I execute the "{slow}" tool with a timeout of {timeout:d} second alongside the "{fast}" tool')
+def step_execute_alongside(context, slow, timeout, fast):
+    async def timed(name, call_timeout):
+        start = time.perf_counter()
+        result = await context.tool_manager.execute_tool(name, {}, timeout=call_timeout)
+        return result, time.perf_counter() - start
+
+    async def both():
+        slow_call = asyncio.create_task(timed(slow, timeout))
+        await asyncio.sleep(0.1)
+        return await asyncio.gather(slow_call, timed(fast, 30))
+
+    context.timed_results = dict(zip((slow, fast), asyncio.run(both())))
+
+
+@then('the "{name}" call should have timed out')
+def step_check_timed_out(context, name):
+    result, elapsed = context.timed_results[name]
+    assert not result["success"] and "timed out" in result["error"], result
+    assert elapsed < 1.5, elapsed
+
+
+@then('the "{name}" call should have returned {value:d} while "{slow}" was still running')
+def step_check_not_stalled(context, name, value, slow):
+    result, elapsed = context.timed_results[name]
+    assert result["success"] and result["result"] == value, result
+    assert elapsed < context.timed_results[slow][1], (elapsed, context.timed_results[slow][1])
+
+
+@then('only "{text}" should have been written to stdout')
+def step_check_only_server_output(context, text):
+    assert context.stdout_written == f"{text}\n", context.stdout_written
+    assert context.execution_result["result"] == "done", context.execution_result
+
+
+@then('it should have run on the "{executor}" executor')
+def step_check_executor(context, executor):
+    result = context.execution_result
+    assert result["success"], result
+    assert result["executor"] == executor, result
+
+
+@then('nothing should have been written to stdout')
+def step_check_stdout(context):
+    assert context.stdout_written == "", context.stdout_written
+    assert context.execution_result["result"] == "done", context.execution_result
+
+
+@then('the "{tool_name}" tool should be classified for the "{executor}" executor because it "{reason}"')
+def step_check_workload(context, tool_name, executor, reason):
+    tool = next(tool for tool in context.results[-1] if tool["name"] == tool_name)
+    assert tool["workload"] == {"executor": executor, "reason": reason}, tool["workload"]
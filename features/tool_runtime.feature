@@ -0,0 +1,45 @@
+Feature: Shared tool runtime
+  As an AI assistant
+  I want tools to hold only their logic and run through one shared entry point
+  So that every call skips the per-file argument parsing boilerplate
+
+  Background:
+    Given the MCP tool system is initialized
+    And the tools directory is writable
+
+  Scenario: New tools contain only their logic
+    When I create a tool named "adder" with the following code:
+      """
+      def execute(a: int, b: int) -> dict:
+          return {"sum": a + b}
+      """
+    Then the tool should be created successfully
+    And the "adder" tool file should not contain a __main__ block
+    And executing "adder" with a=2 and b=3 should return a sum of 5
+
+  Scenario: Output printed by a tool does not corrupt its result
+    When I create a tool named "chatty" with the following code:
+      """
+      def execute(a: int, b: int) -> dict:
+          print("working on it")
+          return {"sum": a + b}
+      """
+    Then executing "chatty" with a=4 and b=5 should return a sum of 9
+
+  Scenario: The runtime answers every framed request on stdin
+    When I create a tool named "adder" with the following code:
+      """
+      def execute(a: int, b: int) -> dict:
+          return {"sum": a + b}
+      """
+    And I send the runtime for "adder" the frames {"a": 1, "b": 1} and {"a": 1}
+    Then the runtime should answer with a sum of 2 and then an error
+
+  Scenario: Migrate tools written with the old boilerplate
+    Given a tool file "legacy_adder" written with the generated __main__ block
+    And a tool file "custom_main" with a hand-written __main__ block
+    When I migrate the tools
+    Then "legacy_adder" should be reported as migrated
+    And "custom_main" should be reported as kept
+    And the "legacy_adder" tool file should not contain a __main__ block
+    And executing "legacy_adder" with a=20 and b=22 should return a sum of 42
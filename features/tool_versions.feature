@@ -0,0 +1,57 @@
+Feature: Versioned tool store
+  As an AI assistant
+  I want every published version of a tool kept by content hash
+  So that I can roll a bad change back and running calls never see a half-written tool
+
+  Background:
+    Given the MCP tool system is initialized
+    And the tools directory is writable
+
+  Scenario: Roll a tool back to its previous version
+    When I publish version 1 of a tool named "versioned"
+    And I publish version 2 of a tool named "versioned"
+    Then executing "versioned" should return "2"
+    When I roll back the tool "versioned"
+    Then the rollback should succeed and replace version 2
+    And executing "versioned" should return "1"
+    And the tool "versioned" should have 2 retained versions
+
+  Scenario: Only the most recent versions are retained
+    Given the tool store keeps 2 versions of each tool
+    When I publish version 1 of a tool named "versioned"
+    And I publish version 2 of a tool named "versioned"
+    And I publish version 3 of a tool named "versioned"
+    Then the tool "versioned" should have 2 retained versions
+    And the stored object for version 1 should have been removed
+    And rolling "versioned" back to version 1 should fail with "not retained"
+
+  Scenario: Warm workers run the published version by its content hash
+    Given the tool system runs tools in warm workers
+    When I publish version 1 of a tool named "versioned"
+    Then executing "versioned" should return "1"
+    When I publish version 2 of a tool named "versioned"
+    Then executing "versioned" should return "2"
+    And both versions should have run from the tool store in 1 worker
+
+  Scenario: A hand-edited tool runs its working copy
+    Given the tool system runs tools in warm workers
+    When I publish version 1 of a tool named "versioned"
+    And the working copy of "versioned" is edited to return "edited"
+    Then executing "versioned" should return "edited"
+
+  Scenario Outline: A published tool runs as its working copy in <mode> mode
+    Given the tool system runs tools in "<mode>" mode
+    When I publish a tool named "whereami" that returns its own file
+    Then executing "whereami" should report the working copy as its file and module
+
+    Examples:
+      | mode       |
+      | subprocess |
+      | worker     |
+      | auto       |
+
+  Scenario: A batch runs the published object as its working copy
+    When I publish a tool named "whereami" that returns its own file
+    And the stored object of "whereami" is rewritten to return "stored"
+    And I run a batch of 2 cases against "whereami"
+    Then every batch case should have returned "stored" with the working copy as its file
@@ -0,0 +1,37 @@
+Feature: Execution tracing
+  As an operator
+  I want each tool execution recorded as a trace
+  So that I can see which phase of a slow call took the time
+
+  Background:
+    Given the MCP tool system is initialized
+    And tracing is written to a file
+
+  Scenario: Tool execution phases are exported as spans
+    Given there is a sample calculator tool available
+    When I execute the "calculator" tool with operation "add" and numbers 2 and 2
+    Then the trace file should contain spans "tool.execute, tool.validate, tool.resolve, tool.spawn, tool.run, tool.decode"
+    And all spans should belong to one trace
+
+  Scenario: Trace context is passed to the tool process
+    Given there is a tool that returns its trace context
+    When I execute a tool named "traceparent"
+    Then the tool should see the trace id of the "tool.execute" span
+
+  Scenario Outline: Trace context reaches a tool running in <mode> mode
+    Given the traced tool system runs tools in "<mode>" mode
+    And there is a tool that returns its trace context
+    When I execute a tool named "traceparent"
+    Then the tool should see the trace id of the "tool.execute" span
+
+    Examples:
+      | mode   |
+      | worker |
+      | auto   |
+
+  Scenario: Waiting for a warm worker is exported as a span
+    Given the traced tool system runs tools in "worker" mode
+    And there is a sample calculator tool available
+    When I execute the "calculator" tool with operation "add" and numbers 2 and 2
+    Then the trace file should contain spans "tool.execute, tool.acquire, tool.run, tool.decode"
+    And all spans should belong to one trace
@@ -0,0 +1,33 @@
+Feature: Traffic capture and replay
+  As a maintainer
+  I want to record real MCP sessions and replay them against a candidate build
+  So that performance changes are validated against real workload shapes
+
+  Scenario: Record calls, timings and tool snapshots
+    Given a recorded session that creates, executes and rewrites a "doubler" tool
+    Then the recording should contain 1 session with 5 calls
+    And every recorded call should have a start offset, a duration and a result digest
+    And the recording should hold 2 snapshots of the "doubler" tool
+
+  Scenario: Replay a recording at accelerated speed
+    Given a recorded session that creates, executes and rewrites a "doubler" tool
+    When I replay the recording at 10x speed
+    Then the replay should cover 5 calls with no differences
+    And the replay should report recorded and replayed latency per tool
+
+  Scenario: Report result differences
+    Given a recorded session that creates, executes and rewrites a "doubler" tool
+    And the recorded result of call 2 was changed
+    When I replay the recording at full speed
+    Then the replay should report call 2 as different with a diff
+
+  Scenario: Restore tools that were edited outside MCP
+    Given a recorded session that executes a "tripler" tool edited on disk between calls
+    When I replay the recording at full speed
+    Then the replay should cover 2 calls with no differences
+
+  Scenario: Only tool listings are compared regardless of order
+    Then an "execute_tool" result of [3, 1, 2] should not match [1, 2, 3]
+    And a "search_tool" result of ["b", "a"] should match ["a", "b"]
+    And a "list_tools" result listing ["b", "a"] should match one listing ["a", "b"]
+    And a "list_tools" result whose "b" tool takes ["y", "x"] should not match one taking ["x", "y"]
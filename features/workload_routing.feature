@@ -0,0 +1,140 @@
+Feature: Route tools by workload
+  As an AI assistant
+  I want cheap tools to skip process startup and heavy ones to stay out of the server
+  So that every tool runs on the executor that suits it
+
+  Background:
+    Given the MCP tool system is initialized
+    And the tools directory is writable
+    And the tool system routes tools by workload
+
+  Scenario: A pure tool runs in the server process
+    When I create a tool named "answer" with the following code:
+      """
+      def execute() -> int:
+          return 6 * 7
+      """
+    And I execute the "answer" tool without parameters
+    Then the tool should execute successfully
+    And the result should be 42
+    And it should have run on the "inprocess" executor
+
+  Scenario: A tool that blocks on I/O runs in a thread
+    When I create a tool named "sleeper" with the following code:
+      """
+      from time import sleep
+
+      def execute() -> str:
+          sleep(0.01)
+          return "rested"
+      """
+    And I execute the "sleeper" tool without parameters
+    Then the tool should execute successfully
+    And it should have run on the "thread" executor
+
+  Scenario: A CPU-heavy tool runs in the worker pool
+    When I create a tool named "spinner" with the following code:
+      """
+      def execute() -> int:
+          total = 0
+          for i in range(100):
+              for j in range(100):
+                  total += i * j
+          return total
+      """
+    And I execute the "spinner" tool without parameters
+    Then the tool should execute successfully
+    And the result should be 24502500
+    And it should have run on the "process" executor
+
+  Scenario: __executor__ overrides the classification
+    When I create a tool named "declared" with the following code:
+      """
+      __executor__ = "process"
+
+      def execute() -> int:
+          return 1
+      """
+    And I execute the "declared" tool without parameters
+    Then it should have run on the "process" executor
+
+  Scenario: In-process tools cannot write to the server's stdout
+    When I create a tool named "chatty" with the following code:
+      """
+      def execute() -> str:
+          print("this must not reach the MCP channel")
+          return "done"
+      """
+    And I execute the "chatty" tool without parameters while watching stdout
+    Then it should have run on the "inprocess" executor
+    And nothing should have been written to stdout
+
+  Scenario: Only a tool's own output is kept off the server's stdout
+    When I create a tool named "chatterbox" with the following code:
+      """
+      import time
+
+      def execute() -> str:
+          print("from the tool")
+          time.sleep(0.5)
+          return "done"
+      """
+    And I execute the "chatterbox" tool while the server prints "from the server" to stdout
+    Then it should have run on the "thread" executor
+    And only "from the server" should have been written to stdout
+
+  Scenario: A slow in-process call times out without stalling other calls
+    When I create a tool named "answer" with the following code:
+      """
+      def execute() -> int:
+          return 6 * 7
+      """
+    And I create a tool named "stall" with the following code:
+      """
+      __executor__ = "inprocess"
+
+      import time
+
+      def execute() -> str:
+          time.sleep(2)
+          return "too late"
+      """
+    And I execute the "stall" tool with a timeout of 1 second alongside the "answer" tool
+    Then the "stall" call should have timed out
+    And the "answer" call should have returned 42 while "stall" was still running
+
+  Scenario: A tool with a loop never runs on the event loop
+    When I create a tool named "looper" with the following code:
+      """
+      def execute() -> int:
+          total = 0
+          for i in range(10):
+              total += i
+          return total
+      """
+    And I execute the "looper" tool without parameters
+    Then the tool should execute successfully
+    And the result should be 45
+    And it should have run on the "thread" executor
+
+  Scenario: A threaded tool that turns out to burn CPU moves to the worker pool
+    When I create a tool named "busy" with the following code:
+      """
+      def execute() -> int:
+          return sum(i * i for i in range(2000000))
+      """
+    And I execute the "busy" tool without parameters
+    Then it should have run on the "thread" executor
+    When I execute the "busy" tool without parameters
+    Then it should have run on the "process" executor
+
+  Scenario: Search results show the workload class
+    When I create a tool named "fetcher" with the following code:
+      """
+      import urllib.request
+
+      def execute(url: str) -> str:
+          return urllib.request.urlopen(url).read().decode()
+      """
+    And I search for tools with detailed information
+    Then the "fetcher" tool should be classified for the "thread" executor because it "imports urllib"